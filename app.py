@@ -1,19 +1,11 @@
 import streamlit as st
 import os
-import tempfile
 from dotenv import load_dotenv
 from PIL import Image
 from datetime import datetime
 
-from chatbot.document_loader import load_documents
-from chatbot.rag_system import create_vector_store, setup_rag_chain
-from chatbot.user_info import UserInfoCollector
-from chatbot.agent import setup_agent
-from chatbot.tools.date_tool import DateExtractionTool
-from chatbot.tools.booking_tool import AppointmentBookingTool
-
-from langchain.llms import OpenAI
-from langchain.memory import ConversationBufferMemory
+# DocumentChatbot imports LangChain lazily, so the first page render doesn't pay for it
+from chatbot.document_chatbot import DocumentChatbot
 
 # Load environment variables
 load_dotenv()
@@ -31,56 +23,6 @@ st.set_page_config(
     layout="wide"
 )
 
-class DocumentChatbot:
-    def __init__(self, document_path):
-        self.llm = OpenAI(temperature=0.7)
-
-        # Load and embed document
-        documents = load_documents(document_path)
-        vector_store = create_vector_store(documents)
-        self.qa_chain = setup_rag_chain(vector_store, self.llm)
-
-        # Tools and agent setup
-        self.user_info_collector = UserInfoCollector(self.llm)
-        self.date_tool = DateExtractionTool()
-        self.booking_tool = AppointmentBookingTool(self.user_info_collector, self.date_tool)
-        self.tools = setup_agent(self.llm, self.user_info_collector, self.date_tool, self.booking_tool)
-        self.memory = ConversationBufferMemory(return_messages=True)
-
-    def process_message(self, user_message):
-        user_message_lower = user_message.lower()
-
-        # Collecting user info
-        if self.user_info_collector.is_collecting():
-            return self.user_info_collector.process_input(user_message)
-
-        # Trigger info collection
-        if "call me" in user_message_lower or "contact me" in user_message_lower:
-            return self.user_info_collector.start_collection()
-
-    
-        # Trigger appointment booking
-        if any(kw in user_message_lower for kw in ["book", "schedule", "appointment", "meeting"]):
-            date_str = self.date_tool.extract_date(user_message)
-            if date_str:
-                try:
-                    response = self.booking_tool.book_appointment(user_message)
-                    return response
-                except Exception as e:
-                    return f"Error during appointment booking: {e}"
-            else:
-                # Skip this message and directly ask for name
-                return self.user_info_collector.start_collection()
-
-
-        # Fallback to document Q&A
-        try:
-            response = self.qa_chain({"query": user_message})
-            return response["result"]
-        except Exception as e:
-            return f"I'm sorry, I encountered an error while answering: {str(e)}"
-
-
 # Page layout
 col1, col2 = st.columns([1, 5])
 with col1:
@@ -99,13 +41,16 @@ with st.sidebar:
     uploaded_file = st.file_uploader("Upload a PDF or TXT document", type=["pdf", "txt"])
 
     if uploaded_file and "chatbot" not in st.session_state:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            file_path = tmp_file.name
-
         with st.spinner("Processing document..."):
             try:
-                st.session_state.chatbot = DocumentChatbot(file_path)
+                llm_cache = None
+                if os.getenv("LLM_CACHE_DB"):
+                    from chatbot.llm_cache import LLMResponseCache
+                    llm_cache = LLMResponseCache(os.getenv("LLM_CACHE_DB"))
+                st.session_state.chatbot = DocumentChatbot(
+                    uploaded_file, mime_type=uploaded_file.type, file_name=uploaded_file.name,
+                    llm_cache=llm_cache
+                )
                 st.success("Document loaded successfully.")
             except Exception as e:
                 st.error(f"Failed to load document: {e}")
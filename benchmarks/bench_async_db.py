@@ -0,0 +1,78 @@
+"""
+Benchmark concurrent asyncio bookings: one commit per booking vs the group-committing AsyncDatabase.
+
+The baseline runs AppointmentBookingTool.save_appointment in the default
+thread pool (asyncio.to_thread), so every booking is its own transaction.
+AsyncDatabase sends the same bookings through its single executor thread,
+which commits whatever has queued up together.
+
+Usage:
+    python -m benchmarks.bench_async_db [--bookings 5000] [--synchronous FULL]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+from chatbot.async_db import AsyncDatabase
+from chatbot.database import close_pool, get_pool
+from chatbot.tools.booking_tool import AppointmentBookingTool
+from chatbot.tools.calendars import DEFAULT_SLOTS
+
+
+def _slots(bookings):
+    start = date(2030, 1, 1)
+    return [((start + timedelta(days=i // len(DEFAULT_SLOTS))).isoformat(), DEFAULT_SLOTS[i % len(DEFAULT_SLOTS)])
+            for i in range(bookings)]
+
+
+async def _per_request_commits(db_name, slots):
+    tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=db_name, cache_availability=False)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(asyncio.to_thread(tool.save_appointment, 1, d, t) for d, t in slots))
+    return time.perf_counter() - start, sum(results), len(slots)
+
+
+async def _group_commits(db_name, slots, synchronous):
+    async with AsyncDatabase(db_name, synchronous=synchronous) as db:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(db.save_appointment(1, d, t) for d, t in slots))
+        elapsed = time.perf_counter() - start
+        commits = db.stats()["commits"]
+    return elapsed, sum(results), commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL"],
+                        help="SQLite synchronous setting; FULL makes every commit fsync")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    slots = _slots(args.bookings)
+    try:
+        baseline_db = os.path.join(directory, "baseline.db")
+        get_pool(baseline_db).synchronous = args.synchronous
+        baseline = asyncio.run(_per_request_commits(baseline_db, slots))
+        close_pool(baseline_db)
+
+        grouped_db = os.path.join(directory, "grouped.db")
+        grouped = asyncio.run(_group_commits(grouped_db, slots, args.synchronous))
+        close_pool(grouped_db)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{args.bookings} concurrent bookings, synchronous={args.synchronous}")
+    print(f"{'mode':<28} {'bookings/s':>11} {'saved':>7} {'commits':>8}")
+    for name, (elapsed, saved, commits) in [("one commit per booking", baseline), ("AsyncDatabase group commit", grouped)]:
+        print(f"{name:<28} {args.bookings / elapsed:>11.0f} {saved:>7} {commits:>8}")
+    print(f"speedup: {baseline[0] / grouped[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark availability lookups against a large appointments table, before and after the indexes.
+
+Builds a database with --rows appointments (1M by default) at schema version 1
+(tables only), times get_booked_slots and get_user_id, then migrates to the
+latest version and times them again. Finally compares per-day lookups with
+the range availability engine and times next-available searches.
+
+Usage:
+    python -m benchmarks.bench_availability [--rows 1000000] [--lookups 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+from chatbot.database import close_pool, get_pool
+from chatbot.migrations import LATEST_VERSION, migrate
+from chatbot.repository import SQLiteRepository
+from chatbot.tools.availability import AvailabilityEngine
+from chatbot.tools.booking_tool import AppointmentBookingTool
+
+SLOTS = ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00"]
+START = date(2020, 1, 1)
+
+
+def populate(pool, rows, users=10000):
+    """Fill the database with `rows` appointments spread over consecutive days"""
+    with pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO user_data (name, phone, email, date, time, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            ((f"User {i}", f"98{i:08d}", f"user{i}@example.com", "2020-01-01", "09:00", f"2020-01-01T00:{i % 60:02d}")
+             for i in range(users))
+        )
+        conn.executemany(
+            "INSERT INTO appointments (user_id, date, time, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            ((i % users + 1, (START + timedelta(days=i // len(SLOTS))).isoformat(), SLOTS[i % len(SLOTS)],
+              "cancelled" if i % 10 == 0 else "confirmed", "2020-01-01T00:00:00")
+             for i in range(rows))
+        )
+
+
+def _legacy_user_id(pool, user_info):
+    """get_user_id as it worked before the customers table: newest matching user_data row"""
+    with pool.connection() as conn:
+        result = conn.execute('''
+            SELECT id FROM user_data WHERE name = ? AND phone = ? AND email = ?
+            ORDER BY created_at DESC LIMIT 1
+        ''', (user_info["name"], user_info["phone"], user_info["email"])).fetchone()
+        return result[0] if result else None
+
+
+def time_lookups(tool, rows, lookups, get_user_id, seed=0):
+    rng = random.Random(seed)
+    days = rows // len(SLOTS)
+    dates = [(START + timedelta(days=rng.randrange(days))).isoformat() for _ in range(lookups)]
+    users = [rng.randrange(10000) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    for d in dates:
+        tool.get_booked_slots(d)
+    slots_ms = (time.perf_counter() - start) * 1000 / lookups
+
+    start = time.perf_counter()
+    for i in users:
+        get_user_id({"name": f"User {i}", "phone": f"98{i:08d}", "email": f"user{i}@example.com"})
+    user_ms = (time.perf_counter() - start) * 1000 / lookups
+    return slots_ms, user_ms
+
+
+def time_range_queries(tool, rows, days=90, repeats=20):
+    start_day = START + timedelta(days=rows // len(SLOTS) // 2)
+    end_day = start_day + timedelta(days=days - 1)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        day = start_day
+        while day <= end_day:
+            tool.get_available_slots(day.isoformat())
+            day += timedelta(days=1)
+    per_day_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        tool.get_available_slots_range(start_day.isoformat(), end_day.isoformat())
+    range_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    print(f"\n{days}-day availability: {per_day_ms:.2f} ms with one query per day, "
+          f"{range_ms:.2f} ms with one range query")
+
+    print(f"{'next 5 slots':<32} {'horizon 30d ms':>15} {'horizon 3650d ms':>17}")
+    data_end = START + timedelta(days=rows // len(SLOTS))
+    for label, after in [("inside booked history", datetime.combine(start_day, datetime.min.time())),
+                         ("after last booking", datetime.combine(data_end, datetime.min.time()))]:
+        timings = []
+        for horizon in (30, 3650):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                tool.availability.next_available(after, count=5, horizon_days=horizon)
+            timings.append((time.perf_counter() - start) * 1000 / repeats)
+        print(f"{label:<32} {timings[0]:>15.3f} {timings[1]:>17.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "availability.db")
+    try:
+        pool = get_pool(db_name)
+        migrate(pool, target_version=1)
+        start = time.perf_counter()
+        populate(pool, args.rows)
+        print(f"Inserted {args.rows} appointments in {time.perf_counter() - start:.1f} s")
+
+        # Build the tool without running its own migration so the indexes stay absent
+        tool = AppointmentBookingTool.__new__(AppointmentBookingTool)
+        tool.db_name, tool.pool, tool.available_slots = db_name, pool, SLOTS
+        # Time the SQL itself, not the availability cache
+        tool.repository = SQLiteRepository(db_name, cache_availability=False)
+        tool.user_info_collector, tool.date_tool = MagicMock(), MagicMock()
+        # Schema version 1 has no customers table, so time the user_data scan the tool used to run
+        before = time_lookups(tool, args.rows, args.lookups, lambda info: _legacy_user_id(pool, info))
+
+        start = time.perf_counter()
+        migrate(pool)
+        print(f"Migrated to version {LATEST_VERSION} in {time.perf_counter() - start:.1f} s")
+        after = time_lookups(tool, args.rows, args.lookups, tool.get_user_id)
+
+        print(f"{'lookup':<20} {'no index ms':>12} {'indexed ms':>12} {'speedup':>9}")
+        for name, b, a in [("get_booked_slots", before[0], after[0]), ("get_user_id", before[1], after[1])]:
+            print(f"{name:<20} {b:>12.3f} {a:>12.3f} {b / a:>8.0f}x")
+
+        tool.availability = AvailabilityEngine(tool.repository, SLOTS)
+        time_range_queries(tool, args.rows)
+    finally:
+        close_pool(db_name)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
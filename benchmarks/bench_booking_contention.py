@@ -0,0 +1,158 @@
+"""
+Benchmark multi-process booking contention on one SQLite database file.
+
+Every process drives AppointmentBookingTool.book_appointment through its own
+share of distinct slots, so a failed booking is contention, never a taken
+slot. For each process count it reports successful bookings per second,
+writes that gave up with DatabaseLockedError, transactions retried after a
+lock error, and p50/p99 latency of one book_appointment call. Lower
+--busy-timeout-ms to see where lock errors start.
+
+By default each process count runs twice: with the availability cache, as
+in production, and without it. --no-cache runs only the uncached
+configuration.
+
+Usage:
+    python -m benchmarks.bench_booking_contention [--processes 1 2 4 8] [--bookings 200]
+        [--busy-timeout-ms 5000] [--lock-retries 3] [--cache | --no-cache]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+from chatbot.database import BUSY_TIMEOUT_MS, ConnectionPool, close_pool, get_pool
+from chatbot.migrations import migrate
+from chatbot.repository import LOCK_RETRIES, SQLiteRepository
+from chatbot.tools.availability_cache import AvailabilityCache
+from chatbot.tools.booking_tool import BUSY_MESSAGE, AppointmentBookingTool
+from chatbot.tools.calendars import DEFAULT_SLOTS
+from chatbot.tools.date_tool import DateExtractionTool
+
+USER_INFO = {"name": "Bench User", "phone": "9876543210", "email": "bench@example.com"}
+START_DAY = date(2030, 1, 1)
+
+
+def _queries(worker_id, processes, bookings):
+    """This worker's booking requests; workers interleave so they hit the same days at the same time"""
+    for k in range(bookings):
+        n = k * processes + worker_id
+        day = (START_DAY + timedelta(days=n // len(DEFAULT_SLOTS))).isoformat()
+        slot = datetime.strptime(DEFAULT_SLOTS[n % len(DEFAULT_SLOTS)], "%H:%M").strftime("%I:%M %p")
+        yield f"Book an appointment at {slot} on {day}"
+
+
+def _worker(db_name, worker_id, processes, bookings, busy_timeout_ms, lock_retries, cache, start_event, results):
+    pool = ConnectionPool(db_name, busy_timeout_ms=busy_timeout_ms)
+    repository = SQLiteRepository(db_name, cache_availability=False, lock_retries=lock_retries, pool=pool)
+    if cache:
+        # Writes go through the cache's connection, so it gets the same busy timeout
+        repository.cache = AvailabilityCache(db_name, busy_timeout_ms=busy_timeout_ms)
+    collector = MagicMock()
+    collector.get_user_info.return_value = USER_INFO
+    latencies = []
+    outcomes = {"booked": 0, "busy": 0, "other": 0}
+
+    # The tool prints every error; the counts below are what matters here
+    with contextlib.redirect_stdout(io.StringIO()):
+        tool = AppointmentBookingTool(collector, DateExtractionTool(), db_name=db_name, repository=repository)
+        queries = list(_queries(worker_id, processes, bookings))
+        start_event.wait()
+        started = time.time()
+        for query in queries:
+            t0 = time.perf_counter()
+            reply = tool.book_appointment(query)
+            latencies.append(time.perf_counter() - t0)
+            if reply.startswith("Appointment confirmed"):
+                outcomes["booked"] += 1
+            elif reply == BUSY_MESSAGE:
+                outcomes["busy"] += 1
+            else:
+                outcomes["other"] += 1
+        finished = time.time()
+    if repository.cache is not None:
+        repository.cache.close()
+    pool.close()
+    results.put({**outcomes, "lock_errors": repository.lock_errors, "retries": repository.retries,
+                 "latencies": latencies, "started": started, "finished": finished})
+
+
+def _make_db(directory, name):
+    db_name = os.path.join(directory, f"contention_{name}.db")
+    pool = get_pool(db_name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(pool)
+    SQLiteRepository(db_name, cache_availability=False).upsert_customer(**USER_INFO)
+    close_pool(db_name)
+    return db_name
+
+
+def run(db_name, processes, bookings, busy_timeout_ms, lock_retries, cache=True):
+    ctx = multiprocessing.get_context("spawn")
+    start_event = ctx.Event()
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(db_name, i, processes, bookings, busy_timeout_ms, lock_retries, cache,
+                                          start_event, results))
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    # Give every process time to import and connect before the clock starts
+    time.sleep(1.0)
+    start_event.set()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    latencies = sorted(latency for report in reports for latency in report["latencies"])
+    elapsed = max(r["finished"] for r in reports) - min(r["started"] for r in reports)
+    booked = sum(r["booked"] for r in reports)
+    return {
+        "booked": booked,
+        "rate": booked / elapsed,
+        "lock_errors": sum(r["lock_errors"] for r in reports),
+        "retries": sum(r["retries"] for r in reports),
+        "other": sum(r["other"] for r in reports),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--bookings", type=int, default=200, help="Bookings per process")
+    parser.add_argument("--busy-timeout-ms", type=int, default=BUSY_TIMEOUT_MS)
+    parser.add_argument("--lock-retries", type=int, default=LOCK_RETRIES)
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=True,
+                        help="Also run with the availability cache, as in production")
+    args = parser.parse_args()
+
+    print(f"{args.bookings} bookings per process, busy timeout {args.busy_timeout_ms} ms, "
+          f"{args.lock_retries} retries")
+    print(f"{'processes':>9} {'cache':>6} {'bookings/s':>11} {'lock errors':>12} {'retries':>8} {'other':>6} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    configurations = [True, False] if args.cache else [False]
+    directory = tempfile.mkdtemp()
+    try:
+        for processes in args.processes:
+            for cache in configurations:
+                db_name = _make_db(directory, f"{processes}_{'cache' if cache else 'nocache'}")
+                result = run(db_name, processes, args.bookings, args.busy_timeout_ms, args.lock_retries, cache)
+                print(f"{processes:>9} {'on' if cache else 'off':>6} {result['rate']:>11.0f} "
+                      f"{result['lock_errors']:>12} {result['retries']:>8} {result['other']:>6} "
+                      f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark concurrent booking throughput: fresh connections vs the shared WAL pool.
+
+Each worker thread repeatedly does what one booking costs in the database:
+look up the user, read the booked slots for a date and insert an appointment.
+
+Usage:
+    python -m benchmarks.bench_booking_db [--threads 8] [--bookings 2000]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+from chatbot.database import close_pool
+from chatbot.repository import SQLiteRepository
+from chatbot.tools.booking_tool import AppointmentBookingTool
+
+USER_INFO = {"name": "Bench User", "phone": "9876543210", "email": "bench@example.com"}
+
+
+class _FreshConnectionRepository(SQLiteRepository):
+    """The pre-pool behaviour: a new rollback-journal connection for every operation."""
+
+    class _Pool:
+        def __init__(self, db_name):
+            self.db_name = db_name
+            self.schema_version = None
+
+        def connection(self):
+            return sqlite3.connect(self.db_name, timeout=5)
+
+    def __init__(self, db_name):
+        super().__init__(db_name, cache_availability=False, pool=self._Pool(db_name))
+
+
+class _FreshConnectionTool(AppointmentBookingTool):
+    def __init__(self, *args, db_name, **kwargs):
+        super().__init__(*args, db_name=db_name, repository=_FreshConnectionRepository(db_name), **kwargs)
+
+
+def _make_db(directory, journal_mode):
+    db_name = os.path.join(directory, f"bench_{journal_mode.lower()}.db")
+    with sqlite3.connect(db_name) as conn:
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, phone TEXT NOT NULL,
+                email TEXT NOT NULL, date TEXT NOT NULL, time TEXT NOT NULL,
+                created_at TEXT NOT NULL, status TEXT DEFAULT 'pending'
+            )
+        """)
+        conn.execute(
+            "INSERT INTO user_data (name, phone, email, date, time, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (USER_INFO["name"], USER_INFO["phone"], USER_INFO["email"], "2030-01-01", "09:00", "2030-01-01")
+        )
+    return db_name
+
+
+def run(tool_cls, db_name, threads, bookings):
+    tool = tool_cls(MagicMock(), MagicMock(), db_name=db_name)
+    failures = []
+    counter = iter(range(bookings))
+    counter_lock = threading.Lock()
+    start_day = date(2030, 1, 1)
+
+    def worker():
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            day = (start_day + timedelta(days=i // 9)).isoformat()
+            user_id = tool.get_user_id(USER_INFO)
+            tool.get_booked_slots(day)
+            if not tool.save_appointment(user_id, day, tool.available_slots[i % 9]):
+                failures.append(i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in range(threads):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+    return bookings / elapsed, len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--bookings", type=int, default=2000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        fresh_db = _make_db(directory, "DELETE")
+        pooled_db = _make_db(directory, "WAL")
+        fresh_rate, fresh_failures = run(_FreshConnectionTool, fresh_db, args.threads, args.bookings)
+        pooled_rate, pooled_failures = run(AppointmentBookingTool, pooled_db, args.threads, args.bookings)
+        close_pool(pooled_db)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{args.bookings} bookings across {args.threads} threads")
+    print(f"{'mode':<28} {'bookings/s':>12} {'failures':>9}")
+    print(f"{'fresh connection, DELETE':<28} {fresh_rate:>12.0f} {fresh_failures:>9}")
+    print(f"{'pooled, WAL':<28} {pooled_rate:>12.0f} {pooled_failures:>9}")
+    print(f"speedup: {pooled_rate / fresh_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark provider calendars: booking, conflict checks and cross-provider search at thousands of providers.
+
+Creates --providers providers with varied working hours and lunch breaks,
+books random 15/30/90-minute appointments on one day, then times the
+interval-set overlap check against a linear scan and the "who is free at
+this time" search across every provider.
+
+Usage:
+    python -m benchmarks.bench_calendars [--providers 5000] [--attempts 20000]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from chatbot.database import close_pool
+from chatbot.tools.calendars import CalendarStore, to_hhmm
+
+DAY = "2030-01-07"  # A Monday
+DURATIONS = [15, 30, 90]
+
+
+def _linear_overlaps(intervals, start, end):
+    return any(s < end and e > start for s, e in intervals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--providers", type=int, default=5000)
+    parser.add_argument("--attempts", type=int, default=20000, help="Booking attempts across all providers")
+    parser.add_argument("--checks", type=int, default=200000, help="In-memory overlap checks to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "calendars.db")
+    try:
+        store = CalendarStore(db_name)
+        start = time.perf_counter()
+        providers = []
+        for i in range(args.providers):
+            opens, closes = rng.choice(["07:00", "08:00", "09:00"]), rng.choice(["16:00", "18:00", "20:00"])
+            lunch = rng.choice([("12:00", "13:00"), ("13:00", "13:30")])
+            providers.append(store.add_provider(f"Provider {i}", hours={"mon": [(opens, closes)]}, breaks=[lunch]))
+        print(f"Created {args.providers} providers in {time.perf_counter() - start:.2f} s")
+
+        booked = conflicts = 0
+        start = time.perf_counter()
+        for _ in range(args.attempts):
+            minute = rng.randrange(7 * 60, 20 * 60, 15)
+            appointment_id, _ = store.book(rng.choice(providers), 1, DAY, to_hhmm(minute), rng.choice(DURATIONS))
+            if appointment_id:
+                booked += 1
+            else:
+                conflicts += 1
+        elapsed = time.perf_counter() - start
+        print(f"{args.attempts} booking attempts: {args.attempts / elapsed:.0f}/s "
+              f"({booked} booked, {conflicts} rejected as overlapping or outside hours)")
+
+        start = time.perf_counter()
+        calendars = store.load_day(DAY)
+        print(f"Loaded {len(calendars)} calendars for {DAY} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        days = [calendar.bookings.get(DAY) for calendar in calendars.values()]
+        days = [day for day in days if day is not None]
+        queries = [(rng.choice(days), m, m + rng.choice(DURATIONS))
+                   for m in (rng.randrange(7 * 60, 20 * 60, 15) for _ in range(args.checks))]
+        lists = {id(day): list(day) for day in days}
+
+        start = time.perf_counter()
+        tree_hits = sum(day.overlaps(s, e) for day, s, e in queries)
+        tree_us = (time.perf_counter() - start) * 1e6 / args.checks
+        start = time.perf_counter()
+        linear_hits = sum(_linear_overlaps(lists[id(day)], s, e) for day, s, e in queries)
+        linear_us = (time.perf_counter() - start) * 1e6 / args.checks
+        assert tree_hits == linear_hits
+        average = sum(len(day) for day in days) / max(1, len(days))
+        print(f"Overlap check ({average:.1f} bookings/provider/day): {tree_us:.2f} us sorted intervals, "
+              f"{linear_us:.2f} us linear scan")
+
+        for when in ["09:00", "12:30", "19:00"]:
+            start = time.perf_counter()
+            free = store.find_available_providers(DAY, when, 30)
+            print(f"Providers free at {when} for 30 min: {len(free)} "
+                  f"(searched {len(providers)} in {(time.perf_counter() - start) * 1000:.1f} ms)")
+    finally:
+        close_pool(db_name)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
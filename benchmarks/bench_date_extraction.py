@@ -0,0 +1,139 @@
+"""
+Benchmark date extraction throughput: per-pattern passes vs the compiled extractor.
+
+The baseline is DateExtractionTool.extract_date as it was before its patterns
+were precompiled: up to three passes over every day name, formatting and
+searching a new pattern each time. Both run over the queries of the golden
+corpus (tests/data/date_corpus.jsonl), a mix of dated and undated chat
+messages, and must agree on every one. The compiled extractor runs with its
+memo off; a last row shows the memo serving the same repeated queries.
+
+Usage:
+    python -m benchmarks.bench_date_extraction [--extractions 200000]
+"""
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+from chatbot.tools.date_tool import DateExtractionTool
+from chatbot.tracing import traced
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "data", "date_corpus.jsonl")
+
+
+class _LegacyDateExtractionTool(DateExtractionTool):
+    """The pre-compiled extractor: one re.search per rule and per day name."""
+
+    @traced("date.extract")
+    def extract_date(self, query):
+        query = query.lower()
+
+        date_match = re.search(r"\b(\d{4}-\d{2}-\d{2})\b", query)
+        if date_match:
+            try:
+                return datetime.strptime(date_match.group(1), "%Y-%m-%d").date().isoformat()
+            except ValueError:
+                pass
+
+        for pattern, format_str in [
+            (r"\b(\d{1,2}/\d{1,2}/\d{4})\b", "%m/%d/%Y"),
+            (r"\b(\d{1,2}-\d{1,2}-\d{4})\b", "%m-%d-%Y"),
+            (r"\b(\d{1,2}\.\d{1,2}\.\d{4})\b", "%m.%d.%Y")
+        ]:
+            date_match = re.search(pattern, query)
+            if date_match:
+                try:
+                    return datetime.strptime(date_match.group(1), format_str).date().isoformat()
+                except ValueError:
+                    continue
+
+        if "today" in query:
+            return datetime.now().date().isoformat()
+        elif "tomorrow" in query:
+            return (datetime.now() + timedelta(days=1)).date().isoformat()
+
+        for day_name, day_index in self.day_indices.items():
+            if f"next {day_name}" in query:
+                return self._next_day_of_week(day_index).date().isoformat()
+
+        for day_name, day_index in self.day_indices.items():
+            if f"this {day_name}" in query:
+                today = datetime.now()
+                days_ahead = day_index - today.weekday()
+                if days_ahead < 0:
+                    days_ahead += 7
+                return (today + timedelta(days=days_ahead)).date().isoformat()
+
+        for day_name, day_index in self.day_indices.items():
+            if re.search(f"\\b{day_name}\\b", query):
+                return self._next_day_of_week(day_index).date().isoformat()
+
+        month_day_match = re.search(r"(?:(?:on|for)\s+)?([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?", query)
+        if month_day_match:
+            month_name = month_day_match.group(1).lower()
+            day = int(month_day_match.group(2))
+            if month_name in self.month_names:
+                month = self.month_names[month_name]
+                year = datetime.now().year
+                try:
+                    date_obj = datetime(year, month, day)
+                    if date_obj.date() < datetime.now().date():
+                        date_obj = datetime(year + 1, month, day)
+                    return date_obj.date().isoformat()
+                except ValueError:
+                    pass
+
+        time_delta_match = re.search(r"in\s+(\d+)\s+(day|days|week|weeks|month|months)", query)
+        if time_delta_match:
+            amount = int(time_delta_match.group(1))
+            unit = time_delta_match.group(2)
+            if unit in ["day", "days"]:
+                return (datetime.now() + timedelta(days=amount)).date().isoformat()
+            elif unit in ["week", "weeks"]:
+                return (datetime.now() + timedelta(weeks=amount)).date().isoformat()
+            elif unit in ["month", "months"]:
+                return (datetime.now() + timedelta(days=30*amount)).date().isoformat()
+
+        return None
+
+
+def _time(tool, queries, extractions):
+    start = time.perf_counter()
+    for i in range(extractions):
+        tool.extract_date(queries[i % len(queries)])
+    return extractions / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--extractions", type=int, default=200000)
+    args = parser.parse_args()
+
+    with open(CORPUS) as f:
+        queries = list(dict.fromkeys(json.loads(line)["query"] for line in f))
+
+    legacy, compiled = _LegacyDateExtractionTool(), DateExtractionTool(cache_size=0)
+    mismatches = [q for q in queries if legacy.extract_date(q) != compiled.extract_date(q)]
+    if mismatches:
+        raise SystemExit(f"Extractors disagree on {len(mismatches)} queries, e.g. {mismatches[0]!r}")
+
+    legacy_rate = _time(legacy, queries, args.extractions)
+    compiled_rate = _time(compiled, queries, args.extractions)
+    undated = [q for q in queries if compiled.extract_date(q) is None]
+    legacy_undated = _time(legacy, undated, args.extractions)
+    compiled_undated = _time(compiled, undated, args.extractions)
+    memoized_rate = _time(DateExtractionTool(cache_size=len(queries)), queries, args.extractions)
+
+    print(f"{len(queries)} distinct queries ({len(undated)} without a date), {args.extractions} extractions each")
+    print(f"{'workload':<20} {'per-pattern/s':>14} {'compiled/s':>12} {'speedup':>8}")
+    print(f"{'corpus mix':<20} {legacy_rate:>14.0f} {compiled_rate:>12.0f} {compiled_rate / legacy_rate:>7.2f}x")
+    print(f"{'no date':<20} {legacy_undated:>14.0f} {compiled_undated:>12.0f} "
+          f"{compiled_undated / legacy_undated:>7.2f}x")
+    print(f"{'corpus mix, memo':<20} {legacy_rate:>14.0f} {memoized_rate:>12.0f} {memoized_rate / legacy_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark document questions with and without the persistent LLM response cache.
+
+A stream of questions, drawn with a skew so popular ones repeat, is answered
+by DocumentChatbot's QA chain on a fake LLM with a fixed latency per call.
+It runs once calling the LLM for every question and once with an
+LLMResponseCache on the QA call site, stored in a temporary SQLite file.
+Reports LLM calls, the cache hit ratio and mean latency per question.
+
+Usage:
+    python -m benchmarks.bench_llm_cache [--questions 300] [--distinct 40] [--llm-latency 0.2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import warnings
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from benchmarks.fakes import SlowFakeLLM
+from benchmarks.load_test import DEFAULT_DOCUMENT
+from chatbot.database import close_pool
+from chatbot.document_chatbot import DocumentChatbot
+from chatbot.llm_cache import LLMResponseCache
+from chatbot.repository import MemoryRepository
+
+TOPICS = ["opening hours", "pricing", "data retention", "supported languages", "integrations",
+          "the chat interface", "security", "model updates", "support contacts", "deployment"]
+FORMS = ["What does the document say about {}?", "Summarize {}.", "How does {} work?", "Is there anything on {}?"]
+
+
+def build_questions(count, distinct, seed=0):
+    """Questions drawn from `distinct` templates, the first ones far more often (Zipf-like)"""
+    pool = [form.format(topic) for topic in TOPICS for form in FORMS][:distinct]
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    return random.Random(seed).choices(pool, weights=weights, k=count)
+
+
+def run(questions, vector_store, llm_latency, llm_cache=None):
+    llm = SlowFakeLLM(latency=llm_latency)
+    chatbot = DocumentChatbot(None, llm=llm, vector_store=vector_store, repository=MemoryRepository(),
+                              llm_cache=llm_cache)
+    start = time.perf_counter()
+    for question in questions:
+        chatbot.process_message(question)
+    return time.perf_counter() - start, llm.calls, chatbot.llm_cache_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--distinct", type=int, default=40, help="Different questions in the stream")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--document", default=DEFAULT_DOCUMENT)
+    args = parser.parse_args()
+
+    from chatbot.document_loader import load_documents
+    from chatbot.rag_system import create_vector_store
+
+    questions = build_questions(args.questions, args.distinct)
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "llm_cache.db")
+    warnings.simplefilter("ignore")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Deterministic, so a repeated question retrieves the same context, as with a real model
+            vector_store = create_vector_store(load_documents(args.document),
+                                               embeddings=DeterministicFakeEmbedding(size=64))
+            plain_seconds, plain_calls, _ = run(questions, vector_store, args.llm_latency)
+            cached_seconds, cached_calls, stats = run(questions, vector_store, args.llm_latency,
+                                                      llm_cache=LLMResponseCache(db_name))
+    finally:
+        close_pool(db_name)
+        shutil.rmtree(directory)
+
+    print(f"{args.questions} questions ({len(set(questions))} distinct), "
+          f"{args.llm_latency * 1000:.0f} ms per LLM call")
+    print(f"{'mode':<10} {'LLM calls':>10} {'hit ratio':>10} {'mean ms':>9} {'total s':>9}")
+    print(f"{'no cache':<10} {plain_calls:>10} {'-':>10} {plain_seconds / len(questions) * 1000:>9.2f} "
+          f"{plain_seconds:>9.2f}")
+    print(f"{'cache':<10} {cached_calls:>10} {stats['hit_ratio']:>10.0%} "
+          f"{cached_seconds / len(questions) * 1000:>9.2f} {cached_seconds:>9.2f}")
+    print(f"speedup: {plain_seconds / cached_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark prompt size and memory footprint of the conversation memory modes.
+
+Runs a synthetic 500-turn conversation against each mode in a fresh process
+and reports the history tokens that would reach the prompt plus RSS.
+
+Usage:
+    python -m benchmarks.bench_memory [--turns 500] [--limit 1000]
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+
+from langchain_community.llms import FakeListLLM
+
+from chatbot.memory import MEMORY_MODES, build_memory, count_tokens
+
+
+def _rss_mb():
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _synthetic_turn(i):
+    question = f"Turn {i}: what does section {i % 40} of the document say about retrieval and scheduling? " * 2
+    answer = f"Section {i % 40} explains how chunks are embedded, retrieved and used to answer questions. " * 4
+    return question, answer
+
+
+def run_mode(mode, turns, limit):
+    llm = FakeListLLM(responses=["The user asked about several document sections and booking details."])
+    memory = build_memory(mode, llm=llm, max_token_limit=limit)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    prompt_tokens = []
+    for i in range(turns):
+        question, answer = _synthetic_turn(i)
+        memory.save_context({"input": question}, {"output": answer})
+        if (i + 1) % 50 == 0:
+            prompt_tokens.append(_history_tokens(memory))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "final_prompt_tokens": prompt_tokens[-1] if prompt_tokens else 0,
+        "max_prompt_tokens": max(prompt_tokens) if prompt_tokens else 0,
+        "retained_kb": current / 1024,
+        "peak_kb": peak / 1024,
+        "rss_mb": _rss_mb(),
+        "ms_per_turn": elapsed * 1000 / turns,
+    }
+
+
+def _history_tokens(memory):
+    history = memory.load_memory_variables({})[memory.memory_key]
+    if not isinstance(history, str):
+        history = "\n".join(m.content for m in history)
+    return count_tokens(history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=1000, help="max_token_limit for bounded modes")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'final tok':>10} {'max tok':>10} {'retained KB':>12} {'peak KB':>10} {'RSS MB':>8} {'ms/turn':>8}")
+    with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for mode in MEMORY_MODES:
+            r = pool.apply(run_mode, (mode, args.turns, args.limit))
+            print(f"{r['mode']:<8} {r['final_prompt_tokens']:>10} {r['max_prompt_tokens']:>10} "
+                  f"{r['retained_kb']:>12.1f} {r['peak_kb']:>10.1f} {r['rss_mb']:>8.1f} {r['ms_per_turn']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
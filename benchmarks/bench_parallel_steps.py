@@ -0,0 +1,100 @@
+"""
+Benchmark booking requests with their lookups run one after another vs concurrently.
+
+book_appointment looks up a multi-date offer, the day's free slots and the
+customer's id before it books; none of them needs another's result. The
+repository is MemoryRepository with a fixed delay per call standing in for a
+database round trip. The same booking requests are served with
+SerialExecutor, which runs the lookups in turn, and with the shared thread
+pool from chatbot.steps. Reports mean and p95 latency per request.
+
+Usage:
+    python -m benchmarks.bench_parallel_steps [--requests 200] [--db-delay 0.005]
+"""
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import time
+from unittest.mock import MagicMock
+
+from chatbot.repository import MemoryRepository
+from chatbot.steps import SerialExecutor, get_executor
+from chatbot.tools.booking_tool import AppointmentBookingTool
+from chatbot.tools.date_tool import DateExtractionTool
+
+USER_INFO = {"name": "Bench User", "phone": "9876543210", "email": "bench@example.com"}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+TIMES = ["9 am", "10 am", "11 am", "2 pm", "3 pm", "4 pm"]
+
+
+class DelayedRepository(MemoryRepository):
+    """MemoryRepository that sleeps `delay` seconds per query, like a round trip to a database server"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def get_user_id(self, user_info):
+        time.sleep(self.delay)
+        return super().get_user_id(user_info)
+
+    def booked_times(self, date_str):
+        time.sleep(self.delay)
+        return super().booked_times(date_str)
+
+    def iter_booked(self, start_date, end_date):
+        time.sleep(self.delay)
+        return super().iter_booked(start_date, end_date)
+
+    def reserve_slot(self, user_id, date_str, time_str):
+        time.sleep(self.delay)
+        return super().reserve_slot(user_id, date_str, time_str)
+
+
+def build_requests(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice([
+        f"Book an appointment next {rng.choice(WEEKDAYS)} at {rng.choice(TIMES)}",
+        f"Can I come in next {rng.choice(WEEKDAYS)}?",
+        f"Next {rng.choice(WEEKDAYS)} or {rng.choice(WEEKDAYS)} in the afternoon",
+    ]) for _ in range(count)]
+
+
+def run(requests, db_delay, executor):
+    collector = MagicMock()
+    collector.get_user_info.return_value = USER_INFO
+    repository = DelayedRepository(db_delay)
+    repository.upsert_customer(USER_INFO["name"], USER_INFO["phone"], USER_INFO["email"])
+    tool = AppointmentBookingTool(collector, DateExtractionTool(), repository=repository, step_executor=executor)
+    latencies = []
+    for message in requests:
+        start = time.perf_counter()
+        tool.book_appointment(message)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--db-delay", type=float, default=0.005, help="Seconds per repository call")
+    args = parser.parse_args()
+
+    requests = build_requests(args.requests)
+    # The tool prints its errors; the timings are what matters here
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial = run(requests, args.db_delay, SerialExecutor())
+        parallel = run(requests, args.db_delay, get_executor())
+
+    print(f"{args.requests} booking requests, {args.db_delay * 1000:.1f} ms per repository call")
+    print(f"{'lookups':<12} {'mean ms':>9} {'p95 ms':>9} {'total s':>9}")
+    for label, latencies in [("serial", serial), ("concurrent", parallel)]:
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{label:<12} {statistics.mean(latencies) * 1000:>9.2f} {p95 * 1000:>9.2f} {sum(latencies):>9.2f}")
+    print(f"speedup: {sum(serial) / sum(parallel):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the fast-path planner against sending every tool request to the ReAct agent.
+
+The agent from setup_agent runs on a fake LLM with a fixed latency per call,
+scripted to do what a tool request costs at least: one round trip to choose
+a tool and one to write the answer. A mix of booking, cancel and reschedule
+requests, some of them ambiguous, is served twice: by the agent alone, and by
+FastPathPlanner, which only asks the agent about the ambiguous ones. Reports
+the share served without any LLM call, LLM calls, mean latency per request
+and the total latency saved.
+
+Usage:
+    python -m benchmarks.bench_planner [--requests 100] [--ambiguous 0.1] [--llm-latency 0.1]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import warnings
+from unittest.mock import MagicMock
+
+from benchmarks.fakes import SlowFakeLLM
+from chatbot.agent import setup_agent
+from chatbot.planner import FastPathPlanner
+from chatbot.repository import MemoryRepository
+from chatbot.tools.booking_tool import AppointmentBookingTool
+from chatbot.tools.date_tool import DateExtractionTool
+
+USER_INFO = {"name": "Bench User", "phone": "9876543210", "email": "bench@example.com"}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+TIMES = ["9 am", "10 am", "11 am", "2 pm", "3 pm", "4 pm"]
+# The agent's choice of tool doesn't change its cost: two LLM round trips per request
+TOOL_CALL = 'Action:\n```\n{"action": "DateExtraction", "action_input": "the requested date"}\n```'
+FINAL_ANSWER = 'Action:\n```\n{"action": "Final Answer", "action_input": "Done."}\n```'
+
+
+def build_requests(count, ambiguous, seed=0):
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        day, slot = rng.choice(WEEKDAYS), rng.choice(TIMES)
+        if rng.random() < ambiguous:
+            requests.append(f"Cancel my {day} appointment and book {rng.choice(WEEKDAYS)} at {slot} instead")
+            continue
+        requests.append(rng.choice([
+            f"Book an appointment next {day} at {slot}",
+            f"Can I schedule a meeting on {day}?",
+            f"Please move my appointment to next {day} at {slot}",
+            "Cancel my appointment",
+            "I'd like to book an appointment",
+        ]))
+    return requests
+
+
+def _session(llm_latency):
+    llm = SlowFakeLLM(responses=[TOOL_CALL, FINAL_ANSWER], latency=llm_latency)
+    collector = MagicMock()
+    collector.get_user_info.return_value = USER_INFO
+    collector.start_collection.return_value = "May I have your name first?"
+    date_tool = DateExtractionTool()
+    booking_tool = AppointmentBookingTool(collector, date_tool, repository=MemoryRepository())
+    agent = setup_agent(llm, collector, date_tool, booking_tool)
+    agent.verbose = False
+    return llm, FastPathPlanner(collector, date_tool, booking_tool, agent=agent)
+
+
+def run_agent_only(requests, llm_latency):
+    llm, planner = _session(llm_latency)
+    start = time.perf_counter()
+    for message in requests:
+        planner.agent({"input": message})
+    return time.perf_counter() - start, llm.calls, 0
+
+
+def run_planner(requests, llm_latency):
+    llm, planner = _session(llm_latency)
+    start = time.perf_counter()
+    for message in requests:
+        planner.execute(planner.plan(message), message)
+    return time.perf_counter() - start, llm.calls, planner.stats()["fast_path"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--ambiguous", type=float, default=0.1, help="Share of requests with two intents")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="Seconds per fake LLM call")
+    args = parser.parse_args()
+
+    requests = build_requests(args.requests, args.ambiguous)
+    warnings.simplefilter("ignore")
+    # The tools print their errors; the timings are what matters here
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent_seconds, agent_calls, _ = run_agent_only(requests, args.llm_latency)
+        planner_seconds, planner_calls, fast_path = run_planner(requests, args.llm_latency)
+
+    print(f"{args.requests} tool requests ({args.ambiguous:.0%} ambiguous), {args.llm_latency * 1000:.0f} ms per LLM call")
+    print(f"{'mode':<12} {'no LLM':>8} {'LLM calls':>10} {'mean ms':>9} {'total s':>9}")
+    print(f"{'agent only':<12} {0:>8.0%} {agent_calls:>10} {agent_seconds / len(requests) * 1000:>9.2f} "
+          f"{agent_seconds:>9.2f}")
+    print(f"{'planner':<12} {fast_path / len(requests):>8.0%} {planner_calls:>10} "
+          f"{planner_seconds / len(requests) * 1000:>9.2f} {planner_seconds:>9.2f}")
+    print(f"latency saved: {agent_seconds - planner_seconds:.2f} s ({agent_seconds / planner_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark time parsing: the compiled time parser vs dateutil and the old booking regex.
+
+Two workloads. Replies to "what time?" ("10 AM", "2:30 pm", "14:30") were
+parsed with dateutil.parser.parse in UserInfoCollector.validate_time; they
+are now parsed with time_parser.parse_time. Booking messages ("Book March 15
+at 2pm") were parsed by the first-number regex and _parse_time of
+AppointmentBookingTool; they are now parsed with time_parser.match_time.
+Both use the time corpus (tests/data/time_corpus.jsonl), and each parser's
+accuracy against it is reported next to its speed.
+
+Usage:
+    python -m benchmarks.bench_time_parsing [--parses 100000]
+"""
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from dateutil import parser as date_parser
+
+from chatbot.tools.time_parser import match_time, parse_time
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "data", "time_corpus.jsonl")
+
+
+def _dateutil_time(text):
+    """UserInfoCollector.validate_time before the time parser"""
+    try:
+        return date_parser.parse(text).time().strftime("%H:%M")
+    except Exception:
+        return None
+
+
+def _legacy_query_time(query):
+    """AppointmentBookingTool.extract_time_from_query and _parse_time before the time parser"""
+    match = re.search(r'\b(?:at|for|@)?\s*(\d{1,2}(?::\d{2})?\s*(?:AM|PM|am|pm)?)\b', query, re.IGNORECASE)
+    if not match:
+        return None
+    try:
+        time_str = match.group(1).strip().upper()
+        if "AM" not in time_str and "PM" not in time_str:
+            hour = int(re.search(r'\d+', time_str).group())
+            time_str += " AM" if hour < 12 else " PM"
+        if ":" not in time_str:
+            parts = time_str.split()
+            time_str = f"{parts[0]}:00 {parts[1]}"
+        return datetime.strptime(time_str, "%I:%M %p").strftime("%H:%M")
+    except Exception:
+        return None
+
+
+def _query_time(query):
+    found = match_time(query)
+    return found.exact if found else None
+
+
+def _measure(parse, inputs, expected, parses):
+    correct = sum(parse(text) == want for text, want in zip(inputs, expected))
+    start = time.perf_counter()
+    for i in range(parses):
+        parse(inputs[i % len(inputs)])
+    return parses / (time.perf_counter() - start), correct / len(inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parses", type=int, default=100000)
+    args = parser.parse_args()
+
+    with open(CORPUS) as f:
+        cases = [json.loads(line) for line in f]
+    # Replies: the corpus replies, and every exact time in the corpus written on its own
+    replies = [(c["reply"], c["time"]) for c in cases if "reply" in c]
+    replies += [(c["time"][3], c["time"][0]) for c in cases
+                if "query" in c and c["time"] and c["time"][2] == "exact"]
+    # Messages: the exact time each should book, None for ranges and messages without a time
+    messages = [(c["query"], c["time"][0] if c["time"] and c["time"][2] == "exact" else None)
+                for c in cases if "query" in c]
+
+    rows = []
+    for workload, pairs, old_name, old_parse, new_parse in [
+        ("replies", replies, "dateutil", _dateutil_time, parse_time),
+        ("messages", messages, "first-number regex", _legacy_query_time, _query_time),
+    ]:
+        inputs, expected = [p[0] for p in pairs], [p[1] for p in pairs]
+        old_rate, old_accuracy = _measure(old_parse, inputs, expected, args.parses)
+        new_rate, new_accuracy = _measure(new_parse, inputs, expected, args.parses)
+        rows.append((f"{workload} ({len(pairs)})", old_name, old_rate, old_accuracy, new_rate, new_accuracy))
+
+    print(f"{args.parses} parses per workload")
+    print(f"{'workload':<16} {'baseline':<20} {'baseline/s':>11} {'correct':>8} {'compiled/s':>11} {'correct':>8} "
+          f"{'speedup':>8}")
+    for workload, old_name, old_rate, old_accuracy, new_rate, new_accuracy in rows:
+        print(f"{workload:<16} {old_name:<20} {old_rate:>11.0f} {old_accuracy:>8.0%} {new_rate:>11.0f} "
+              f"{new_accuracy:>8.0%} {new_rate / old_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
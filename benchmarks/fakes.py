@@ -0,0 +1,45 @@
+"""Fake LLM and embedding backends with configurable latency for benchmarks."""
+import time
+from typing import Any, List, Mapping, Optional
+
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_core.language_models.llms import LLM
+
+
+class SlowFakeLLM(LLM):
+    """Fake LLM that sleeps for `latency` seconds per call and cycles through `responses`."""
+
+    responses: List[str] = ["This is a synthetic answer based on the document."]
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        response = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return response
+
+    @property
+    def _identifying_params(self) -> Mapping[str, Any]:
+        return {"responses": self.responses, "latency": self.latency}
+
+
+class SlowFakeEmbeddings(FakeEmbeddings):
+    """Random embeddings that sleep for `latency` seconds per embedding request."""
+
+    latency: float = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return super().embed_query(text)
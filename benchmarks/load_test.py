@@ -0,0 +1,239 @@
+"""
+Drive many concurrent synthetic conversations through DocumentChatbot.process_message.
+
+Sessions mix document Q&A, multi-turn contact info collection and bookings,
+using fake LLM/embedding backends with configurable latency and one shared
+store: the in-memory repository by default, or a SQLite file with --db.
+Reports throughput, tail latency, SQLite lock errors and memory per session.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 50] [--concurrency 16] [--llm-latency 0.2] [--db FILE]
+"""
+import argparse
+import io
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+from benchmarks.fakes import SlowFakeEmbeddings, SlowFakeLLM
+from chatbot.document_chatbot import DocumentChatbot
+from chatbot.repository import MemoryRepository
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCUMENT = os.path.join(REPO_ROOT, "temp_uploads", "AI Chatbot Technology Overview.pdf")
+
+QUESTIONS = [
+    "What is an AI chatbot?",
+    "How do chatbots understand natural language?",
+    "What are the benefits of chatbots for businesses?",
+    "What challenges do chatbots face?",
+]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+TIMES = ["9 am", "10 am", "11 am", "12 pm", "1 pm", "2 pm", "3 pm", "4 pm", "5 pm"]
+
+
+def _contact_turns(rng, session_id):
+    return [
+        f"User {session_id}",
+        f"98{rng.randrange(10**8):08d}",
+        f"user{session_id}@example.com",
+        f"next {rng.choice(WEEKDAYS)}",
+        rng.choice(TIMES),
+    ]
+
+
+def build_script(kind, rng, session_id):
+    """
+    Build the list of user messages for one synthetic conversation
+
+    Args:
+        kind (str): "qa", "info" or "booking"
+        rng (random.Random): Source of randomness
+        session_id (int): Session number, used to make contact details unique
+
+    Returns:
+        list: (route, message) pairs
+    """
+    if kind == "qa":
+        return [("qa", q) for q in rng.sample(QUESTIONS, 3)]
+    if kind == "info":
+        return [("info", "Please call me")] + [("info", m) for m in _contact_turns(rng, session_id)]
+    # Booking: collect contact details first, then book a specific slot
+    booking = f"Book an appointment on {rng.choice(WEEKDAYS)} at {rng.choice(TIMES)}"
+    return ([("info", "Can you contact me?")] + [("info", m) for m in _contact_turns(rng, session_id)]
+            + [("booking", booking)])
+
+
+class _ErrorCountingStream(io.TextIOBase):
+    """Swallows the tools' print() output while counting database errors."""
+
+    def __init__(self):
+        self.lock_errors = 0
+        self.db_errors = 0
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        lowered = text.lower()
+        if "database is locked" in lowered or "database is busy" in lowered:
+            with self._lock:
+                self.lock_errors += 1
+        elif "sqlite" in lowered or "db " in lowered or "database" in lowered:
+            with self._lock:
+                self.db_errors += 1
+        return len(text)
+
+
+def _current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_load_test(sessions=50, concurrency=16, llm_latency=0.2, embed_latency=0.01,
+                  mix=(0.4, 0.3, 0.3), db_name=None, document=DEFAULT_DOCUMENT, seed=0):
+    """
+    Run the load test and return its report
+
+    Args:
+        sessions (int): Number of synthetic conversations
+        concurrency (int): Conversations running at the same time
+        llm_latency (float): Seconds per fake LLM call
+        embed_latency (float): Seconds per fake embedding request
+        mix (tuple): Weights of (qa, info, booking) conversations
+        db_name (str, optional): SQLite file shared by all sessions; by default they share a MemoryRepository
+        document (str): Document loaded into the shared vector store
+        seed (int): Random seed for the conversation mix
+
+    Returns:
+        dict: Throughput, latency percentiles per route, error counts and memory per session
+    """
+    from chatbot.document_loader import load_documents
+    from chatbot.rag_system import create_vector_store
+
+    rng = random.Random(seed)
+    repository = None if db_name else MemoryRepository()
+    llm = SlowFakeLLM(latency=llm_latency)
+    embeddings = SlowFakeEmbeddings(size=64, latency=embed_latency)
+    stream = _ErrorCountingStream()
+
+    with redirect_stdout(stream):
+        vector_store = create_vector_store(load_documents(document), embeddings=embeddings)
+        plans = [
+            build_script(rng.choices(["qa", "info", "booking"], weights=mix)[0], random.Random(seed + i), i)
+            for i in range(sessions)
+        ]
+
+        latencies = {}
+        failures = []
+        chatbots = []
+        results_lock = threading.Lock()
+        rss_before = _current_rss_mb()
+
+        def run_session(script):
+            chatbot = DocumentChatbot(None, llm=llm, vector_store=vector_store, db_name=db_name,
+                                      repository=repository)
+            for route, message in script:
+                start = time.perf_counter()
+                try:
+                    reply = chatbot.process_message(message)
+                    error = None
+                except Exception as e:
+                    reply, error = None, e
+                elapsed = time.perf_counter() - start
+                with results_lock:
+                    latencies.setdefault(route, []).append(elapsed)
+                    if error is not None or reply is None or "error" in reply.lower() or "couldn't save" in reply:
+                        failures.append((route, message, error or reply))
+            with results_lock:
+                chatbots.append(chatbot)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run_session, plans))
+        wall = time.perf_counter() - start
+        rss_after = _current_rss_mb()
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    report = {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "turns": len(all_latencies),
+        "wall_seconds": wall,
+        "turns_per_second": len(all_latencies) / wall if wall else 0.0,
+        "latency": {
+            route: {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+                "max": max(values),
+            }
+            for route, values in sorted(latencies.items()) + [("all", all_latencies)] if values
+        },
+        "lock_errors": stream.lock_errors,
+        "other_db_errors": stream.db_errors,
+        "failed_turns": len(failures),
+        "rss_mb_per_session": max(0.0, rss_after - rss_before) / sessions if sessions else 0.0,
+        "memory_tokens_per_session": sum(
+            sum(s.get("buffer_tokens", 0) for s in bot.memory_stats().values()) for bot in chatbots
+        ) / max(1, len(chatbots)),
+        "llm_calls": llm.calls,
+        "tool_requests": sum(bot.planner_stats()["requests"] for bot in chatbots),
+        "tool_requests_without_llm": sum(bot.planner_stats()["fast_path"] for bot in chatbots),
+    }
+    return report
+
+
+def print_report(report):
+    print(f"Sessions: {report['sessions']} (concurrency {report['concurrency']}), turns: {report['turns']}")
+    print(f"Wall time: {report['wall_seconds']:.2f} s, throughput: {report['turns_per_second']:.1f} turns/s")
+    print(f"{'route':<8} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route, stats in report["latency"].items():
+        print(f"{route:<8} {stats['count']:>6} {stats['p50'] * 1000:>9.1f} {stats['p95'] * 1000:>9.1f} "
+              f"{stats['p99'] * 1000:>9.1f} {stats['max'] * 1000:>9.1f}")
+    print(f"SQLite lock errors: {report['lock_errors']}, other DB errors: {report['other_db_errors']}, "
+          f"failed turns: {report['failed_turns']}")
+    print(f"Memory per session: {report['rss_mb_per_session']:.2f} MB RSS, "
+          f"{report['memory_tokens_per_session']:.0f} buffered memory tokens")
+    print(f"Tool requests served without an LLM call: {report['tool_requests_without_llm']} "
+          f"of {report['tool_requests']}, LLM calls: {report['llm_calls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--embed-latency", type=float, default=0.01, help="Seconds per fake embedding call")
+    parser.add_argument("--mix", default="0.4,0.3,0.3", help="Weights of qa,info,booking conversations")
+    parser.add_argument("--db", default=None, help="SQLite file shared by all sessions (default: in-memory store)")
+    parser.add_argument("--document", default=DEFAULT_DOCUMENT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run_load_test(
+        sessions=args.sessions, concurrency=args.concurrency, llm_latency=args.llm_latency,
+        embed_latency=args.embed_latency, mix=tuple(float(w) for w in args.mix.split(",")),
+        db_name=args.db, document=args.document, seed=args.seed
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Profile cold-start cost: import time per module and time to first render.
+
+Each measurement runs in a fresh interpreter with ``-X importtime`` so nothing
+is served from an already-warm ``sys.modules``.
+
+Usage:
+    python -m benchmarks.profile_startup [--top 25] [--module chatbot.agent ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "chatbot.document_loader",
+    "chatbot.rag_system",
+    "chatbot.user_info",
+    "chatbot.agent",
+    "chatbot.memory",
+    "chatbot.tools.date_tool",
+    "chatbot.tools.booking_tool",
+]
+
+# Renders app.py once through Streamlit's headless test runner, which executes
+# the script exactly as the server would on a new session.
+RENDER_SCRIPT = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(f"render failed: {at.exception[0].message}")
+print(f"RENDER_SECONDS={elapsed:.4f}")
+"""
+
+
+def _run(code):
+    """Run code in a fresh interpreter with -X importtime and return (stdout, import rows)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    rows = []
+    other = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header row
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    if proc.returncode != 0:
+        raise RuntimeError("\n".join(other[-5:]) or proc.stdout)
+    return proc.stdout, rows
+
+
+def import_profile(module):
+    """
+    Measure the cost of importing a module in a cold interpreter
+
+    Args:
+        module (str): Dotted module name
+
+    Returns:
+        tuple: (total seconds, list of (module, self_us, cumulative_us) rows)
+    """
+    _, rows = _run(f"import {module}")
+    own = [r for r in rows if r[0] == module]
+    total_us = own[-1][2] if own else sum(r[1] for r in rows)
+    return total_us / 1e6, rows
+
+
+def render_profile():
+    """
+    Measure time to first render of app.py
+
+    Returns:
+        tuple: (seconds to first render, import rows recorded during the render)
+    """
+    stdout, rows = _run(RENDER_SCRIPT)
+    for line in stdout.splitlines():
+        if line.startswith("RENDER_SECONDS="):
+            return float(line.split("=", 1)[1]), rows
+    raise RuntimeError(f"Render time not reported: {stdout}")
+
+
+def _top_level(name):
+    return name.strip().split(".")[0]
+
+
+def print_heaviest(rows, top):
+    """Print the top-level packages with the largest self import time"""
+    totals = {}
+    for name, self_us, _ in rows:
+        totals[_top_level(name)] = totals.get(_top_level(name), 0) + self_us
+    for name, us in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {name:<40} {us / 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15, help="Packages to list per measurement")
+    parser.add_argument("--module", action="append", dest="modules",
+                        help="Module to profile (repeatable, defaults to all chatbot modules)")
+    parser.add_argument("--skip-render", action="store_true", help="Only profile module imports")
+    args = parser.parse_args()
+
+    print("Cold import time per module")
+    for module in args.modules or DEFAULT_MODULES:
+        try:
+            seconds, _ = import_profile(module)
+            print(f"  {module:<40} {seconds * 1000:>10.1f} ms")
+        except RuntimeError as e:
+            print(f"  {module:<40} failed: {e}")
+
+    if args.skip_render:
+        return
+
+    print("\nTime to first render of app.py")
+    try:
+        seconds, rows = render_profile()
+    except RuntimeError as e:
+        print(f"  failed: {e}")
+        return
+    print(f"  {'first render':<40} {seconds * 1000:>10.1f} ms")
+    print("\nHeaviest packages imported before first render (self time)")
+    print_heaviest(rows, args.top)
+
+
+if __name__ == "__main__":
+    main()
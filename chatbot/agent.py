@@ -49,9 +49,8 @@
 # ------------------------------------------- Advanced agent --------------------------------------------------
 
 # agent.py
-from langchain.agents import Tool, initialize_agent
-from langchain.agents import AgentType
-from langchain.tools import BaseTool
+# langchain.agents is slow to import, so it is loaded inside setup_agent
+from langchain_core.tools import BaseTool
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 import re
@@ -110,6 +109,9 @@ def setup_agent(llm, user_info_collector: UserInfoCollector, date_tool: DateExtr
     Returns:
         AgentExecutor: Initialized agent
     """
+    from langchain.agents import Tool, initialize_agent
+    from langchain.agents import AgentType
+
     # Define tools
     tools = [
         Tool(
@@ -122,6 +124,16 @@ def setup_agent(llm, user_info_collector: UserInfoCollector, date_tool: DateExtr
             func=booking_tool.book_appointment,
             description="Books appointments. Requires date/time and service type."
         ),
+        Tool(
+            name="AppointmentCancellation",
+            func=booking_tool.cancel_booking,
+            description="Cancels the user's appointment. Pass the user's message, including the date if they gave one."
+        ),
+        Tool(
+            name="AppointmentReschedule",
+            func=booking_tool.reschedule_booking,
+            description="Moves the user's appointment to a new date and time given in the user's message."
+        ),
         Tool(
             name="UserInfoCollection",
             func=user_info_collector.start_collection,
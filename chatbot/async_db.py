@@ -0,0 +1,205 @@
+"""
+Non-blocking database access for asyncio callers.
+
+AsyncDatabase runs every query on one dedicated executor thread fed by a
+request queue, so a locked database never stalls the event loop. The thread
+drains whatever requests are waiting and runs them in a single transaction,
+each inside its own savepoint, then commits once: many concurrent bookings
+share one commit (and one fsync) instead of paying for their own.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+from chatbot.database import BUSY_TIMEOUT_MS, SYNCHRONOUS, ConnectionPool, DatabaseLockedError, get_pool, is_lock_error
+from chatbot.migrations import migrate
+from chatbot.repository import claim_slot, find_customer_id, save_contact_request, select_booked_times
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_DELAY = 0.001  # Seconds a batch waits for company; bounds the latency added to a lone request
+
+
+def _save_appointment(conn, user_id, date_str, time_str):
+    return claim_slot(conn, user_id, date_str, time_str) is not None
+
+
+# name -> (function, factory for the value returned when the request fails)
+OPERATIONS = {
+    "save_user": (save_contact_request, lambda: None),
+    "get_user_id": (find_customer_id, lambda: None),
+    "get_booked_slots": (select_booked_times, list),
+    "save_appointment": (_save_appointment, lambda: False),
+}
+
+
+class AsyncDatabase:
+    """
+    Async versions of the booking and user-info queries, with group commit.
+
+    Args:
+        db_name (str): Path to the SQLite database
+        max_batch (int): Most requests sharing one transaction
+        max_delay (float): Seconds to wait for more requests before committing a batch;
+            0 only batches requests that are already queued
+        synchronous (str): SQLite synchronous setting for the executor's connection
+        busy_timeout_ms (int): How long a batch waits for another connection's write lock
+    """
+
+    def __init__(self, db_name='user_info.db', max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+                 synchronous=SYNCHRONOUS, busy_timeout_ms=BUSY_TIMEOUT_MS):
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        shared = get_pool(db_name)
+        self._pool = shared if shared.in_memory else ConnectionPool(
+            db_name, size=1, busy_timeout_ms=busy_timeout_ms, synchronous=synchronous)
+        migrate(self._pool)
+        self._requests = queue.SimpleQueue()
+        self.requests = 0
+        self.commits = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chatbot-db", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, *args):
+        """
+        Queue a request from any thread
+
+        Args:
+            operation (str): Name of an entry in OPERATIONS
+            *args: Arguments for the operation
+
+        Returns:
+            concurrent.futures.Future: Resolves with the result once its batch has committed, or with
+                DatabaseLockedError if the batch couldn't take the write lock
+        """
+        if self._closed:
+            raise RuntimeError("AsyncDatabase is closed")
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}'")
+        future = Future()
+        self._requests.put((operation, args, future))
+        return future
+
+    async def _call(self, operation, *args):
+        return await asyncio.wrap_future(self.submit(operation, *args))
+
+    async def save_user(self, user_info):
+        """Record a contact form and upsert its customer; returns the customer ID, or None on error"""
+        return await self._call("save_user", user_info)
+
+    async def get_user_id(self, user_info):
+        """ID of the customer with user_info's normalized email and phone, or None"""
+        return await self._call("get_user_id", user_info)
+
+    async def get_booked_slots(self, date_str):
+        """Times (HH:MM) of confirmed appointments on date_str, in order"""
+        return await self._call("get_booked_slots", date_str)
+
+    async def save_appointment(self, user_id, date_str, time_str):
+        """
+        Insert a confirmed appointment
+
+        Returns:
+            bool: False if the slot is taken or on error
+
+        Raises:
+            DatabaseLockedError: If another connection held the write lock past the busy timeout
+        """
+        return await self._call("save_appointment", user_id, date_str, time_str)
+
+    def _next_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Finish this batch, then stop
+                self._requests.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _execute(self, batch):
+        results = []
+        started = time.monotonic()
+        try:
+            with self._pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for operation, args, future in batch:
+                    function, failed = OPERATIONS[operation]
+                    # A failing request only rolls back its own savepoint
+                    conn.execute("SAVEPOINT request")
+                    try:
+                        result = function(conn, *args)
+                        conn.execute("RELEASE request")
+                    except Exception as e:
+                        print(f"Async {operation} error: {e}")
+                        conn.execute("ROLLBACK TO request")
+                        conn.execute("RELEASE request")
+                        result = failed()
+                    results.append((future, result))
+            self.commits += 1
+        except Exception as e:
+            if is_lock_error(e):
+                # Busy, not refused: callers must be able to tell this from a taken slot
+                self.requests += len(batch)
+                for operation, _, future in batch:
+                    self._deliver(future, error=DatabaseLockedError(operation, 1, time.monotonic() - started))
+                return
+            print(f"Async database batch error: {e}")
+            results = [(future, OPERATIONS[operation][1]()) for operation, _, future in batch]
+        self.requests += len(batch)
+        for future, result in results:
+            self._deliver(future, result)
+
+    @staticmethod
+    def _deliver(future, result=None, error=None):
+        # A future that can't take its result must never stop the executor thread
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError as e:
+            print(f"Async database result dropped: {e}")
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            # Claim each future; requests whose caller already gave up are skipped
+            batch = [item for item in self._next_batch(request) if item[2].set_running_or_notify_cancel()]
+            if batch:
+                self._execute(batch)
+
+    def stats(self):
+        """Requests served and transactions committed so far"""
+        return {"requests": self.requests, "commits": self.commits,
+                "requests_per_commit": self.requests / self.commits if self.commits else 0.0}
+
+    def close(self):
+        """Finish queued requests, then stop the executor thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(None)
+        self._thread.join()
+        if self._pool is not get_pool(self.db_name):
+            self._pool.close()
+
+    async def aclose(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,308 @@
+"""
+Bulk import and export of appointments and users.
+
+Imports read CSV or JSONL records and insert them in batches with
+``executemany``, one ``BEGIN IMMEDIATE`` transaction per batch. Rows that
+would double-book a confirmed slot, or that are malformed, are skipped and
+reported rather than aborting the import.
+
+Exports stream rows with keyset pagination (``WHERE id > ? ORDER BY id LIMIT ?``),
+so memory use stays constant whatever the table size.
+
+Usage:
+    python -m chatbot.bulk_io import legacy.csv [--db user_info.db]
+    python -m chatbot.bulk_io export appointments appointments.jsonl [--db user_info.db]
+"""
+import argparse
+import csv
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from chatbot.database import get_pool
+from chatbot.migrations import migrate
+from chatbot.repository import upsert_customer
+from chatbot.tracing import traced
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 1000
+FORMATS = ("csv", "jsonl")
+
+# Columns written by the exports, in order
+EXPORT_COLUMNS = {
+    "appointments": ["id", "user_id", "date", "time", "status", "created_at"],
+    "user_data": ["id", "name", "phone", "email", "date", "time", "created_at", "status", "customer_id"],
+    "customers": ["id", "name", "phone", "email", "created_at", "updated_at"],
+}
+
+
+def _detect_format(path, fmt):
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}', expected one of {FORMATS}")
+        return fmt
+    extension = os.path.splitext(str(path))[1].lower().lstrip(".")
+    if extension == "json":
+        extension = "jsonl"
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot tell the format of '{path}', pass fmt='csv' or fmt='jsonl'")
+    return extension
+
+
+@contextmanager
+def _open(target, mode):
+    # Accept either a path or an already open text file
+    if hasattr(target, "read") or hasattr(target, "write"):
+        yield target
+    else:
+        with open(target, mode, newline="", encoding="utf-8") as f:
+            yield f
+
+
+def _read_records(f, fmt):
+    """Yield (line_number, record dict) pairs; unparseable JSONL lines yield the error instead"""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f"invalid JSON: {e.msg}")
+
+
+def _validate(record):
+    """Return (user_id or identity tuple, date, time, status, created_at) for a record, or raise ValueError"""
+    date_str = str(record.get("date") or "").strip()
+    time_str = str(record.get("time") or "").strip()
+    datetime.strptime(date_str, "%Y-%m-%d")
+    time_str = datetime.strptime(time_str, "%H:%M").strftime("%H:%M")
+
+    if record.get("user_id") not in (None, ""):
+        user = int(record["user_id"])
+    else:
+        user = tuple(str(record.get(field) or "").strip() for field in ("name", "phone", "email"))
+        if not all(user):
+            raise ValueError("need user_id or name, phone and email")
+
+    status = str(record.get("status") or "confirmed").strip().lower()
+    created_at = str(record.get("created_at") or "").strip() or datetime.now().isoformat()
+    return user, date_str, time_str, status, created_at
+
+
+def _resolve_users(conn, rows, user_ids):
+    """Replace (name, phone, email) identities in rows with customer IDs, creating or updating customers"""
+    for row in rows:
+        user = row[1]
+        if not isinstance(user, tuple):
+            continue
+        if user not in user_ids:
+            user_ids[user] = upsert_customer(conn, *user, now=row[5])
+        row[1] = user_ids[user]
+
+
+def _drop_unknown_customers(conn, batch, report):
+    """Report and remove rows whose user_id is not a customer; foreign keys aren't enforced"""
+    ids = sorted({row[1] for row in batch if not isinstance(row[1], tuple)})
+    if not ids:
+        return batch
+    placeholders = ",".join("?" * len(ids))
+    known = {row[0] for row in conn.execute(f"SELECT id FROM customers WHERE id IN ({placeholders})", ids)}
+    kept = []
+    for row in batch:
+        if isinstance(row[1], tuple) or row[1] in known:
+            kept.append(row)
+        else:
+            report["errors"].append({"line": row[0], "error": f"unknown customer {row[1]}"})
+    return kept
+
+
+def _import_batch(pool, batch, report, user_ids):
+    with pool.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        batch = _drop_unknown_customers(conn, batch, report)
+        confirmed = [row for row in batch if row[4] == "confirmed"]
+        dates = sorted({row[2] for row in confirmed})
+        taken = set()
+        if dates:
+            placeholders = ",".join("?" * len(dates))
+            taken = set(conn.execute(
+                f"SELECT date, time FROM appointments WHERE status = 'confirmed' AND date IN ({placeholders})",
+                dates
+            ))
+
+        accepted = []
+        for row in batch:
+            line_number, _, date_str, time_str, status, _ = row
+            if status == "confirmed":
+                if (date_str, time_str) in taken:
+                    report["conflicts"].append({
+                        "line": line_number, "date": date_str, "time": time_str, "reason": "slot already booked"
+                    })
+                    continue
+                taken.add((date_str, time_str))
+            accepted.append(row)
+
+        _resolve_users(conn, accepted, user_ids)
+        conn.executemany('''
+            INSERT INTO appointments (user_id, date, time, status, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (row[1:] for row in accepted))
+    report["imported"] += len(accepted)
+
+
+@traced("bulk.import_appointments")
+def import_appointments(source, db_name='user_info.db', fmt=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import appointments from a CSV or JSONL file
+
+    Each record needs `date` (YYYY-MM-DD), `time` (HH:MM) and either the
+    `user_id` of an existing customer or `name`, `phone` and `email`, which
+    are upserted as a customer. `status` (case-insensitive) defaults to
+    "confirmed" and `created_at` to the import time.
+
+    Args:
+        source (str or file): Path or open text file to read
+        db_name (str): Path to the SQLite database
+        fmt (str, optional): "csv" or "jsonl", detected from the file extension by default
+        batch_size (int): Rows inserted per transaction
+
+    Returns:
+        dict: Number of rows "imported", plus lists of "conflicts" (slot already
+            booked) and "errors" (malformed rows and unknown customers), each with the
+            source line number
+    """
+    fmt = _detect_format(getattr(source, "name", source), fmt)
+    pool = get_pool(db_name)
+    migrate(pool)
+
+    report = {"imported": 0, "conflicts": [], "errors": []}
+    user_ids = {}
+    batch = []
+    with _open(source, "r") as f:
+        for line_number, record in _read_records(f, fmt):
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                batch.append([line_number, *_validate(record)])
+            except (ValueError, TypeError, AttributeError) as e:
+                report["errors"].append({"line": line_number, "error": str(e)})
+                continue
+            if len(batch) >= batch_size:
+                _import_batch(pool, batch, report, user_ids)
+                batch = []
+        if batch:
+            _import_batch(pool, batch, report, user_ids)
+    return report
+
+
+def iter_rows(db_name, table, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Stream every row of a table in id order, one page per query
+
+    Args:
+        db_name (str): Path to the SQLite database
+        table (str): "appointments", "user_data" or "customers"
+        page_size (int): Rows fetched per query
+
+    Yields:
+        dict: One row, keyed by column name
+    """
+    if table not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown table '{table}', expected one of {list(EXPORT_COLUMNS)}")
+    columns = EXPORT_COLUMNS[table]
+    pool = get_pool(db_name)
+    query = f"SELECT {', '.join(columns)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?"
+
+    last_id = 0
+    while True:
+        # Borrow a connection per page so a slow consumer never pins one
+        with pool.connection() as conn:
+            page = conn.execute(query, (last_id, page_size)).fetchall()
+        for row in page:
+            yield dict(zip(columns, row))
+        if len(page) < page_size:
+            return
+        last_id = page[-1][0]
+
+
+@traced("bulk.export")
+def export_table(table, dest, db_name='user_info.db', fmt=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Write a table to a CSV or JSONL file
+
+    Args:
+        table (str): "appointments", "user_data" or "customers"
+        dest (str or file): Path or open text file to write
+        db_name (str): Path to the SQLite database
+        fmt (str, optional): "csv" or "jsonl", detected from the file extension by default
+        page_size (int): Rows fetched per query
+
+    Returns:
+        int: Number of rows written
+    """
+    fmt = _detect_format(getattr(dest, "name", dest), fmt)
+    count = 0
+    with _open(dest, "w") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS.get(table, []))
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(row):
+                f.write(json.dumps(row) + "\n")
+        for row in iter_rows(db_name, table, page_size):
+            write(row)
+            count += 1
+    return count
+
+
+def export_appointments(dest, db_name='user_info.db', fmt=None, page_size=DEFAULT_PAGE_SIZE):
+    """Write all appointments to a CSV or JSONL file, see export_table"""
+    return export_table("appointments", dest, db_name, fmt, page_size)
+
+
+def export_users(dest, db_name='user_info.db', fmt=None, page_size=DEFAULT_PAGE_SIZE):
+    """Write all submitted contact forms to a CSV or JSONL file, see export_table"""
+    return export_table("user_data", dest, db_name, fmt, page_size)
+
+
+def export_customers(dest, db_name='user_info.db', fmt=None, page_size=DEFAULT_PAGE_SIZE):
+    """Write all customers to a CSV or JSONL file, see export_table"""
+    return export_table("customers", dest, db_name, fmt, page_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default="user_info.db")
+    parser.add_argument("--format", choices=FORMATS, default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import appointments")
+    import_parser.add_argument("source")
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    export_parser = commands.add_parser("export", help="Export appointments, users or customers")
+    export_parser.add_argument("table", choices=["appointments", "users", "customers"])
+    export_parser.add_argument("dest")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        report = import_appointments(args.source, args.db, args.format, args.batch_size)
+        print(f"Imported {report['imported']} appointments, "
+              f"{len(report['conflicts'])} conflicts, {len(report['errors'])} errors")
+        for conflict in report["conflicts"]:
+            print(f"  line {conflict['line']}: {conflict['date']} {conflict['time']} {conflict['reason']}")
+        for error in report["errors"]:
+            print(f"  line {error['line']}: {error['error']}")
+    else:
+        table = "user_data" if args.table == "users" else args.table
+        count = export_table(table, args.dest, args.db, args.format)
+        print(f"Exported {count} rows to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Connection settings applied to every pooled connection
+BUSY_TIMEOUT_MS = 5000
+SYNCHRONOUS = "NORMAL"  # Safe with WAL: a crash can lose the last commits but never corrupts the DB
+CACHED_STATEMENTS = 256  # Per-connection prepared statement cache size
+DEFAULT_POOL_SIZE = 8
+
+
+class DatabaseLockedError(sqlite3.OperationalError):
+    """
+    A write couldn't take the database lock, even after retrying.
+
+    Raised instead of SQLite's bare "database is locked" so callers can tell
+    contention apart from other failures and report it.
+
+    Args:
+        operation (str): What was being written, e.g. "reserve_slot"
+        attempts (int): Transactions tried, including the first
+        waited (float): Seconds spent from the first attempt to giving up
+    """
+
+    def __init__(self, operation, attempts, waited):
+        super().__init__(f"database is locked: {operation} gave up after {attempts} attempts in {waited:.2f}s")
+        self.operation = operation
+        self.attempts = attempts
+        self.waited = waited
+
+    def to_dict(self):
+        return {"error": "database_locked", "operation": self.operation, "attempts": self.attempts,
+                "waited_ms": round(self.waited * 1000, 1)}
+
+
+def is_lock_error(error):
+    """True if error is SQLite giving up on a lock held by another connection"""
+    message = str(error)
+    return isinstance(error, sqlite3.OperationalError) and (
+        "database is locked" in message or "database is busy" in message)
+
+
+class ConnectionPool:
+    """
+    Pool of long-lived SQLite connections to one database file.
+
+    Connections are opened lazily up to `size`, configured for WAL journaling
+    so readers don't block the writer, and reused across calls so SQLite's
+    per-connection prepared statement cache stays warm.
+    """
+
+    def __init__(self, db_name, size=DEFAULT_POOL_SIZE, busy_timeout_ms=BUSY_TIMEOUT_MS,
+                 synchronous=SYNCHRONOUS):
+        self.db_name = db_name
+        self.in_memory = db_name == ":memory:"
+        # Every connection to ":memory:" is a separate database, so share just one
+        self.size = 1 if self.in_memory else size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        # Set by chatbot.migrations.migrate so later callers can skip the version check
+        self.schema_version = None
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_name,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS
+        )
+        if not self.in_memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        return self._idle.get(timeout=self.busy_timeout_ms / 1000)
+
+    def _release(self, conn):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for one transaction
+
+        Commits when the block exits normally and rolls back if it raises.
+
+        Yields:
+            sqlite3.Connection: Pooled connection
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close all idle connections; connections in use are closed when released"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_name, size=DEFAULT_POOL_SIZE):
+    """
+    Return the shared connection pool for a database file
+
+    Pools are per process, so a forked worker never reuses its parent's connections.
+
+    Args:
+        db_name (str): Path to the SQLite database, or ":memory:"
+        size (int): Maximum connections if the pool has to be created
+
+    Returns:
+        ConnectionPool: Pool shared by every caller using the same database
+    """
+    path = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+    key = (os.getpid(), path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_name, size=size)
+        return pool
+
+
+def close_pool(db_name):
+    """Close and forget the shared pool for a database file, if there is one"""
+    path = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+    with _pools_lock:
+        pool = _pools.pop((os.getpid(), path), None)
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,105 @@
+"""
+Batch date extraction for replaying chat logs.
+
+extract_dates() streams one result per message, in input order, resolving
+every relative date ("tomorrow", "next Friday") against one fixed reference
+time, so a replay gives the same answers however often it runs. Large logs
+can be spread over several processes; messages are sent to workers in
+chunks, and only a few chunks are in flight at once, so memory stays flat
+however long the input is.
+
+Usage:
+    python -m chatbot.date_batch chats.jsonl --reference 2025-03-31T09:00 [--field text] [--processes 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from chatbot.tools.date_tool import DateExtractionTool
+
+DEFAULT_CHUNK_SIZE = 1000
+CHUNKS_IN_FLIGHT = 2  # Per worker: one being processed, one queued
+
+_worker_tool = None
+
+
+def _extract_chunk(reference, messages):
+    """Worker process: match every message in a chunk"""
+    global _worker_tool
+    if _worker_tool is None:
+        _worker_tool = DateExtractionTool()
+    return [_worker_tool.match_date(message, reference) for message in messages]
+
+
+def _chunks(messages, size):
+    messages = iter(messages)
+    while True:
+        chunk = list(islice(messages, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def extract_dates(messages, reference, processes=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Extract the date from every message, as a stream
+
+    Args:
+        messages (iterable): Message texts; read lazily
+        reference (datetime): Time every relative date is resolved against
+        processes (int): Worker processes; 1 runs in this process, None uses every core
+        chunk_size (int): Messages sent to a worker at a time
+
+    Yields:
+        DateMatch: date, start and end of the matched text, and rule, or None for a message
+            without a date; one per message, in input order
+    """
+    if processes == 1:
+        tool = DateExtractionTool()
+        for message in messages:
+            yield tool.match_date(message, reference)
+        return
+
+    processes = processes or os.cpu_count()
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes) as pool:
+        pending = deque()
+        for chunk in _chunks(messages, chunk_size):
+            pending.append(pool.apply_async(_extract_chunk, (reference, chunk)))
+            if len(pending) >= processes * CHUNKS_IN_FLIGHT:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def _read_messages(lines, field):
+    for line in lines:
+        line = line.rstrip("\n")
+        yield (json.loads(line).get(field) or "") if field else line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("source", help="Text file with one message per line, or JSONL with --field")
+    parser.add_argument("--reference", required=True, type=datetime.fromisoformat,
+                        help="ISO time relative dates are resolved against, e.g. 2025-03-31T09:00")
+    parser.add_argument("--field", default=None, help="JSONL field holding the message text")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes; 0 uses every core")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        results = extract_dates(_read_messages(f, args.field), args.reference,
+                                processes=args.processes or None, chunk_size=args.chunk_size)
+        for line, match in enumerate(results, start=1):
+            record = {"line": line, **match._asdict()} if match else {"line": line, "date": None}
+            sys.stdout.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
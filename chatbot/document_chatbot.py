@@ -0,0 +1,117 @@
+from chatbot.tracing import span, langchain_callbacks
+
+# The chatbot pipeline (LangChain, Chroma, OpenAI) is imported inside
+# DocumentChatbot so that importing this module stays cheap.
+
+# LLM call sites that can answer from an LLMResponseCache, see chatbot/llm_cache.py
+LLM_CACHE_SITES = ("qa", "agent", "user_info")
+
+
+class DocumentChatbot:
+    def __init__(self, document, memory_mode="window", mime_type=None, file_name="upload",
+                 llm=None, embeddings=None, vector_store=None, db_name="user_info.db",
+                 repository=None, llm_cache=None, llm_cache_sites=("qa",)):
+        """
+        Build the RAG chain, tools and memory for one chat session
+
+        Args:
+            document: Path to the document, or upload content when mime_type is given
+            memory_mode (str): Conversation memory mode, see chatbot.memory.build_memory
+            mime_type (str, optional): MIME type of in-memory upload content
+            file_name (str): Name recorded as the source of an in-memory upload
+            llm (optional): Language model to use instead of OpenAI
+            embeddings (optional): Embedding model to use instead of OpenAIEmbeddings
+            vector_store (optional): Existing vector store to reuse instead of embedding the document
+            db_name (str): SQLite database for user info and appointments
+            repository (optional): Storage backend to use instead of db_name, see chatbot.repository
+            llm_cache (LLMResponseCache, optional): Cache of LLM responses; None calls the LLM every time
+            llm_cache_sites (tuple): Which of LLM_CACHE_SITES use llm_cache. The QA prompt is the
+                retrieved context plus the question, so repeated questions are the safe win.
+        """
+        from chatbot.document_loader import load_documents, load_documents_from_bytes
+        from chatbot.rag_system import create_vector_store, setup_rag_chain
+        from chatbot.user_info import UserInfoCollector
+        from chatbot.agent import setup_agent
+        from chatbot.planner import FastPathPlanner
+        from chatbot.tools.date_tool import DateExtractionTool
+        from chatbot.tools.booking_tool import AppointmentBookingTool
+        from chatbot.memory import build_memory
+
+        if llm is None:
+            from langchain.llms import OpenAI
+            llm = OpenAI(temperature=0.7)
+        self.llm = llm
+
+        unknown = set(llm_cache_sites) - set(LLM_CACHE_SITES)
+        if unknown:
+            raise ValueError(f"Unsupported LLM cache sites: {sorted(unknown)}. Choose from {LLM_CACHE_SITES}")
+        self.llm_cache = llm_cache
+        cached_llm = llm_cache.wrap(llm) if llm_cache is not None else llm
+        site_llms = {site: cached_llm if site in llm_cache_sites else llm for site in LLM_CACHE_SITES}
+
+        # Load and embed document: a path on disk, or upload content when a MIME type is given
+        if vector_store is None:
+            if mime_type:
+                documents = load_documents_from_bytes(document, mime_type, name=file_name)
+            else:
+                documents = load_documents(document)
+            vector_store = create_vector_store(documents, embeddings=embeddings)
+        self.vector_store = vector_store
+        self.qa_chain = setup_rag_chain(vector_store, site_llms["qa"])
+
+        # Tools and agent setup; one date tool, so a message parsed while routing is a memo hit for the tools
+        self.date_tool = DateExtractionTool()
+        self.user_info_collector = UserInfoCollector(site_llms["user_info"], db_name=db_name,
+                                                     memory_mode=memory_mode, repository=repository,
+                                                     date_tool=self.date_tool)
+        self.booking_tool = AppointmentBookingTool(self.user_info_collector, self.date_tool, db_name=db_name,
+                                                   repository=self.user_info_collector.repository)
+        # The contact form ends by reserving its slot through the same tool
+        self.user_info_collector.booking_tool = self.booking_tool
+        self.tools = setup_agent(site_llms["agent"], self.user_info_collector, self.date_tool, self.booking_tool)
+        self.planner = FastPathPlanner(self.user_info_collector, self.date_tool, self.booking_tool, agent=self.tools)
+        self.memory = build_memory(memory_mode, llm=self.llm, return_messages=True)
+
+    def memory_stats(self):
+        """Per-session memory accounting for the chat and info-collection memories"""
+        stats = {}
+        for name, memory in [("chat", self.memory), ("user_info", self.user_info_collector.memory)]:
+            if hasattr(memory, "memory_stats"):
+                stats[name] = memory.memory_stats()
+            else:
+                stats[name] = {"messages": len(memory.chat_memory.messages)}
+        return stats
+
+    def llm_cache_stats(self):
+        """Hits, misses and size of the LLM response cache, or None if there is none"""
+        return self.llm_cache.stats() if self.llm_cache is not None else None
+
+    def planner_stats(self):
+        """Tool requests served without an LLM call, and the latency that saved"""
+        return self.planner.stats()
+
+    def process_message(self, user_message):
+        with span("chat.turn") as turn:
+            return self._route_message(user_message, turn)
+
+    def _route_message(self, user_message, turn):
+        # Collecting user info
+        if self.user_info_collector.is_collecting():
+            turn.set_attribute("route", "user_info")
+            return self.user_info_collector.process_input(user_message)
+
+        # Contact, booking, cancel and reschedule requests go straight to their tool; only
+        # ambiguous ones cost an agent (LLM) round trip, see chatbot/planner.py
+        plan = self.planner.plan(user_message)
+        if plan:
+            turn.set_attribute("route", plan.intent)
+            return self.planner.execute(plan, user_message)
+
+        # Fallback to document Q&A
+        turn.set_attribute("route", "qa")
+        try:
+            with span("rag.qa_chain"):
+                response = self.qa_chain({"query": user_message}, callbacks=langchain_callbacks())
+            return response["result"]
+        except Exception as e:
+            return f"I'm sorry, I encountered an error while answering: {str(e)}"
@@ -1,7 +1,24 @@
+import io
 import os
-from langchain.document_loaders import PyPDFLoader, DirectoryLoader, TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import shutil
+import tempfile
 
+from chatbot.tracing import traced
+
+# Uploads larger than this are spooled to disk instead of being held in memory
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# Directory for spooled uploads; None uses the system temp directory
+UPLOAD_TEMP_DIR = None
+
+MIME_TYPES = {
+    "application/pdf": "pdf",
+    "application/x-pdf": "pdf",
+    "text/plain": "txt",
+}
+
+
+@traced("documents.load")
 def load_documents(file_path):
     """
     Load documents from various file types and split into chunks
@@ -12,6 +29,8 @@ def load_documents(file_path):
     Returns:
         list: List of document chunks
     """
+    from langchain.document_loaders import PyPDFLoader, DirectoryLoader, TextLoader
+
     # Determine the document type and use appropriate loader
     if file_path.endswith('.pdf'):
         loader = PyPDFLoader(file_path)
@@ -28,15 +47,83 @@ def load_documents(file_path):
     if not documents:
         raise ValueError(f"No content found in the document: {file_path}")
     
-    # Split documents into chunks
+    return split_documents(documents)
+
+
+@traced("documents.load_from_bytes")
+def load_documents_from_bytes(data, mime_type, name="upload"):
+    """
+    Load an uploaded document straight from memory and split into chunks
+
+    Nothing is written to disk unless the upload exceeds SPOOL_MAX_BYTES, in
+    which case it is spooled to a temporary file that is removed once parsed.
+
+    Args:
+        data (bytes or file-like): Raw document content, e.g. a Streamlit UploadedFile
+        mime_type (str): MIME type of the content ("application/pdf" or "text/plain")
+        name (str): Name recorded as the document source in chunk metadata
+
+    Returns:
+        list: List of document chunks
+    """
+    from langchain.schema import Document
+
+    file_type = MIME_TYPES.get((mime_type or "").split(";")[0].strip().lower())
+    if file_type is None:
+        raise ValueError(f"Unsupported MIME type: {mime_type}")
+
+    with _open_stream(data) as stream:
+        if file_type == "pdf":
+            from pypdf import PdfReader
+
+            reader = PdfReader(stream)
+            documents = [
+                Document(page_content=page.extract_text(), metadata={"source": name, "page": page_number})
+                for page_number, page in enumerate(reader.pages)
+            ]
+        else:
+            text = stream.read().decode("utf-8", errors="replace")
+            documents = [Document(page_content=text, metadata={"source": name})]
+
+    if not any(doc.page_content.strip() for doc in documents):
+        raise ValueError(f"No content found in the document: {name}")
+
+    return split_documents(documents)
+
+
+def _open_stream(data):
+    """Return a seekable binary stream over the upload, spooling large ones to disk"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return io.BytesIO(data)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, dir=UPLOAD_TEMP_DIR)
+    if hasattr(data, "seek"):
+        data.seek(0)
+    shutil.copyfileobj(data, spool)
+    spool.seek(0)
+    return spool
+
+
+def split_documents(documents):
+    """
+    Split loaded documents into chunks for embedding
+
+    Args:
+        documents (list): Loaded documents
+
+    Returns:
+        list: List of document chunks
+    """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
         chunk_overlap=200,
         separators=["\n\n", "\n", " ", ""]
     )
-    
+
     split_docs = text_splitter.split_documents(documents)
-    
+
     print(f"Loaded {len(documents)} document(s) and split into {len(split_docs)} chunks")
-    
-    return split_docs
\ No newline at end of file
+
+    return split_docs
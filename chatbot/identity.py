@@ -0,0 +1,18 @@
+"""
+Normalization of customer contact details.
+
+Two submissions that differ only in case, spacing or phone punctuation
+belong to the same customer, so identity lookups compare these normalized
+forms rather than the text the user typed.
+"""
+import re
+
+
+def normalize_email(email):
+    """Lower-cased email without surrounding whitespace"""
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone):
+    """Phone number reduced to its digits"""
+    return re.sub(r"\D", "", phone or "")
@@ -0,0 +1,239 @@
+"""
+Persistent cache of LLM responses, in SQLite.
+
+The QA chain sends the same prompt (the same retrieved context and question)
+to the API every time a question is asked again. LLMResponseCache stores each
+response under (model, hash of the call parameters, hash of the prompt) with
+a TTL and an entry limit, least recently used first out. Caching is opt-in
+per call site: wrap() returns a CachedLLM to hand to the chains that should
+use it, and the others keep the plain model.
+
+A model sampling at temperature > 0 gives a different answer each time, so
+replaying one is only safe when that isn't relied on. wrap() therefore
+defaults to deterministic mode, which calls the model at temperature 0.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.llms import LLM
+
+from chatbot.database import get_pool
+from chatbot.tracing import span
+
+DEFAULT_CACHE_DB = "llm_cache.db"
+DEFAULT_TTL = 7 * 24 * 3600  # Seconds; documents and prompts change, so answers don't live forever
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def model_name(llm):
+    """Name of the model behind a LangChain LLM, falling back to its type"""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or llm._llm_type
+
+
+class LLMResponseCache:
+    """
+    LLM responses keyed by (model, params, prompt hash), stored in SQLite
+
+    Entries older than `ttl` seconds are misses and are deleted; once more
+    than `max_entries` are stored, the least recently used go first.
+    """
+
+    def __init__(self, db_name=DEFAULT_CACHE_DB, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=None):
+        """
+        Args:
+            db_name (str): SQLite database for the cache, or ":memory:"
+            ttl (float, optional): Seconds an entry stays valid; None keeps entries until evicted
+            max_entries (int, optional): Entries kept; None for no limit
+            clock (callable, optional): Returns the current time in seconds, default time.time
+        """
+        self.db_name = db_name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock or time.time
+        self.pool = get_pool(db_name)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._initialize()
+
+    def _initialize(self):
+        with self.pool.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    model TEXT NOT NULL,
+                    params_hash TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, params_hash, prompt_hash)
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used)")
+
+    @staticmethod
+    def key(model, params, prompt, stop=None):
+        """
+        Cache key of one LLM call
+
+        Args:
+            model (str): Model name
+            params (dict): Parameters that change the response (temperature, max tokens, ...)
+            prompt (str): Prompt text
+            stop (list, optional): Stop sequences
+
+        Returns:
+            tuple: (model, params hash, prompt hash)
+        """
+        return model, _digest({"params": params, "stop": stop}), _digest(prompt)
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def lookup(self, key):
+        """
+        Return the cached response for a key, or None on a miss
+
+        Args:
+            key (tuple): From key()
+
+        Returns:
+            str: The cached response, or None if there is none or it has expired
+        """
+        now = self.clock()
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE model = ? AND params_hash = ? AND prompt_hash = ?",
+                key
+            ).fetchone()
+            if row is not None and self.ttl is not None and row[1] <= now - self.ttl:
+                conn.execute("DELETE FROM llm_responses WHERE model = ? AND params_hash = ? AND prompt_hash = ?", key)
+                self._count("evictions")
+                row = None
+            if row is not None:
+                conn.execute(
+                    "UPDATE llm_responses SET last_used = ? WHERE model = ? AND params_hash = ? AND prompt_hash = ?",
+                    (now, *key)
+                )
+        self._count("hits" if row is not None else "misses")
+        return row[0] if row is not None else None
+
+    def store(self, key, response):
+        """
+        Cache a response, then evict expired and least recently used entries over the limit
+
+        Args:
+            key (tuple): From key()
+            response (str): The LLM's response
+        """
+        now = self.clock()
+        with self.pool.connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO llm_responses (model, params_hash, prompt_hash, response, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (*key, response, now, now))
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        removed = 0
+        if self.ttl is not None:
+            removed += conn.execute("DELETE FROM llm_responses WHERE created_at <= ?", (now - self.ttl,)).rowcount
+        if self.max_entries is not None:
+            removed += conn.execute('''
+                DELETE FROM llm_responses WHERE rowid IN (
+                    SELECT rowid FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,)).rowcount
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def evict(self):
+        """
+        Remove expired entries and the least recently used ones over max_entries
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self.pool.connection() as conn:
+            return self._evict(conn, self.clock())
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM llm_responses")
+        with self._stats_lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Report how well the cache is doing
+
+        Returns:
+            dict: Hits, misses, hit ratio, entries stored, evictions so far and the limits
+        """
+        with self.pool.connection() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "entries": entries,
+            "evictions": self.evictions,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+
+    def wrap(self, llm, deterministic=True):
+        """
+        Return an LLM that answers from this cache and calls `llm` on a miss
+
+        Args:
+            llm: LangChain LLM to cache
+            deterministic (bool): Call the model at temperature 0, so a cached answer is
+                the answer it would give again. With False, the first sampled answer to
+                a prompt is replayed for as long as it is cached.
+
+        Returns:
+            CachedLLM: Drop-in replacement for llm
+        """
+        if deterministic and getattr(llm, "temperature", 0) != 0:
+            # Pass every field: copy() leaves out the ones LangChain excludes from serialization (callbacks)
+            llm = llm.copy(update={**dict(llm), "temperature": 0.0})
+        return CachedLLM(llm=llm, response_cache=self)
+
+
+class CachedLLM(LLM):
+    """LLM that serves repeated prompts from an LLMResponseCache, see LLMResponseCache.wrap"""
+
+    llm: Any
+    # Not `cache`: BaseLLM.cache switches LangChain's own global cache on and off
+    response_cache: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cached-{self.llm._llm_type}"
+
+    @property
+    def _identifying_params(self):
+        return {"model": model_name(self.llm), **self.llm._identifying_params}
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        key = self.response_cache.key(model_name(self.llm), {**self.llm._identifying_params, **kwargs}, prompt, stop)
+        with span("llm.cache") as cache_span:
+            response = self.response_cache.lookup(key)
+            cache_span.set_attribute("hit", response is not None)
+        if response is None:
+            response = self.llm.invoke(prompt, stop=stop, **kwargs)
+            self.response_cache.store(key, response)
+        return response
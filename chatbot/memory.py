@@ -0,0 +1,155 @@
+from typing import Any, Dict, List
+
+from langchain.memory import ConversationBufferMemory, ConversationSummaryBufferMemory
+from langchain.schema import BaseMessage
+
+DEFAULT_TOKEN_LIMIT = 1000
+DEFAULT_ENCODING_MODEL = "gpt-3.5-turbo-instruct"
+
+_encoders = {}
+
+
+def _get_encoder(model_name):
+    """Return a cached tiktoken encoder, or None if it cannot be loaded (e.g. offline)."""
+    if model_name not in _encoders:
+        try:
+            import tiktoken
+            _encoders[model_name] = tiktoken.encoding_for_model(model_name)
+        except Exception as e:
+            print(f"tiktoken unavailable for {model_name}, approximating token counts ({type(e).__name__})")
+            _encoders[model_name] = None
+    return _encoders[model_name]
+
+
+def count_tokens(text, model_name=DEFAULT_ENCODING_MODEL):
+    """
+    Count the tokens in a piece of text
+
+    Args:
+        text (str): Text to measure
+        model_name (str): Model whose tokenizer should be used
+
+    Returns:
+        int: Number of tokens (approximated as ~4 characters per token if tiktoken
+            has no encoding available)
+    """
+    encoder = _get_encoder(model_name)
+    if encoder is None:
+        return (len(text) + 3) // 4
+    return len(encoder.encode(text))
+
+
+def _message_tokens(message, model_name):
+    # Role prefix ("Human: " / "AI: ") plus the newline that joins messages
+    return count_tokens(message.content, model_name) + 4
+
+
+class _MemoryAccountingMixin:
+    """Shared per-session accounting for the bounded memory classes."""
+
+    def _buffer_tokens(self) -> int:
+        return sum(_message_tokens(m, self.model_name) for m in self.chat_memory.messages)
+
+    def _drop_oldest(self, buffer: List[BaseMessage]) -> List[BaseMessage]:
+        """Pop the oldest messages until the buffer fits within max_token_limit."""
+        sizes = [_message_tokens(m, self.model_name) for m in buffer]
+        total = sum(sizes)
+        dropped = []
+        while buffer and total > self.max_token_limit:
+            dropped.append(buffer.pop(0))
+            total -= sizes.pop(0)
+        self.pruned_messages += len(dropped)
+        return dropped
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        Report how much this session's memory currently holds
+
+        Returns:
+            dict: Message count, buffered tokens and characters, summary tokens,
+                the tokens that would reach the prompt, and messages pruned so far
+        """
+        messages = self.chat_memory.messages
+        summary = getattr(self, "moving_summary_buffer", "")
+        history = self.load_memory_variables({})[self.memory_key]
+        if not isinstance(history, str):
+            history = "\n".join(m.content for m in history)
+        return {
+            "messages": len(messages),
+            "buffer_tokens": self._buffer_tokens(),
+            "buffer_chars": sum(len(m.content) for m in messages),
+            "summary_tokens": count_tokens(summary, self.model_name) if summary else 0,
+            "prompt_tokens": count_tokens(history, self.model_name),
+            "pruned_messages": self.pruned_messages,
+            "max_token_limit": self.max_token_limit,
+        }
+
+
+class TokenWindowMemory(_MemoryAccountingMixin, ConversationBufferMemory):
+    """
+    Conversation buffer that keeps only the most recent messages that fit
+    within max_token_limit, counted with tiktoken.
+    """
+
+    max_token_limit: int = DEFAULT_TOKEN_LIMIT
+    model_name: str = DEFAULT_ENCODING_MODEL
+    pruned_messages: int = 0
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        super().save_context(inputs, outputs)
+        self._drop_oldest(self.chat_memory.messages)
+
+    def clear(self) -> None:
+        super().clear()
+        self.pruned_messages = 0
+
+
+class RollingSummaryMemory(_MemoryAccountingMixin, ConversationSummaryBufferMemory):
+    """
+    Conversation buffer that folds messages falling outside max_token_limit into
+    a running summary produced by the LLM.
+    """
+
+    max_token_limit: int = DEFAULT_TOKEN_LIMIT
+    model_name: str = DEFAULT_ENCODING_MODEL
+    pruned_messages: int = 0
+
+    def prune(self) -> None:
+        """Summarize and drop the oldest messages once the buffer exceeds the limit"""
+        dropped = self._drop_oldest(self.chat_memory.messages)
+        if dropped:
+            self.moving_summary_buffer = self.predict_new_summary(
+                dropped, self.moving_summary_buffer
+            )
+
+    def clear(self) -> None:
+        super().clear()
+        self.pruned_messages = 0
+
+
+MEMORY_MODES = ("buffer", "window", "summary")
+
+
+def build_memory(mode="window", llm=None, max_token_limit=DEFAULT_TOKEN_LIMIT, **kwargs):
+    """
+    Create a conversation memory for the given mode
+
+    Args:
+        mode (str): "buffer" (unbounded), "window" (token sliding window)
+            or "summary" (rolling summary of older turns)
+        llm: Language model instance, required for "summary"
+        max_token_limit (int): Token budget for the verbatim history
+        **kwargs: Extra arguments passed to the memory class
+
+    Returns:
+        BaseChatMemory: Memory instance
+    """
+    if mode == "buffer":
+        return ConversationBufferMemory(**kwargs)
+    if mode == "window":
+        return TokenWindowMemory(max_token_limit=max_token_limit, **kwargs)
+    if mode == "summary":
+        if llm is None:
+            raise ValueError("Summary memory requires an llm")
+        return RollingSummaryMemory(llm=llm, max_token_limit=max_token_limit, **kwargs)
+    raise ValueError(f"Unsupported memory mode: {mode}. Choose one of {MEMORY_MODES}")
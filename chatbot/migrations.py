@@ -0,0 +1,264 @@
+"""
+Versioned schema migrations for the user and appointment database.
+
+The schema version is stored in SQLite's ``PRAGMA user_version``. Each
+migration runs once, in order, inside its own ``BEGIN IMMEDIATE``
+transaction, so concurrent workers starting against the same file never
+apply a migration twice. To change the schema, append a new entry to
+MIGRATIONS; never edit one that has shipped. A migration step is either a
+SQL statement or, for data changes SQL can't express, a function called
+with the connection.
+"""
+from chatbot.identity import normalize_email, normalize_phone
+
+
+def _fold_customers(conn):
+    """Create one customer per normalized (email, phone) in user_data and repoint bookings at it"""
+    customers = {}
+    links = []
+    for user_id, name, phone, email, created_at in conn.execute(
+        "SELECT id, name, phone, email, created_at FROM user_data ORDER BY created_at, id"
+    ):
+        key = (normalize_email(email), normalize_phone(phone))
+        first_seen = customers[key][5] if key in customers else created_at
+        # The latest submission wins for the display fields
+        customers[key] = (name, phone, email, *key, first_seen, created_at)
+        links.append((key, user_id))
+
+    conn.executemany('''
+        INSERT INTO customers (name, phone, email, email_normalized, phone_normalized, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', customers.values())
+    ids = {(email, phone): customer_id for customer_id, email, phone in conn.execute(
+        "SELECT id, email_normalized, phone_normalized FROM customers"
+    )}
+    conn.executemany("UPDATE user_data SET customer_id = ? WHERE id = ?", ((ids[key], uid) for key, uid in links))
+    for table in ("appointments", "provider_appointments"):
+        conn.execute(f'''
+            UPDATE {table} SET user_id = (SELECT customer_id FROM user_data WHERE user_data.id = {table}.user_id)
+            WHERE user_id IN (SELECT id FROM user_data)
+        ''')
+
+
+# (version, description, statements)
+MIGRATIONS = [
+    (1, "Create user_data and appointments tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS user_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            email TEXT NOT NULL,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            status TEXT DEFAULT 'pending'
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS appointments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL,
+            status TEXT DEFAULT 'confirmed',
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES user_data (id)
+        )
+        ''',
+    ]),
+    (2, "Covering indexes for availability and user lookups", [
+        # Availability checks: WHERE date = ? AND status = 'confirmed', reading only time
+        "CREATE INDEX IF NOT EXISTS idx_appointments_date_status_time ON appointments (date, status, time)",
+        # get_user_id: WHERE name/phone/email ORDER BY created_at DESC (id is the rowid)
+        "CREATE INDEX IF NOT EXISTS idx_user_data_identity ON user_data (name, phone, email, created_at)",
+        # get_all_users: ORDER BY created_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_user_data_created_at ON user_data (created_at)",
+    ]),
+    (3, "At most one confirmed appointment per slot", [
+        # Keep the earliest booking of any slot that was double-booked before the constraint existed
+        '''
+        UPDATE appointments SET status = 'duplicate'
+        WHERE status = 'confirmed' AND id NOT IN (
+            SELECT MIN(id) FROM appointments WHERE status = 'confirmed' GROUP BY date, time
+        )
+        ''',
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_confirmed_slot
+        ON appointments (date, time) WHERE status = 'confirmed'
+        ''',
+    ]),
+    (4, "Provider calendars with variable-length appointments", [
+        '''
+        CREATE TABLE IF NOT EXISTS providers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        ''',
+        # Open intervals per weekday (0 = Monday), in minutes since midnight; breaks are the gaps
+        '''
+        CREATE TABLE IF NOT EXISTS provider_hours (
+            provider_id INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL,
+            FOREIGN KEY (provider_id) REFERENCES providers (id)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_provider_hours ON provider_hours (provider_id, weekday, start_minute)",
+        '''
+        CREATE TABLE IF NOT EXISTS provider_appointments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL CHECK (end_minute > start_minute),
+            status TEXT DEFAULT 'confirmed',
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (provider_id) REFERENCES providers (id),
+            FOREIGN KEY (user_id) REFERENCES user_data (id)
+        )
+        ''',
+        # Overlap checks for one provider and day, and whole-day loads across providers
+        '''
+        CREATE INDEX IF NOT EXISTS idx_provider_appointments_slot
+        ON provider_appointments (provider_id, date, status, start_minute, end_minute)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_provider_appointments_date
+        ON provider_appointments (date, status, provider_id, start_minute, end_minute)
+        ''',
+    ]),
+    (5, "Normalized customers; appointments belong to customers", [
+        '''
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            email TEXT NOT NULL,
+            email_normalized TEXT NOT NULL,
+            phone_normalized TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        ''',
+        # Identity lookups and upserts: one customer per normalized email and phone
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_identity
+        ON customers (email_normalized, phone_normalized)
+        ''',
+        # user_data keeps one row per submitted contact form, now linked to its customer
+        "ALTER TABLE user_data ADD COLUMN customer_id INTEGER REFERENCES customers (id)",
+        _fold_customers,
+    ]),
+    (6, "Look up a customer's appointments", [
+        "CREATE INDEX IF NOT EXISTS idx_appointments_user ON appointments (user_id, status, date, time)",
+    ]),
+    (7, "Appointments reference customers", [
+        # SQLite can't alter a foreign key, so both tables are rebuilt; user_id keeps its name
+        '''
+        CREATE TABLE appointments_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL,
+            status TEXT DEFAULT 'confirmed',
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES customers (id)
+        )
+        ''',
+        '''
+        INSERT INTO appointments_new (id, user_id, date, time, status, created_at)
+        SELECT id, user_id, date, time, status, created_at FROM appointments
+        ''',
+        "DROP TABLE appointments",
+        "ALTER TABLE appointments_new RENAME TO appointments",
+        "CREATE INDEX idx_appointments_date_status_time ON appointments (date, status, time)",
+        "CREATE UNIQUE INDEX idx_appointments_confirmed_slot ON appointments (date, time) WHERE status = 'confirmed'",
+        "CREATE INDEX idx_appointments_user ON appointments (user_id, status, date, time)",
+        '''
+        CREATE TABLE provider_appointments_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL CHECK (end_minute > start_minute),
+            status TEXT DEFAULT 'confirmed',
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (provider_id) REFERENCES providers (id),
+            FOREIGN KEY (user_id) REFERENCES customers (id)
+        )
+        ''',
+        '''
+        INSERT INTO provider_appointments_new
+            (id, provider_id, user_id, date, start_minute, end_minute, status, created_at)
+        SELECT id, provider_id, user_id, date, start_minute, end_minute, status, created_at
+        FROM provider_appointments
+        ''',
+        "DROP TABLE provider_appointments",
+        "ALTER TABLE provider_appointments_new RENAME TO provider_appointments",
+        '''
+        CREATE INDEX idx_provider_appointments_slot
+        ON provider_appointments (provider_id, date, status, start_minute, end_minute)
+        ''',
+        '''
+        CREATE INDEX idx_provider_appointments_date
+        ON provider_appointments (date, status, provider_id, start_minute, end_minute)
+        ''',
+        # Customers are found through idx_customers_identity; this index only cost a write per contact form
+        "DROP INDEX IF EXISTS idx_user_data_identity",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(pool, target_version=None):
+    """
+    Bring the database up to date by applying pending migrations
+
+    Args:
+        pool (ConnectionPool): Pool for the database to migrate
+        target_version (int, optional): Stop at this version instead of the latest
+
+    Returns:
+        int: Schema version after migrating
+    """
+    target = LATEST_VERSION if target_version is None else target_version
+    if pool.schema_version is not None and pool.schema_version >= target:
+        return pool.schema_version
+
+    with pool.connection() as conn:
+        version = get_schema_version(conn)
+        for migration_version, description, statements in MIGRATIONS:
+            if migration_version <= version or migration_version > target:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied it while we waited for the write lock
+                if get_schema_version(conn) >= migration_version:
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(migration_version)}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"Applied migration {migration_version}: {description}")
+        version = get_schema_version(conn)
+
+    pool.schema_version = version
+    return version
@@ -0,0 +1,180 @@
+"""
+Deterministic planning of tool requests, ahead of the LLM agent.
+
+The chat tools (contact collection, booking, cancelling, rescheduling) are
+deterministic, so a message that clearly asks for one of them is sent straight
+to it. The ReAct agent built by setup_agent spends one LLM round trip per
+step; it now only sees messages whose intent is ambiguous, such as "cancel
+Tuesday and book Friday instead".
+"""
+import re
+import time
+from typing import Callable, NamedTuple, Optional
+
+from chatbot.tools.time_parser import match_time
+from chatbot.tracing import langchain_callbacks, span
+
+CONTACT_PHRASES = ("call me", "contact me")
+# Verbs naming a tool intent. "appointment"/"meeting" alone mean booking, but only when no verb says otherwise.
+INTENT_PATTERNS = {
+    "cancel": re.compile(r"\bcancel"),
+    "reschedule": re.compile(r"\breschedul|\bmove my\b|\bchange my\b"),
+    "booking": re.compile(r"\bbook|\bschedul"),
+}
+BOOKING_NOUNS = re.compile(r"\b(?:appointment|meeting)")
+# "cancellation policy", "change my password": these verbs only ask for a tool about a booking,
+# so they also need a booking noun, a date or a time
+QUALIFIED_INTENTS = ("cancel", "reschedule")
+BOOKING_REFERENCES = re.compile(r"\b(?:appointment|meeting|booking|reservation|slot)")
+# "What is the cancellation policy for appointments?", "Can I change my appointment time online?":
+# without a date or time these ask about bookings rather than for a change to one.
+# "Can you cancel my appointment?" is a polite request, not a question.
+QUESTION = re.compile(r"^\s*(?:what|how|can|is|does)\b|\?\s*$")
+POLITE_REQUEST = re.compile(r"^\s*(?:can|could|would|will) you\b")
+# "don't book", "not cancel": the request isn't what its verb says
+NEGATION = re.compile(
+    r"\b(?:don'?t|do not|not|never|no need to)\s+(?:\w+\s+){0,2}(?:cancel|book|schedul|reschedul|move|change)"
+)
+
+ERRORS = {
+    "cancel": "Error during cancellation",
+    "reschedule": "Error during rescheduling",
+    "booking": "Error during appointment booking",
+    "agent": "I'm sorry, I couldn't work out what you'd like to do",
+}
+
+
+class Plan(NamedTuple):
+    """A tool request: its intent, and the tool call that serves it (None: ask the agent)"""
+    intent: str
+    action: Optional[Callable[[str], str]]
+
+
+class FastPathPlanner:
+    """
+    Sends clear tool requests straight to their tool and ambiguous ones to the agent
+
+    Counts how many requests were served without any LLM call and how long
+    each path took, see stats().
+    """
+
+    def __init__(self, user_info_collector, date_tool, booking_tool, agent=None):
+        """
+        Args:
+            user_info_collector: UserInfoCollector instance
+            date_tool: DateExtractionTool instance
+            booking_tool: AppointmentBookingTool instance
+            agent (optional): Agent from setup_agent, called for ambiguous requests
+        """
+        self.user_info_collector = user_info_collector
+        self.date_tool = date_tool
+        self.booking_tool = booking_tool
+        self.agent = agent
+        self.fast_path = 0
+        self.llm = 0
+        self.fast_path_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    def _book(self, message):
+        if self.date_tool.extract_date(message):
+            return self.booking_tool.book_appointment(message)
+        # No date yet: start with the customer's details
+        return self.user_info_collector.start_collection()
+
+    def _names_a_slot(self, message):
+        return bool(self.date_tool.extract_date(message) or match_time(message))
+
+    def _names_a_booking(self, message, lowered):
+        return bool(BOOKING_REFERENCES.search(lowered) or self._names_a_slot(message))
+
+    def _asks_about_bookings(self, message, lowered):
+        return bool(QUESTION.search(lowered) and not POLITE_REQUEST.search(lowered)
+                    and not self._names_a_slot(message))
+
+    def plan(self, message):
+        """
+        Decide how to serve a message
+
+        Args:
+            message (str): User's message
+
+        Returns:
+            Plan: The intent and tool call, with intent "agent" for an ambiguous request;
+                None if the message asks for no tool (answer it from the document)
+        """
+        lowered = message.lower()
+        if any(phrase in lowered for phrase in CONTACT_PHRASES):
+            return Plan("user_info", lambda _: self.user_info_collector.start_collection())
+
+        intents = [intent for intent, pattern in INTENT_PATTERNS.items() if pattern.search(lowered)]
+        question = self._asks_about_bookings(message, lowered)
+        if any(intent in QUALIFIED_INTENTS for intent in intents) and (
+                question or not self._names_a_booking(message, lowered)):
+            intents = [intent for intent in intents if intent not in QUALIFIED_INTENTS]
+        if not intents and not question and BOOKING_NOUNS.search(lowered):
+            intents = ["booking"]
+        if not intents:
+            return None
+        if len(intents) > 1 or NEGATION.search(lowered):
+            return Plan("agent", None)
+        actions = {
+            "cancel": self.booking_tool.cancel_booking,
+            "reschedule": self.booking_tool.reschedule_booking,
+            "booking": self._book,
+        }
+        return Plan(intents[0], actions[intents[0]])
+
+    def _ask_agent(self, message):
+        if self.agent is None:
+            return "Could you tell me one thing at a time: book, cancel or reschedule?"
+        with span("agent.run"):
+            return self.agent({"input": message}, callbacks=langchain_callbacks())["output"]
+
+    def execute(self, plan, message):
+        """
+        Serve a message according to its plan
+
+        Args:
+            plan (Plan): From plan()
+            message (str): User's message
+
+        Returns:
+            str: The reply
+        """
+        start = time.perf_counter()
+        try:
+            if plan.action is None:
+                reply = self._ask_agent(message)
+            else:
+                reply = plan.action(message)
+        except Exception as e:
+            reply = f"{ERRORS.get(plan.intent, 'Error')}: {e}"
+        elapsed = time.perf_counter() - start
+        if plan.action is None and self.agent is not None:
+            self.llm += 1
+            self.llm_seconds += elapsed
+        else:
+            self.fast_path += 1
+            self.fast_path_seconds += elapsed
+        return reply
+
+    def stats(self):
+        """
+        Requests served without an LLM call, and the time that saved
+
+        latency_saved_ms estimates the saving as what each fast-path request would
+        have cost at the agent's mean latency, less what it did cost; it is None
+        until the agent has served at least one request.
+        """
+        requests = self.fast_path + self.llm
+        fast_ms = self.fast_path_seconds / self.fast_path * 1000 if self.fast_path else None
+        llm_ms = self.llm_seconds / self.llm * 1000 if self.llm else None
+        return {
+            "requests": requests,
+            "fast_path": self.fast_path,
+            "llm": self.llm,
+            "fast_path_ratio": self.fast_path / requests if requests else None,
+            "fast_path_ms_mean": fast_ms,
+            "llm_ms_mean": llm_ms,
+            "latency_saved_ms": (llm_ms - (fast_ms or 0.0)) * self.fast_path if llm_ms is not None else None,
+        }
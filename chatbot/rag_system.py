@@ -1,26 +1,31 @@
-from langchain.vectorstores import Chroma
-from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.chains import RetrievalQA
 import tempfile
 import os
 
-def create_vector_store(documents, persist_directory=None):
+from chatbot.tracing import traced
+
+@traced("rag.create_vector_store")
+def create_vector_store(documents, persist_directory=None, embeddings=None):
     """
     Create a vector store from documents
     
     Args:
         documents (list): List of document chunks
         persist_directory (str, optional): Directory to persist the vector store
+        embeddings (optional): Embedding model, defaults to OpenAIEmbeddings
         
     Returns:
         Chroma: Vector store instance
     """
+    from langchain.vectorstores import Chroma
+
     # Create a temporary directory if none provided
     if persist_directory is None:
         persist_directory = tempfile.mkdtemp()
     
     # Initialize embeddings - can be swapped with other embedding models
-    embeddings = OpenAIEmbeddings()  # Could use HuggingFaceEmbeddings for local option
+    if embeddings is None:
+        from langchain.embeddings.openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings()  # Could use HuggingFaceEmbeddings for local option
     
     # Create vector store
     vector_store = Chroma.from_documents(
@@ -47,6 +52,8 @@ def setup_rag_chain(vector_store, llm):
     Returns:
         RetrievalQA: QA chain instance
     """
+    from langchain.chains import RetrievalQA
+
     # Set up retriever
     retriever = vector_store.as_retriever(
         search_type="similarity",
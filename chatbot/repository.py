@@ -0,0 +1,458 @@
+"""
+Storage backends for users and appointments.
+
+The booking tool and the user info collector only talk to a repository:
+SQLiteRepository is the production store, MemoryRepository keeps everything
+in dicts and sorted lists for tests, benchmarks and single-process demos.
+Both implement the same methods with the same return values.
+"""
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+from chatbot.database import DatabaseLockedError, get_pool, is_lock_error
+from chatbot.identity import normalize_email, normalize_phone
+from chatbot.migrations import migrate
+from chatbot.tools.availability_cache import get_availability_cache
+
+LOCK_RETRIES = 3
+LOCK_RETRY_DELAY = 0.01  # Seconds before the first retry; doubles with each attempt
+
+
+def upsert_customer(conn, name, phone, email, now=None):
+    """Insert a customer, or update the one with the same normalized email and phone; returns its ID"""
+    now = now or datetime.now().isoformat()
+    return conn.execute('''
+        INSERT INTO customers (name, phone, email, email_normalized, phone_normalized, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (email_normalized, phone_normalized) DO UPDATE SET
+            name = excluded.name, phone = excluded.phone, email = excluded.email, updated_at = excluded.updated_at
+        RETURNING id
+    ''', (name, phone, email, normalize_email(email), normalize_phone(phone), now, now)).fetchall()[0][0]
+
+
+def find_customer_id(conn, user_info):
+    """ID of the customer matching user_info's normalized email and phone, or None"""
+    # A point query on idx_customers_identity
+    result = conn.execute(
+        "SELECT id FROM customers WHERE email_normalized = ? AND phone_normalized = ?",
+        (normalize_email(user_info['email']), normalize_phone(user_info['phone']))
+    ).fetchone()
+    return result[0] if result else None
+
+
+def save_contact_request(conn, user_info):
+    """Upsert the customer and record the submitted contact form in user_data; returns the customer ID"""
+    customer_id = upsert_customer(conn, user_info['name'], user_info['phone'], user_info['email'],
+                                  user_info.get('created_at'))
+    conn.execute('''
+        INSERT INTO user_data (name, phone, email, date, time, created_at, customer_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        user_info['name'],
+        user_info['phone'],
+        user_info['email'],
+        user_info['date'],
+        user_info['time'],
+        user_info.get('created_at') or datetime.now().isoformat(),
+        customer_id
+    ))
+    return customer_id
+
+
+def select_booked_times(conn, date_str):
+    """Times (HH:MM) of confirmed appointments on date_str, in order"""
+    # Served from idx_appointments_date_status_time
+    return [row[0] for row in conn.execute(
+        "SELECT time FROM appointments WHERE date = ? AND status = 'confirmed' ORDER BY time", (date_str,)
+    )]
+
+
+def claim_slot(conn, user_id, date_str, time_str):
+    """Insert a confirmed appointment unless one holds the slot; returns its ID, or None if the slot is taken"""
+    cursor = conn.execute('''
+        INSERT INTO appointments (user_id, date, time, status, created_at)
+        VALUES (?, ?, ?, 'confirmed', ?)
+        ON CONFLICT (date, time) WHERE status = 'confirmed' DO NOTHING
+    ''', (user_id, date_str, time_str, datetime.now().isoformat()))
+    return cursor.lastrowid if cursor.rowcount == 1 else None
+
+
+class Repository(ABC):
+    """
+    Interface shared by every storage backend.
+
+    initialize and ping do nothing unless a backend needs them; every other
+    method must be implemented before a backend can be instantiated.
+    """
+
+    def initialize(self):
+        """Create or upgrade whatever the backend needs before first use"""
+
+    # Users
+
+    @abstractmethod
+    def save_user(self, user_info):
+        """
+        Record a submitted contact form and upsert its customer
+
+        Customers are identified by normalized email and phone, so a repeat
+        customer updates their existing record instead of adding one.
+
+        Args:
+            user_info (dict): name, phone, email, date, time and created_at
+
+        Returns:
+            int: ID of the customer
+        """
+
+    @abstractmethod
+    def upsert_customer(self, name, phone, email):
+        """Create or update the customer with this normalized email and phone; returns its ID"""
+
+    @abstractmethod
+    def get_user_id(self, user_info):
+        """ID of the customer with user_info's normalized email and phone, or None"""
+
+    @abstractmethod
+    def all_users(self):
+        """
+        Every submitted contact form, newest first, as
+        (id, name, phone, email, date, time, created_at, status, customer_id) tuples
+        """
+
+    # Appointments
+
+    @abstractmethod
+    def booked_times(self, date_str):
+        """Sorted times (HH:MM) held by confirmed appointments on date_str"""
+
+    @abstractmethod
+    def iter_booked(self, start_date, end_date):
+        """Yield (date, time) of confirmed appointments in a date range (inclusive), in date order"""
+
+    @abstractmethod
+    def reserve_slot(self, user_id, date_str, time_str):
+        """
+        Atomically claim a slot
+
+        Returns:
+            tuple: (appointment_id, None) if reserved, or (None, booked_times) if the slot was taken
+        """
+
+    @abstractmethod
+    def cancel_appointment(self, appointment_id):
+        """Cancel a confirmed appointment; returns its (date, time), or None if there was none to cancel"""
+
+    @abstractmethod
+    def reschedule_appointment(self, appointment_id, date_str, time_str):
+        """
+        Atomically move a confirmed appointment to another slot
+
+        Releasing the old slot and claiming the new one happen in one
+        transaction: either both take effect or neither does.
+
+        Returns:
+            tuple: (new_appointment_id, None) if moved, (None, booked_times) if the new slot was
+                taken and the appointment was left as it was, or (None, None) if appointment_id
+                is not a confirmed appointment
+        """
+
+    @abstractmethod
+    def customer_appointments(self, customer_id, from_date=None):
+        """Confirmed appointments of a customer, optionally from from_date on, as sorted (id, date, time)"""
+
+    def ping(self):
+        """Raise if the store can't be reached"""
+
+
+class SQLiteRepository(Repository):
+    """
+    The SQLite store: pooled WAL connections, versioned schema, optional availability cache.
+
+    Writes run in BEGIN IMMEDIATE transactions. When another process holds the
+    lock past the busy timeout, the whole transaction is retried with jittered
+    exponential backoff; once the retries run out it raises DatabaseLockedError.
+
+    Args:
+        db_name (str): Path to the SQLite database, or ":memory:"
+        cache_availability (bool): Serve booked_times from the process-wide AvailabilityCache
+        lock_retries (int): Extra attempts for a write that found the database locked
+        pool (ConnectionPool, optional): Pool to use instead of the shared one for db_name
+    """
+
+    def __init__(self, db_name='user_info.db', cache_availability=True, lock_retries=LOCK_RETRIES, pool=None):
+        self.db_name = db_name
+        self.pool = pool or get_pool(db_name)
+        # Booked slots per date, shared by every repository on this database in the process
+        self.cache = get_availability_cache(db_name) if cache_availability else None
+        self.lock_retries = lock_retries
+        # Contention seen by this repository: retried transactions, and writes that gave up
+        self.retries = 0
+        self.lock_errors = 0
+
+    def initialize(self):
+        # Creates the tables and indexes (see chatbot/migrations.py)
+        migrate(self.pool)
+
+    def _write_connection(self):
+        # Writes made through the cache's connection don't invalidate it, see AvailabilityCache
+        return self.cache.write() if self.cache is not None else self.pool.connection()
+
+    def _write(self, operation, write):
+        """Run write(conn) in its own write transaction, retrying while the database is locked"""
+        started = time.monotonic()
+        for attempt in range(self.lock_retries + 1):
+            try:
+                with self._write_connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    return write(conn)
+            except sqlite3.OperationalError as e:
+                if not is_lock_error(e):
+                    raise
+                if attempt == self.lock_retries:
+                    self.lock_errors += 1
+                    raise DatabaseLockedError(operation, attempt + 1, time.monotonic() - started) from e
+                self.retries += 1
+                time.sleep(random.uniform(0, LOCK_RETRY_DELAY * 2 ** attempt))
+
+    def save_user(self, user_info):
+        return self._write("save_user", lambda conn: save_contact_request(conn, user_info))
+
+    def upsert_customer(self, name, phone, email):
+        return self._write("upsert_customer", lambda conn: upsert_customer(conn, name, phone, email))
+
+    def get_user_id(self, user_info):
+        with self.pool.connection() as conn:
+            return find_customer_id(conn, user_info)
+
+    def all_users(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT * FROM user_data ORDER BY created_at DESC').fetchall()
+
+    def booked_times(self, date_str):
+        if self.cache is not None:
+            return sorted(self.cache.get_booked(date_str))
+        with self.pool.connection() as conn:
+            return select_booked_times(conn, date_str)
+
+    def iter_booked(self, start_date, end_date):
+        # The connection stays borrowed until the caller finishes or closes the generator
+        with self.pool.connection() as conn:
+            # Served in date order from idx_appointments_date_status_time
+            yield from conn.execute('''
+                SELECT date, time FROM appointments
+                WHERE date >= ? AND date <= ? AND status = 'confirmed'
+                ORDER BY date
+            ''', (start_date, end_date))
+
+    @staticmethod
+    def _booked_in_transaction(conn, date_str):
+        return set(select_booked_times(conn, date_str))
+
+    def reserve_slot(self, user_id, date_str, time_str):
+        def claim(conn):
+            appointment_id = claim_slot(conn, user_id, date_str, time_str)
+            if appointment_id is not None:
+                return appointment_id, None
+            return None, self._booked_in_transaction(conn, date_str)
+
+        appointment_id, booked = self._write("reserve_slot", claim)
+        if self.cache is not None:
+            if appointment_id:
+                self.cache.record_booking(date_str, time_str)
+            else:
+                self.cache.record_booked(date_str, booked)
+        if appointment_id:
+            return appointment_id, None
+        return None, sorted(booked)
+
+    def cancel_appointment(self, appointment_id):
+        def cancel(conn):
+            row = conn.execute(
+                "SELECT date, time FROM appointments WHERE id = ? AND status = 'confirmed'", (appointment_id,)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE appointments SET status = 'cancelled' WHERE id = ?", (appointment_id,))
+            return row
+
+        row = self._write("cancel_appointment", cancel)
+        if row is None:
+            return None
+        if self.cache is not None:
+            self.cache.record_release(*row)
+        return tuple(row)
+
+    def reschedule_appointment(self, appointment_id, date_str, time_str):
+        def move(conn):
+            row = conn.execute(
+                "SELECT user_id, date, time FROM appointments WHERE id = ? AND status = 'confirmed'", (appointment_id,)
+            ).fetchone()
+            if row is None:
+                return None, None, None
+            conn.execute("SAVEPOINT move")
+            # Release first, so moving onto the appointment's own slot doesn't conflict with itself
+            conn.execute("UPDATE appointments SET status = 'rescheduled' WHERE id = ?", (appointment_id,))
+            new_id = claim_slot(conn, row[0], date_str, time_str)
+            if new_id is not None:
+                conn.execute("RELEASE move")
+                return row, new_id, None
+            # The new slot is taken: keep the old appointment
+            conn.execute("ROLLBACK TO move")
+            conn.execute("RELEASE move")
+            return row, None, self._booked_in_transaction(conn, date_str)
+
+        row, new_id, booked = self._write("reschedule_appointment", move)
+        if row is None:
+            return None, None
+        if self.cache is not None:
+            if new_id:
+                self.cache.record_release(row[1], row[2])
+                self.cache.record_booking(date_str, time_str)
+            else:
+                self.cache.record_booked(date_str, booked)
+        if new_id:
+            return new_id, None
+        return None, sorted(booked)
+
+    def customer_appointments(self, customer_id, from_date=None):
+        with self.pool.connection() as conn:
+            # Served from idx_appointments_user
+            return [tuple(row) for row in conn.execute('''
+                SELECT id, date, time FROM appointments
+                WHERE user_id = ? AND status = 'confirmed' AND date >= ?
+                ORDER BY date, time
+            ''', (customer_id, from_date or ''))]
+
+    def ping(self):
+        with self.pool.connection() as conn:
+            conn.execute('SELECT sqlite_version()')
+
+
+class MemoryRepository(Repository):
+    """
+    In-process store with no file I/O.
+
+    Rows live in dicts keyed by ID. Confirmed bookings are indexed by a
+    sorted list of dates plus a sorted list of times per date, so point
+    lookups are dict hits and range scans are a bisect. One lock makes every
+    method atomic, which gives reserve_slot the same guarantee as the SQLite
+    unique index, within one process.
+    """
+
+    USER_STATUS = 'pending'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = {}          # id -> contact form row tuple, as in all_users() minus the id
+        self._customers = {}      # (normalized email, normalized phone) -> customer ID
+        self._customer_rows = {}  # customer ID -> [name, phone, email, created_at, updated_at]
+        self._appointments = {}   # id -> [user_id, date, time, status, created_at]
+        self._booked = {}         # date -> sorted confirmed times
+        self._dates = []          # sorted dates that have confirmed bookings
+        self._next_user_id = 1
+        self._next_appointment_id = 1
+
+    def _upsert_customer(self, name, phone, email, now=None):
+        # Same as upsert_customer: the latest name, phone and email win
+        key = (normalize_email(email), normalize_phone(phone))
+        now = now or datetime.now().isoformat()
+        customer_id = self._customers.get(key)
+        if customer_id is None:
+            customer_id = self._customers[key] = len(self._customers) + 1
+            self._customer_rows[customer_id] = [name, phone, email, now, now]
+        else:
+            self._customer_rows[customer_id][:3] = [name, phone, email]
+            self._customer_rows[customer_id][4] = now
+        return customer_id
+
+    def save_user(self, user_info):
+        with self._lock:
+            customer_id = self._upsert_customer(user_info['name'], user_info['phone'], user_info['email'],
+                                                user_info.get('created_at'))
+            user_id = self._next_user_id
+            self._next_user_id += 1
+            self._users[user_id] = (user_info['name'], user_info['phone'], user_info['email'], user_info['date'],
+                                    user_info['time'], user_info['created_at'], self.USER_STATUS, customer_id)
+            return customer_id
+
+    def upsert_customer(self, name, phone, email):
+        with self._lock:
+            return self._upsert_customer(name, phone, email)
+
+    def get_user_id(self, user_info):
+        return self._customers.get((normalize_email(user_info['email']), normalize_phone(user_info['phone'])))
+
+    def all_users(self):
+        with self._lock:
+            rows = [(user_id,) + row for user_id, row in self._users.items()]
+        return sorted(rows, key=lambda row: row[6], reverse=True)
+
+    def booked_times(self, date_str):
+        with self._lock:
+            return list(self._booked.get(date_str, ()))
+
+    def iter_booked(self, start_date, end_date):
+        with self._lock:
+            dates = self._dates[bisect_left(self._dates, start_date):bisect_right(self._dates, end_date)]
+            rows = [(day, time_str) for day in dates for time_str in self._booked[day]]
+        yield from rows
+
+    def reserve_slot(self, user_id, date_str, time_str):
+        with self._lock:
+            times = self._booked.get(date_str)
+            if times is not None and time_str in times:
+                return None, list(times)
+            return self._claim(user_id, date_str, time_str), None
+
+    def cancel_appointment(self, appointment_id):
+        with self._lock:
+            appointment = self._appointments.get(appointment_id)
+            if appointment is None or appointment[3] != 'confirmed':
+                return None
+            appointment[3] = 'cancelled'
+            _, date_str, time_str = appointment[:3]
+            self._release(date_str, time_str)
+            return date_str, time_str
+
+    def reschedule_appointment(self, appointment_id, date_str, time_str):
+        with self._lock:
+            appointment = self._appointments.get(appointment_id)
+            if appointment is None or appointment[3] != 'confirmed':
+                return None, None
+            user_id, old_date, old_time = appointment[:3]
+            times = self._booked.get(date_str, [])
+            if time_str in times and (date_str, time_str) != (old_date, old_time):
+                return None, list(times)
+            appointment[3] = 'rescheduled'
+            self._release(old_date, old_time)
+            return self._claim(user_id, date_str, time_str), None
+
+    def customer_appointments(self, customer_id, from_date=None):
+        with self._lock:
+            rows = [(appointment_id, date_str, time_str)
+                    for appointment_id, (user_id, date_str, time_str, status, _) in self._appointments.items()
+                    if user_id == customer_id and status == 'confirmed' and date_str >= (from_date or '')]
+        return sorted(rows, key=lambda row: row[1:])
+
+    def _claim(self, user_id, date_str, time_str):
+        times = self._booked.get(date_str)
+        if times is None:
+            times = self._booked[date_str] = []
+            insort(self._dates, date_str)
+        insort(times, time_str)
+        appointment_id = self._next_appointment_id
+        self._next_appointment_id += 1
+        self._appointments[appointment_id] = [user_id, date_str, time_str, 'confirmed', datetime.now().isoformat()]
+        return appointment_id
+
+    def _release(self, date_str, time_str):
+        times = self._booked[date_str]
+        times.remove(time_str)
+        if not times:
+            del self._booked[date_str]
+            del self._dates[bisect_left(self._dates, date_str)]
@@ -0,0 +1,118 @@
+"""
+Concurrent execution of independent steps, in dependency order.
+
+A request that needs several lookups (the customer's id, a day's free slots,
+an offer across dates) declares them as steps naming the steps whose results
+they need. run_steps starts each step as soon as those have finished, so
+lookups that don't depend on each other wait on the database (or an LLM) at
+the same time instead of one after another; SQLite releases the GIL while it
+works. Steps run on a shared thread pool and must not call run_steps
+themselves.
+"""
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple, Tuple
+
+from chatbot.tracing import tracer
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Step(NamedTuple):
+    """
+    One unit of work: func is called with the results of the `after` steps as keyword arguments
+    """
+    name: str
+    func: Callable
+    after: Tuple[str, ...] = ()
+
+
+class SerialExecutor(Executor):
+    """Runs every step on the calling thread, one after another; for comparison and debugging"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def get_executor():
+    """Return the process-wide thread pool steps run on"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="chatbot-step")
+        return _executor
+
+
+def _order(steps):
+    """Check that dependencies exist and form no cycle"""
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Step names must be unique")
+    for step in steps:
+        unknown = set(step.after) - set(by_name)
+        if unknown:
+            raise ValueError(f"Step {step.name!r} depends on unknown steps {sorted(unknown)}")
+    done, remaining = set(), list(steps)
+    while remaining:
+        ready = [step for step in remaining if set(step.after) <= done]
+        if not ready:
+            raise ValueError(f"Steps {sorted(step.name for step in remaining)} depend on each other")
+        done.update(step.name for step in ready)
+        remaining = [step for step in remaining if step.name not in done]
+    return by_name
+
+
+def run_steps(steps, executor=None):
+    """
+    Run steps, each once its dependencies have finished, independent ones concurrently
+
+    A step that is the only one ready while nothing else runs is run on the
+    calling thread, so a chain of dependent steps costs no thread hand-offs.
+
+    Args:
+        steps (list): Step tuples
+        executor (Executor, optional): Pool to run steps on, default the shared pool
+
+    Returns:
+        dict: Step name -> result
+
+    Raises:
+        ValueError: If a dependency is unknown or the steps depend on each other
+        Exception: The first exception raised by a step; steps not yet started are skipped
+    """
+    by_name = _order(steps)
+    executor = executor or get_executor()
+    parent = tracer.current_span()
+    results, running, pending = {}, {}, list(steps)
+
+    def call(step):
+        with tracer.attach(parent):
+            return step.func(**{name: results[name] for name in step.after})
+
+    while pending or running:
+        ready = [step for step in pending if all(name in results for name in step.after)]
+        pending = [step for step in pending if step not in ready]
+        if len(ready) == 1 and not running:
+            results[ready[0].name] = ready[0].func(**{name: results[name] for name in ready[0].after})
+            continue
+        for step in ready:
+            running[executor.submit(call, step)] = step.name
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            name = running.pop(future)
+            error = future.exception()
+            if error is not None:
+                # Let steps already running finish, but start no more
+                wait(running)
+                raise error
+            results[name] = future.result()
+    return {name: results[name] for name in by_name}
@@ -0,0 +1,124 @@
+from datetime import date, datetime, timedelta
+
+from chatbot.tracing import traced
+
+# Stop looking for free slots this many days after the requested start
+DEFAULT_HORIZON_DAYS = 365
+
+
+class AvailabilityEngine:
+    """
+    Answers availability questions over date ranges with one query each.
+
+    Each day's bookings are folded into an integer bitmap with one bit per
+    entry of `available_slots`, so "which slots are free" is a mask operation
+    rather than a list comparison.
+    """
+
+    def __init__(self, repository, available_slots):
+        self.repository = repository
+        self.available_slots = list(available_slots)
+        self.slot_bits = {slot: 1 << i for i, slot in enumerate(self.available_slots)}
+        self.full_mask = (1 << len(self.available_slots)) - 1
+
+    def mask_to_slots(self, mask):
+        """Return the slots whose bits are set in mask, in slot order"""
+        return [slot for slot, bit in self.slot_bits.items() if mask & bit]
+
+    @traced("availability.booked_bitmaps")
+    def booked_bitmaps(self, start_date, end_date):
+        """
+        Fetch the booked-slot bitmap of every day in a range
+
+        Args:
+            start_date (str): First date, YYYY-MM-DD
+            end_date (str): Last date (inclusive), YYYY-MM-DD
+
+        Returns:
+            dict: date string -> bitmap of booked slots (days without bookings are omitted)
+        """
+        bitmaps = {}
+        for day, time_str in self.repository.iter_booked(start_date, end_date):
+            bitmaps[day] = bitmaps.get(day, 0) | self.slot_bits.get(time_str, 0)
+        return bitmaps
+
+    def available_in_range(self, start_date, end_date):
+        """
+        Free slots for every day in a date range, from a single query
+
+        Args:
+            start_date (str): First date, YYYY-MM-DD
+            end_date (str): Last date (inclusive), YYYY-MM-DD
+
+        Returns:
+            dict: date string -> list of free slots, for every day in the range
+        """
+        bitmaps = self.booked_bitmaps(start_date, end_date)
+        day = date.fromisoformat(start_date)
+        last = date.fromisoformat(end_date)
+        result = {}
+        while day <= last:
+            key = day.isoformat()
+            result[key] = self.mask_to_slots(self.full_mask & ~bitmaps.get(key, 0))
+            day += timedelta(days=1)
+        return result
+
+    @traced("availability.available_on")
+    def available_on(self, dates):
+        """
+        Free slots for any set of days, from a single query over the span they cover
+
+        Args:
+            dates (iterable): Date strings, YYYY-MM-DD
+
+        Returns:
+            dict: date string -> list of free slots, for every requested day in date order
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return {}
+        bitmaps = self.booked_bitmaps(dates[0], dates[-1])
+        return {day: self.mask_to_slots(self.full_mask & ~bitmaps.get(day, 0)) for day in dates}
+
+    @traced("availability.next_available")
+    def next_available(self, after=None, count=3, horizon_days=DEFAULT_HORIZON_DAYS):
+        """
+        Find the earliest free slots strictly after a point in time
+
+        Bookings are streamed in date order and the scan stops as soon as
+        `count` slots are found, so the cost depends on how many booked days
+        precede the first free slots, not on the horizon.
+
+        Args:
+            after (datetime, optional): Only return slots after this moment, defaults to now
+            count (int): Number of slots to return
+            horizon_days (int): Give up after this many days
+
+        Returns:
+            list: (date string, time string) tuples in chronological order
+        """
+        after = after or datetime.now()
+        first_day = after.date()
+        last_day = first_day + timedelta(days=horizon_days)
+        cutoff = after.strftime("%H:%M")
+        # Slots on the first day that have already started count as unavailable
+        first_day_mask = sum(bit for slot, bit in self.slot_bits.items() if slot <= cutoff)
+
+        found = []
+        rows = self.repository.iter_booked(first_day.isoformat(), last_day.isoformat())
+        pending = next(rows, None)
+        day = first_day
+        while day <= last_day and len(found) < count:
+            key = day.isoformat()
+            mask = first_day_mask if day == first_day else 0
+            while pending is not None and pending[0] <= key:
+                if pending[0] == key:
+                    mask |= self.slot_bits.get(pending[1], 0)
+                pending = next(rows, None)
+            for slot in self.mask_to_slots(self.full_mask & ~mask):
+                found.append((key, slot))
+                if len(found) == count:
+                    break
+            day += timedelta(days=1)
+        rows.close()
+        return found
@@ -0,0 +1,184 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from chatbot.database import BUSY_TIMEOUT_MS, ConnectionPool, get_pool
+
+DEFAULT_MAX_DATES = 2048
+# How long a cached read waits for the cache's connection. Other reads hold it for well under a
+# millisecond; a write can hold it for the whole busy timeout while another process has the lock.
+CONNECTION_WAIT = 0.05
+
+
+class AvailabilityCache:
+    """
+    Process-level cache of booked slots per date, shared by every booking tool
+    using the same database.
+
+    Bookings and cancellations made in this process go through the cache's own
+    connection and update the cached date in place (write-through). Changes
+    committed by any other connection or process are detected with
+    ``PRAGMA data_version``, which only changes when *another* connection
+    commits, and drop the whole cache.
+
+    The connection is guarded by its own lock and the cached entries by
+    another, held only while they change, so no SQLite call runs under the
+    entries lock. A read that can't get the connection within
+    CONNECTION_WAIT, because a write is waiting for another process's lock,
+    reads the date through the shared pool instead, uncached.
+    """
+
+    def __init__(self, db_name, max_dates=DEFAULT_MAX_DATES, busy_timeout_ms=BUSY_TIMEOUT_MS):
+        self.db_name = db_name
+        self.max_dates = max_dates
+        # A dedicated single connection: its own commits leave data_version unchanged.
+        # An in-memory database only exists on the shared pool's one connection.
+        shared = get_pool(db_name)
+        self._pool = shared if shared.in_memory else ConnectionPool(db_name, size=1, busy_timeout_ms=busy_timeout_ms)
+        self._entries = OrderedDict()
+        self._data_version = None
+        self._connection_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.bypasses = 0
+
+    def _validate(self, conn):
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            if version != self._data_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._data_version = version
+
+    @staticmethod
+    def _select_booked(conn, date_str):
+        return {row[0] for row in conn.execute(
+            "SELECT time FROM appointments WHERE date = ? AND status = 'confirmed'", (date_str,)
+        )}
+
+    def _store(self, date_str, booked):
+        self._entries[date_str] = booked
+        self._entries.move_to_end(date_str)
+        while len(self._entries) > self.max_dates:
+            self._entries.popitem(last=False)
+
+    def get_booked(self, date_str):
+        """
+        Booked times for a date, from the cache when it is still current
+
+        Args:
+            date_str (str): Date in YYYY-MM-DD format
+
+        Returns:
+            set: Times (HH:MM) held by confirmed appointments
+        """
+        if not self._connection_lock.acquire(timeout=CONNECTION_WAIT):
+            with self._lock:
+                self.bypasses += 1
+            with get_pool(self.db_name).connection() as conn:
+                return self._select_booked(conn, date_str)
+        try:
+            with self._pool.connection() as conn:
+                self._validate(conn)
+                with self._lock:
+                    booked = self._entries.get(date_str)
+                    if booked is not None:
+                        self.hits += 1
+                        self._entries.move_to_end(date_str)
+                        return set(booked)
+                    self.misses += 1
+                booked = self._select_booked(conn, date_str)
+                # Still holding the connection, so no write of ours can commit in between
+                with self._lock:
+                    self._store(date_str, booked)
+                return set(booked)
+        finally:
+            self._connection_lock.release()
+
+    @contextmanager
+    def write(self):
+        """
+        Run a write transaction on the cache's connection
+
+        Yields:
+            sqlite3.Connection: Connection to write with; commits on exit
+        """
+        with self._connection_lock, self._pool.connection() as conn:
+            # Pick up other writers' changes first so our own commit doesn't mask them
+            self._validate(conn)
+            yield conn
+
+    def record_booking(self, date_str, time_str):
+        """Write-through after a slot on date_str was confirmed in this process"""
+        with self._lock:
+            booked = self._entries.get(date_str)
+            if booked is not None:
+                booked.add(time_str)
+
+    def record_release(self, date_str, time_str):
+        """Write-through after a confirmed slot on date_str was cancelled in this process"""
+        with self._lock:
+            booked = self._entries.get(date_str)
+            if booked is not None:
+                booked.discard(time_str)
+
+    def record_booked(self, date_str, booked):
+        """Replace the cached entry with booked times read inside a write transaction"""
+        with self._lock:
+            self._store(date_str, set(booked))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss/invalidation counters and the number of cached dates"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "bypasses": self.bypasses,
+                "dates": len(self._entries),
+                "max_dates": self.max_dates,
+            }
+
+    def close(self):
+        if self._pool is not get_pool(self.db_name):
+            self._pool.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_availability_cache(db_name):
+    """
+    Return the process-wide availability cache for a database
+
+    Args:
+        db_name (str): Path to the SQLite database, or ":memory:"
+
+    Returns:
+        AvailabilityCache: Cache shared by every booking tool using the database
+    """
+    path = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+    key = (os.getpid(), path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = AvailabilityCache(db_name)
+        return cache
+
+
+def close_availability_cache(db_name):
+    """Close and forget the availability cache for a database, if there is one"""
+    path = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+    with _caches_lock:
+        cache = _caches.pop((os.getpid(), path), None)
+    if cache is not None:
+        cache.close()
@@ -1,61 +1,50 @@
 from datetime import datetime
-import re
-import sqlite3
+
+from chatbot.database import DatabaseLockedError
+from chatbot.repository import SQLiteRepository
+from chatbot.steps import Step, run_steps
+from chatbot.tools.availability import AvailabilityEngine
+from chatbot.tools.calendars import DEFAULT_SLOTS
+from chatbot.tools.time_parser import match_time
+from chatbot.tracing import traced
+
+BUSY_MESSAGE = "We're handling a lot of bookings right now. Please try again in a moment."
+# Most days one reply offers when a message names several dates or a range
+MAX_OFFER_DAYS = 14
+
 
 class AppointmentBookingTool:
-    def __init__(self, user_info_collector, date_tool, db_name='user_info.db'):
+    def __init__(self, user_info_collector, date_tool, db_name='user_info.db', cache_availability=True,
+                 repository=None, step_executor=None):
         self.user_info_collector = user_info_collector
         self.date_tool = date_tool
         self.db_name = db_name
+        # Storage for appointments, see chatbot/repository.py; SQLite unless one is passed in
+        self.repository = repository or SQLiteRepository(db_name, cache_availability=cache_availability)
+        # Set for the SQLite backend only
+        self.pool = getattr(self.repository, "pool", None)
+        self.cache = getattr(self.repository, "cache", None)
 
-        self.available_slots = [
-            "09:00", "10:00", "11:00",
-            "12:00", "13:00", "14:00",
-            "15:00", "16:00", "17:00"
-        ]
+        # Hourly slots of the default calendar; see chatbot/tools/calendars.py for per-provider hours
+        self.available_slots = list(DEFAULT_SLOTS)
+
+        self.availability = AvailabilityEngine(self.repository, self.available_slots)
+        # Where independent lookups run, see chatbot/steps.py; None uses the shared thread pool
+        self.step_executor = step_executor
 
         self._initialize_appointment_database()
 
+    @traced("booking.init_db")
     def _initialize_appointment_database(self):
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS appointments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER NOT NULL,
-                        date TEXT NOT NULL,
-                        time TEXT NOT NULL,
-                        status TEXT DEFAULT 'confirmed',
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY (user_id) REFERENCES user_data (id)
-                    )
-                ''')
-                conn.commit()
+            self.repository.initialize()
         except Exception as e:
             print(f"Appointment DB init error: {e}")
 
-    def _parse_time(self, time_str):
-        try:
-            time_str = time_str.strip().upper()
-            if "AM" not in time_str and "PM" not in time_str:
-                hour = int(re.search(r'\d+', time_str).group())
-                time_str += " AM" if hour < 12 else " PM"
-            if ":" not in time_str:
-                parts = time_str.split()
-                time_str = f"{parts[0]}:00 {parts[1]}"
-            return datetime.strptime(time_str, "%I:%M %p").strftime("%H:%M")
-        except Exception as e:
-            print(f"Time parse error: {e}")
-            return None
-
-
+    @traced("booking.get_booked_slots")
     def get_booked_slots(self, date_str):
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT time FROM appointments WHERE date = ? AND status = "confirmed"', (date_str,))
-                return [slot[0] for slot in cursor.fetchall()]
+            return self.repository.booked_times(date_str)
         except Exception as e:
             print(f"Error fetching booked slots: {e}")
             return []
@@ -70,46 +59,139 @@ class AppointmentBookingTool:
         return [slot for slot in self.available_slots if slot not in booked], None
 
     def extract_time_from_query(self, query):
-        match = re.search(r'\b(?:at|for|@)?\s*(\d{1,2}(?::\d{2})?\s*(?:AM|PM|am|pm)?)\b', query, re.IGNORECASE)
-        if match:
-            return self._parse_time(match.group(1))
-        return None
+        """Exact time (HH:MM) named in the query, or None; see chatbot/tools/time_parser.py"""
+        time_match = match_time(query)
+        return time_match.exact if time_match else None
 
+    @traced("booking.save_appointment")
     def save_appointment(self, user_id, date_str, time_str):
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO appointments (user_id, date, time, created_at)
-                    VALUES (?, ?, ?, ?)
-                ''', (user_id, date_str, time_str, datetime.now().isoformat()))
-                conn.commit()
-                return True
+            appointment_id, _ = self.repository.reserve_slot(user_id, date_str, time_str)
+            if not appointment_id:
+                print(f"Save appointment error: {date_str} {time_str} is already booked")
+            return bool(appointment_id)
+        except DatabaseLockedError:
+            raise
         except Exception as e:
             print(f"Save appointment error: {e}")
             return False
 
+    @traced("booking.cancel_appointment")
+    def cancel_appointment(self, appointment_id):
+        """
+        Cancel a confirmed appointment, freeing its slot
+
+        Args:
+            appointment_id (int): ID of the appointment to cancel
+
+        Returns:
+            bool: True if a confirmed appointment was cancelled
+
+        Raises:
+            DatabaseLockedError: Other writers held the database lock through every retry
+        """
+        try:
+            return self.repository.cancel_appointment(appointment_id) is not None
+        except DatabaseLockedError:
+            raise
+        except Exception as e:
+            print(f"Cancel appointment error: {e}")
+            return False
+
+    @traced("booking.reschedule_appointment")
+    def reschedule_appointment(self, appointment_id, date_str, time_str):
+        """
+        Move a confirmed appointment to another slot in a single transaction
+
+        The old slot is released and the new one claimed atomically: if the
+        new slot is taken, the appointment keeps its current slot.
+
+        Args:
+            appointment_id (int): ID of the confirmed appointment to move
+            date_str (str): New date in YYYY-MM-DD format
+            time_str (str): New time in HH:MM format
+
+        Returns:
+            tuple: (new_appointment_id, None) if moved, (None, available_slots) if the new
+                slot was taken, or (None, None) if there was no such appointment or on a
+                database error
+
+        Raises:
+            DatabaseLockedError: Other writers held the database lock through every retry
+        """
+        try:
+            appointment_id, booked = self.repository.reschedule_appointment(appointment_id, date_str, time_str)
+            if appointment_id:
+                return appointment_id, None
+            if booked is None:
+                return None, None
+            return None, [slot for slot in self.available_slots if slot not in booked]
+        except DatabaseLockedError:
+            raise
+        except Exception as e:
+            print(f"Reschedule appointment error: {e}")
+            return None, None
+
+    @traced("booking.get_upcoming_appointments")
+    def get_upcoming_appointments(self, user_info):
+        """Confirmed appointments of the customer in user_info from today on, as (id, date, time)"""
+        try:
+            user_id = self.repository.get_user_id(user_info)
+            if not user_id:
+                return []
+            return self.repository.customer_appointments(user_id, datetime.now().date().isoformat())
+        except Exception as e:
+            print(f"Appointment lookup error: {e}")
+            return []
+
+    @traced("booking.reserve_slot")
+    def reserve_slot(self, user_id, date_str, time_str):
+        """
+        Atomically claim a slot in a single transaction
+
+        The insert only succeeds if no confirmed appointment holds the slot
+        (enforced by a unique index), so two sessions can never both book it.
+
+        Args:
+            user_id (int): ID of the user booking the slot
+            date_str (str): Date in YYYY-MM-DD format
+            time_str (str): Time in HH:MM format
+
+        Returns:
+            tuple: (appointment_id, None) if reserved, (None, available_slots) if the
+                slot was already taken, or (None, None) on a database error
+
+        Raises:
+            DatabaseLockedError: Other writers held the database lock through every retry
+        """
+        try:
+            appointment_id, booked = self.repository.reserve_slot(user_id, date_str, time_str)
+            if appointment_id:
+                return appointment_id, None
+            return None, [slot for slot in self.available_slots if slot not in booked]
+        except DatabaseLockedError:
+            raise
+        except Exception as e:
+            print(f"Reserve slot error: {e}")
+            return None, None
+
+    @traced("booking.get_user_id")
     def get_user_id(self, user_info):
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id FROM user_data 
-                    WHERE name = ? AND phone = ? AND email = ?
-                    ORDER BY created_at DESC LIMIT 1
-                ''', (user_info['name'], user_info['phone'], user_info['email']))
-                result = cursor.fetchone()
-                return result[0] if result else None
+            return self.repository.get_user_id(user_info)
         except Exception as e:
             print(f"User ID fetch error: {e}")
             return None
 
+    @traced("booking.book_appointment")
     def book_appointment(self, query):
         date_str = self.date_tool.extract_date(query)
         if not date_str:
             return "I couldn't understand the date. Please use a format like 'next Monday' or 'YYYY-MM-DD'."
 
-        time_str = self.extract_time_from_query(query)
+        # An exact time, or a range ("morning", "after 3pm") that narrows the slots offered
+        time_match = match_time(query)
+        time_str = time_match.exact if time_match else None
         user_info = self.user_info_collector.get_user_info()
 
         if not all([user_info.get("name"), user_info.get("phone"), user_info.get("email")]):
@@ -117,32 +199,50 @@ class AppointmentBookingTool:
             self.user_info_collector.appointment_time = time_str
             return self.user_info_collector.start_collection()
 
-        available_slots, error = self.get_available_slots(date_str)
-        if error:
-            return error
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            return "Invalid date format. Use YYYY-MM-DD."
 
-        if not time_str:
-            return (
-                f"Available slots for {self._format_date(date_str)}:\n" +
-                "\n".join(f"- {slot}" for slot in available_slots) +
-                "\n\nPlease specify a time (e.g., 'at 2:00 PM')."
-            )
+        # The multi-date offer, the day's free slots and the customer's id don't depend on each
+        # other, so they are looked up concurrently; the id is only needed to book a given time
+        lookups = run_steps([
+            Step("offer", lambda: self.offer_candidates(query, time_match)),
+            Step("available_slots", lambda: self.get_available_slots(date_str)[0]),
+            Step("user_id", lambda: self.get_user_id(user_info) if time_str else None),
+        ], executor=self.step_executor)
 
-        if time_str not in available_slots:
-            return (
-                f"Sorry, {time_str} is not available on {self._format_date(date_str)}.\n" +
-                "Available times are:\n" +
-                "\n".join(f"- {slot}" for slot in available_slots)
-            )
+        # "next Tuesday or Thursday", "the week of March 10": offer every day at once instead of booking one
+        if lookups["offer"]:
+            return lookups["offer"]
+
+        # A time that is already taken is answered without opening a write transaction
+        available_slots = lookups["available_slots"]
+        if not time_str or time_str not in available_slots:
+            if time_match and not time_str:
+                available_slots = [slot for slot in available_slots if time_match.contains(slot)] or available_slots
+            if not time_str and available_slots:
+                return (
+                    f"Available slots for {self._format_date(date_str)}:\n" +
+                    "\n".join(f"- {slot}" for slot in available_slots) +
+                    "\n\nPlease specify a time (e.g., 'at 2:00 PM')."
+                )
+            return self._unavailable_message(date_str, time_str, available_slots)
 
-        user_id = self.get_user_id(user_info)
+        user_id = lookups["user_id"]
         if not user_id:
             if self.user_info_collector._save_to_database():
                 user_id = self.get_user_id(user_info)
             else:
                 return "We couldn't save your information. Please try again later."
 
-        if self.save_appointment(user_id, date_str, time_str):
+        # Availability is checked by the reservation itself, in the same transaction
+        try:
+            appointment_id, available_slots = self.reserve_slot(user_id, date_str, time_str)
+        except DatabaseLockedError as e:
+            print(f"Booking error: {e.to_dict()}")
+            return BUSY_MESSAGE
+        if appointment_id:
             return (
                 f"Appointment confirmed for {self._format_date(date_str)} at {time_str}.\n\n"
                 f"Details:\n"
@@ -150,9 +250,139 @@ class AppointmentBookingTool:
                 f"- Phone: {user_info['phone']}\n"
                 f"- Email: {user_info['email']}"
             )
+        elif available_slots is not None:
+            return self._unavailable_message(date_str, time_str, available_slots)
         else:
             return "Appointment was scheduled but failed to save. Please contact support."
 
+    def _upcoming_or_message(self):
+        user_info = self.user_info_collector.get_user_info()
+        if not all([user_info.get("name"), user_info.get("phone"), user_info.get("email")]):
+            return None, "I couldn't find a booking in this conversation. Please book an appointment first."
+        appointments = self.get_upcoming_appointments(user_info)
+        if not appointments:
+            return None, "You don't have any upcoming appointments."
+        return appointments, None
+
+    def _list_appointments(self, appointments):
+        return "\n".join(f"- {self._format_date(day)} at {slot}" for _, day, slot in appointments)
+
+    @traced("booking.cancel_booking")
+    def cancel_booking(self, query):
+        """Cancel the customer's appointment on the date (and time) named in the query, or their only one"""
+        appointments, message = self._upcoming_or_message()
+        if message:
+            return message
+
+        date_str = self.date_tool.extract_date(query)
+        time_str = self.extract_time_from_query(query)
+        matches = [a for a in appointments if (not date_str or a[1] == date_str) and (not time_str or a[2] == time_str)]
+        if not matches:
+            return "I couldn't find that appointment. Your upcoming appointments are:\n" + \
+                self._list_appointments(appointments)
+        if len(matches) > 1:
+            return "Which appointment would you like to cancel?\n" + self._list_appointments(matches) + \
+                "\n\nPlease include its date (e.g., 'cancel my appointment on Monday')."
+
+        appointment_id, day, slot = matches[0]
+        try:
+            cancelled = self.cancel_appointment(appointment_id)
+        except DatabaseLockedError as e:
+            print(f"Cancellation error: {e.to_dict()}")
+            return BUSY_MESSAGE
+        if not cancelled:
+            return "We couldn't cancel your appointment. Please contact support."
+        return f"Your appointment on {self._format_date(day)} at {slot} has been cancelled."
+
+    @traced("booking.reschedule_booking")
+    def reschedule_booking(self, query):
+        """Move the customer's appointment to the date and time named in the query, keeping its time if none is given"""
+        appointments, message = self._upcoming_or_message()
+        if message:
+            return message
+        if len(appointments) > 1:
+            return "You have several upcoming appointments:\n" + self._list_appointments(appointments) + \
+                "\n\nPlease cancel the one you want to change, then book a new time."
+
+        appointment_id, old_date, old_time = appointments[0]
+        date_str = self.date_tool.extract_date(query)
+        if not date_str:
+            return "Which date would you like to move your appointment to? (e.g., 'next Friday at 2 PM')"
+        time_str = self.extract_time_from_query(query) or old_time
+        if time_str not in self.available_slots:
+            available_slots, _ = self.get_available_slots(date_str)
+            return self._unavailable_message(date_str, time_str, available_slots)
+
+        # Releasing the old slot and claiming the new one happen in one transaction
+        try:
+            new_id, available_slots = self.reschedule_appointment(appointment_id, date_str, time_str)
+        except DatabaseLockedError as e:
+            print(f"Reschedule error: {e.to_dict()}")
+            return BUSY_MESSAGE
+        if new_id:
+            return (
+                f"Your appointment on {self._format_date(old_date)} at {old_time} has been moved to "
+                f"{self._format_date(date_str)} at {time_str}."
+            )
+        elif available_slots is not None:
+            return self._unavailable_message(date_str, time_str, available_slots)
+        else:
+            return "We couldn't change your appointment. Please contact support."
+
+    @traced("booking.offer_candidates")
+    def offer_candidates(self, query, time_match=None):
+        """
+        Offer free slots on every date and date range a query mentions, in one reply
+
+        Availability for all of them comes from one query over the span they cover.
+
+        Args:
+            query (str): User's query text
+            time_match (TimeMatch, optional): Time or range to keep slots within
+
+        Returns:
+            str: The offer, or None if the query names fewer than two upcoming days
+        """
+        today = self.date_tool.now().date().isoformat()
+        days = sorted({day for candidate in self.date_tool.find_dates(query)
+                       for day in candidate.dates() if day >= today})
+        if len(days) < 2:
+            return None
+
+        lines = []
+        for day, slots in self.availability.available_on(days[:MAX_OFFER_DAYS]).items():
+            if time_match:
+                slots = [slot for slot in slots if time_match.contains(slot)]
+            lines.append(f"- {self._format_date(day)}: {', '.join(slots) if slots else 'no free times'}")
+        return (
+            "Here are the open times for the dates you mentioned:\n" + "\n".join(lines) +
+            "\n\nPlease pick a day and time (e.g., 'Tuesday at 2:00 PM')."
+        )
+
+    def get_available_slots_range(self, start_date, end_date):
+        """Free slots for every day from start_date to end_date (inclusive), in one query"""
+        return self.availability.available_in_range(start_date, end_date)
+
+    def next_available_slots(self, after=None, count=3):
+        """The `count` earliest free (date, time) slots after `after` (default: now)"""
+        return self.availability.next_available(after, count=count)
+
+    def _unavailable_message(self, date_str, time_str, available_slots):
+        if available_slots:
+            return (
+                f"Sorry, {time_str} is not available on {self._format_date(date_str)}.\n" +
+                "Available times are:\n" +
+                "\n".join(f"- {slot}" for slot in available_slots)
+            )
+
+        # Nothing left that day: offer the nearest free slots instead
+        alternatives = self.next_available_slots(datetime.strptime(date_str, "%Y-%m-%d"))
+        return (
+            f"Sorry, {self._format_date(date_str)} is fully booked.\n" +
+            "The nearest available times are:\n" +
+            "\n".join(f"- {self._format_date(day)} at {slot}" for day, slot in alternatives)
+        )
+
     def _format_date(self, date_str):
         try:
             return datetime.strptime(date_str, "%Y-%m-%d").strftime("%A, %B %d, %Y")
@@ -0,0 +1,388 @@
+"""
+Per-provider calendars: working hours with breaks, and appointments of any length.
+
+Times are handled as minutes since midnight and every interval is half-open,
+``[start, end)``, so back-to-back appointments don't overlap. Each provider's
+bookings for a day are kept in an IntervalSet, whose overlap check is a binary
+search. CalendarStore persists providers and appointments in SQLite and
+re-checks overlaps inside the booking transaction, so concurrent bookings
+can't collide.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from chatbot.database import get_pool
+from chatbot.migrations import migrate
+from chatbot.tracing import traced
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DEFAULT_HOURS = ("09:00", "18:00")  # Every day, the hours the chat booking flow has always offered
+DEFAULT_SERVICE_MINUTES = 60
+DEFAULT_STEP_MINUTES = 15
+
+
+def to_minutes(time_str):
+    """Convert "HH:MM" to minutes since midnight"""
+    hours, minutes = time_str.split(":")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > 24 * 60:
+        raise ValueError(f"Invalid time '{time_str}'")
+    return hours * 60 + minutes
+
+
+def to_hhmm(minutes):
+    """Convert minutes since midnight to "HH:MM" """
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _weekday(day):
+    if isinstance(day, int):
+        return day
+    if isinstance(day, str) and day[:3].lower() in WEEKDAYS:
+        return WEEKDAYS.index(day[:3].lower())
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.weekday()
+
+
+class IntervalSet:
+    """
+    Sorted, non-overlapping half-open intervals.
+
+    Starts and ends are kept in two parallel sorted lists, so checking a new
+    interval against n existing ones takes O(log n).
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if not self.add(start, end):
+                raise ValueError(f"Overlapping interval {to_hhmm(start)}-{to_hhmm(end)}")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def overlaps(self, start, end):
+        """True if [start, end) intersects any interval in the set"""
+        # First interval ending after `start` is the only candidate
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def add(self, start, end):
+        """Insert [start, end); returns False (and leaves the set unchanged) on overlap"""
+        if end <= start or self.overlaps(start, end):
+            return False
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        return True
+
+    def remove(self, start, end):
+        """Remove the interval [start, end) if present; returns True if it was"""
+        i = bisect_left(self.starts, start)
+        if i < len(self.starts) and self.starts[i] == start and self.ends[i] == end:
+            del self.starts[i]
+            del self.ends[i]
+            return True
+        return False
+
+    def gaps(self, start, end):
+        """Yield the free sub-intervals of [start, end)"""
+        cursor = start
+        i = bisect_right(self.ends, start)
+        while i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] > cursor:
+                yield cursor, self.starts[i]
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if cursor < end:
+            yield cursor, end
+
+
+class WorkingHours:
+    """
+    Open intervals for each weekday, with breaks cut out.
+
+    Args:
+        hours (dict, optional): weekday ("mon".."sun" or 0-6) -> list of ("HH:MM", "HH:MM")
+            open intervals; defaults to DEFAULT_HOURS every day
+        breaks (list, optional): ("HH:MM", "HH:MM") intervals closed on every working day
+    """
+
+    def __init__(self, hours=None, breaks=None):
+        if hours is None:
+            hours = {day: [DEFAULT_HOURS] for day in range(7)}
+        closed = [(to_minutes(start), to_minutes(end)) for start, end in breaks or []]
+
+        self.intervals = {}
+        for day, spans in hours.items():
+            opened = IntervalSet((to_minutes(start), to_minutes(end)) for start, end in spans)
+            for start, end in list(opened):
+                pieces = IntervalSet(closed).gaps(start, end) if closed else [(start, end)]
+                opened.remove(start, end)
+                for piece in pieces:
+                    opened.add(*piece)
+            self.intervals[_weekday(day)] = list(opened)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (weekday, start_minute, end_minute) rows as stored in provider_hours"""
+        hours = cls({})
+        for weekday, start, end in rows:
+            hours.intervals.setdefault(weekday, []).append((start, end))
+        for spans in hours.intervals.values():
+            spans.sort()
+        return hours
+
+    def rows(self):
+        """(weekday, start_minute, end_minute) rows for provider_hours"""
+        return [(day, start, end) for day, spans in sorted(self.intervals.items()) for start, end in spans]
+
+    def for_day(self, day):
+        """Open intervals on a date, weekday name or weekday number"""
+        return self.intervals.get(_weekday(day), [])
+
+    def contains(self, day, start, end):
+        """True if [start, end) lies entirely inside one open interval"""
+        return any(open_start <= start and end <= open_end for open_start, open_end in self.for_day(day))
+
+    def slot_starts(self, day, duration=DEFAULT_SERVICE_MINUTES, step=None):
+        """Start times ("HH:MM") of every `duration`-minute slot that fits, `step` minutes apart"""
+        step = step or duration
+        return [to_hhmm(m) for start, end in self.for_day(day) for m in range(start, end - duration + 1, step)]
+
+
+# The hourly slots offered when no provider is involved
+DEFAULT_SLOTS = WorkingHours().slot_starts(0)
+
+
+class ProviderCalendar:
+    """One provider's working hours and booked intervals, by date."""
+
+    def __init__(self, provider_id, name, hours, bookings=None):
+        self.provider_id = provider_id
+        self.name = name
+        self.hours = hours
+        self.bookings = bookings if bookings is not None else {}
+
+    def _day(self, date_str):
+        return self.bookings.setdefault(date_str, IntervalSet())
+
+    def is_free(self, date_str, start, end):
+        """True if [start, end) on date_str is within working hours and not booked"""
+        if not self.hours.contains(date_str, start, end):
+            return False
+        booked = self.bookings.get(date_str)
+        return booked is None or not booked.overlaps(start, end)
+
+    def book(self, date_str, start, end):
+        """Add a booking in memory; returns False if the interval isn't free"""
+        return self.is_free(date_str, start, end) and self._day(date_str).add(start, end)
+
+    def release(self, date_str, start, end):
+        booked = self.bookings.get(date_str)
+        return booked is not None and booked.remove(start, end)
+
+    def free_slots(self, date_str, duration=DEFAULT_SERVICE_MINUTES, step=DEFAULT_STEP_MINUTES):
+        """
+        Start times at which a `duration`-minute appointment fits
+
+        Args:
+            date_str (str): Date in YYYY-MM-DD format
+            duration (int): Appointment length in minutes
+            step (int): Candidate starts are multiples of this many minutes
+
+        Returns:
+            list: Start times ("HH:MM") in order
+        """
+        booked = self.bookings.get(date_str) or IntervalSet()
+        starts = []
+        for open_start, open_end in self.hours.for_day(date_str):
+            for gap_start, gap_end in booked.gaps(open_start, open_end):
+                first = -(-gap_start // step) * step
+                starts.extend(to_hhmm(m) for m in range(first, gap_end - duration + 1, step))
+        return starts
+
+
+class CalendarStore:
+    """
+    SQLite-backed provider calendars.
+
+    Working hours are cached per provider after the first read; bookings are
+    always checked against the database inside the booking transaction.
+    """
+
+    def __init__(self, db_name='user_info.db'):
+        self.db_name = db_name
+        self.pool = get_pool(db_name)
+        migrate(self.pool)
+        self._hours = {}
+        self._names = {}
+
+    @traced("calendar.add_provider")
+    def add_provider(self, name, hours=None, breaks=None):
+        """
+        Create a provider
+
+        Args:
+            name (str): Display name
+            hours (dict, optional): Working hours, see WorkingHours
+            breaks (list, optional): Daily breaks, see WorkingHours
+
+        Returns:
+            int: New provider ID
+        """
+        working_hours = WorkingHours(hours, breaks)
+        with self.pool.connection() as conn:
+            provider_id = conn.execute(
+                "INSERT INTO providers (name, created_at) VALUES (?, ?)", (name, datetime.now().isoformat())
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO provider_hours (provider_id, weekday, start_minute, end_minute) VALUES (?, ?, ?, ?)",
+                [(provider_id, *row) for row in working_hours.rows()]
+            )
+        self._hours[provider_id] = working_hours
+        self._names[provider_id] = name
+        return provider_id
+
+    def _load_hours(self, conn, provider_ids):
+        missing = [pid for pid in provider_ids if pid not in self._hours]
+        if not missing:
+            return
+        rows = {}
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for pid, name in conn.execute(f"SELECT id, name FROM providers WHERE id IN ({placeholders})", chunk):
+                self._names[pid] = name
+                rows.setdefault(pid, [])
+            for pid, *row in conn.execute(f'''
+                SELECT provider_id, weekday, start_minute, end_minute FROM provider_hours
+                WHERE provider_id IN ({placeholders})
+            ''', chunk):
+                rows.setdefault(pid, []).append(row)
+        for pid, provider_rows in rows.items():
+            self._hours[pid] = WorkingHours.from_rows(provider_rows)
+
+    def provider_ids(self):
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT id FROM providers ORDER BY id")]
+
+    @traced("calendar.load_day")
+    def load_day(self, date_str, provider_ids=None):
+        """
+        Load calendars of many providers for one date, with two queries
+
+        Args:
+            date_str (str): Date in YYYY-MM-DD format
+            provider_ids (list, optional): Providers to load, defaults to all of them
+
+        Returns:
+            dict: provider ID -> ProviderCalendar holding that date's bookings
+        """
+        with self.pool.connection() as conn:
+            if provider_ids is None:
+                provider_ids = [row[0] for row in conn.execute("SELECT id FROM providers ORDER BY id")]
+            self._load_hours(conn, provider_ids)
+            calendars = {
+                pid: ProviderCalendar(pid, self._names.get(pid), self._hours[pid])
+                for pid in provider_ids if pid in self._hours
+            }
+            # Served in provider order from idx_provider_appointments_date
+            for pid, start, end in conn.execute('''
+                SELECT provider_id, start_minute, end_minute FROM provider_appointments
+                WHERE date = ? AND status = 'confirmed'
+            ''', (date_str,)):
+                calendar = calendars.get(pid)
+                if calendar is not None:
+                    calendar._day(date_str).add(start, end)
+        return calendars
+
+    def get_calendar(self, provider_id, date_str):
+        """One provider's calendar with its bookings on date_str, or None if the provider doesn't exist"""
+        return self.load_day(date_str, [provider_id]).get(provider_id)
+
+    def free_slots(self, provider_id, date_str, duration=DEFAULT_SERVICE_MINUTES, step=DEFAULT_STEP_MINUTES):
+        """Start times ("HH:MM") on date_str where a `duration`-minute appointment with the provider fits"""
+        calendar = self.get_calendar(provider_id, date_str)
+        return calendar.free_slots(date_str, duration, step) if calendar else []
+
+    @traced("calendar.find_available_providers")
+    def find_available_providers(self, date_str, start_str, duration=DEFAULT_SERVICE_MINUTES, provider_ids=None):
+        """IDs of providers who could take a `duration`-minute appointment at start_str on date_str"""
+        start = to_minutes(start_str)
+        end = start + duration
+        return [pid for pid, calendar in self.load_day(date_str, provider_ids).items()
+                if calendar.is_free(date_str, start, end)]
+
+    @traced("calendar.book")
+    def book(self, provider_id, user_id, date_str, start_str, duration=DEFAULT_SERVICE_MINUTES):
+        """
+        Book an appointment of any length with a provider
+
+        Args:
+            provider_id (int): Provider to book
+            user_id (int): User the appointment is for
+            date_str (str): Date in YYYY-MM-DD format
+            start_str (str): Start time, HH:MM
+            duration (int): Length in minutes
+
+        Returns:
+            tuple: (appointment_id, None) if booked, otherwise (None, reason)
+        """
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+            start = to_minutes(start_str)
+        except ValueError as e:
+            return None, str(e)
+        end = start + duration
+        if duration <= 0:
+            return None, "Duration must be positive"
+
+        try:
+            with self.pool.connection() as conn:
+                self._load_hours(conn, [provider_id])
+                hours = self._hours.get(provider_id)
+                if hours is None:
+                    return None, "Unknown provider"
+                if not hours.contains(date_str, start, end):
+                    return None, "Outside working hours"
+
+                conn.execute("BEGIN IMMEDIATE")
+                clash = conn.execute('''
+                    SELECT 1 FROM provider_appointments
+                    WHERE provider_id = ? AND date = ? AND status = 'confirmed'
+                      AND start_minute < ? AND end_minute > ?
+                    LIMIT 1
+                ''', (provider_id, date_str, end, start)).fetchone()
+                if clash:
+                    return None, "Overlaps an existing appointment"
+                appointment_id = conn.execute('''
+                    INSERT INTO provider_appointments
+                        (provider_id, user_id, date, start_minute, end_minute, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, 'confirmed', ?)
+                ''', (provider_id, user_id, date_str, start, end, datetime.now().isoformat())).lastrowid
+                return appointment_id, None
+        except Exception as e:
+            print(f"Calendar booking error: {e}")
+            return None, "Database error"
+
+    @traced("calendar.cancel")
+    def cancel(self, appointment_id):
+        """Cancel a confirmed provider appointment; returns True if one was cancelled"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.execute(
+                    "UPDATE provider_appointments SET status = 'cancelled' WHERE id = ? AND status = 'confirmed'",
+                    (appointment_id,)
+                )
+                return cursor.rowcount == 1
+        except Exception as e:
+            print(f"Calendar cancel error: {e}")
+            return False
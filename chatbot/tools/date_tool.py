@@ -1,13 +1,108 @@
 from datetime import datetime, timedelta
 import re
 import calendar
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from chatbot.tracing import traced
+
+# Every pattern is compiled once. Each rule keeps the exact regex (and
+# first-match behaviour) it always had, so results don't change; only the
+# weekday rules, which used to format and search one pattern per day name,
+# are folded into a single scan each.
+ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+NUMERIC_DATES = [
+    (re.compile(r"\b(\d{1,2}/\d{1,2}/\d{4})\b"), "%m/%d/%Y"),  # MM/DD/YYYY
+    (re.compile(r"\b(\d{1,2}-\d{1,2}-\d{4})\b"), "%m-%d-%Y"),  # MM-DD-YYYY
+    (re.compile(r"\b(\d{1,2}\.\d{1,2}\.\d{4})\b"), "%m.%d.%Y")  # MM.DD.YYYY
+]
+# Every day name starts with its three-letter form, so "next <name>" occurs exactly when "next <abbr>" does
+NEXT_DAY = re.compile(r"next (mon|tue|wed|thu|fri|sat|sun)")
+THIS_DAY = re.compile(r"this (mon|tue|wed|thu|fri|sat|sun)")
+# Longer names first so the trailing \b can match
+DAY_WORD = re.compile(
+    r"\b(monday|mon|tuesday|tues|tue|wednesday|wed|thursday|thurs|thu|friday|fri|saturday|sat|sunday|sun)\b"
+)
+MONTH_DAY = re.compile(r"(?:(?:on|for)\s+)?([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?")
+TIME_DELTA = re.compile(r"in\s+(\d+)\s+(day|days|week|weeks|month|months)")
+DIGIT = re.compile(r"\d")
+WORD_REST = re.compile(r"[a-z]*")
+
+# find_dates() collects every date, so its patterns are stricter than the first-match rules above:
+# "march 2024" is no month and day, and "within 3 days" doesn't contain "in 3 days"
+DAY_AFTER_TOMORROW = re.compile(r"\bday after tomorrow\b")
+MONTH_DAY_WORD = re.compile(r"\b([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?(?!\d)")
+IN_DELTA = re.compile(r"\bin\s+(\d+)\s+(day|days|week|weeks|month|months)\b")
+# "March 10-14", "March 28 to April 2", "between March 10 and 14"
+DATE_RANGE = re.compile(
+    r"\b(between\s+)?([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s*(?:-|to|through|thru|until|till|(?(1)and|(?!)))\s*"
+    r"(?:([a-z]+)\s+)?(\d{1,2})(?:st|nd|rd|th)?\b"
+)
+WEEK_OF = re.compile(r"\bweek of\s+(?:the\s+)?(?:(\d{4}-\d{2}-\d{2})|([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?(?!\d))")
+RELATIVE_WEEK = re.compile(r"\b(this|next)\s+(week|weekend)\b")
+
+# How sure each reading is: explicit dates are certain, a bare "friday" or "in 2 months" less so
+CONFIDENCE = {
+    "iso": 1.0, "today": 1.0, "tomorrow": 1.0, "day_after_tomorrow": 1.0,
+    "numeric": 0.9, "month_day": 0.9, "next_weekday": 0.9, "this_weekday": 0.9, "date_range": 0.9,
+    "weekday": 0.8, "relative": 0.8, "week_of": 0.8, "week": 0.8, "weekend": 0.8,
+}
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class DateMatch(NamedTuple):
+    """A date found in a message: where it was (start/end offsets) and which rule found it"""
+    date: str
+    start: int
+    end: int
+    rule: str
+
+
+class DateCandidate(NamedTuple):
+    """
+    One date or date range a message may mean
+
+    first and last are YYYY-MM-DD and equal for a single date; start/end are
+    offsets of the matched text; confidence (0-1) is how sure the reading is.
+    """
+    first: str
+    last: str
+    start: int
+    end: int
+    rule: str
+    confidence: float
+
+    def dates(self):
+        """Every date from first to last, YYYY-MM-DD"""
+        day, last = datetime.strptime(self.first, "%Y-%m-%d"), datetime.strptime(self.last, "%Y-%m-%d")
+        days = []
+        while day <= last:
+            days.append(day.date().isoformat())
+            day += timedelta(days=1)
+        return days
+
 
 class DateExtractionTool:
   
     #  Tool for extracting dates from natural language text
    
-    def __init__(self):
-        """Initialize the date extraction tool with pattern matchers"""
+    def __init__(self, clock=None, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Initialize the date extraction tool with pattern matchers
+
+        Args:
+            clock (callable, optional): Returns the current datetime, default datetime.now
+            cache_size (int): Parsed queries remembered per reference date; 0 disables the memo
+        """
+        self.clock = clock
+        self.cache_size = cache_size
+        # (lowered query, reference date) -> DateMatch or None, least recently used first
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
         # Dictionary mapping day names to their index (0 = Monday, 6 = Sunday)
         self.day_indices = {
             "monday": 0, "mon": 0,
@@ -35,22 +130,168 @@ class DateExtractionTool:
             "december": 12, "dec": 12
         }
     
-    def _next_day_of_week(self, day_index):
+    def now(self):
+        """Current time from the injected clock, or datetime.now"""
+        return self.clock() if self.clock else datetime.now()
+
+    def _next_day_of_week(self, day_index, today=None):
         """
         Calculate the date of the next occurrence of a day of the week
         
         Args:
             day_index (int): Index of the day (0 = Monday, 6 = Sunday)
+            today (datetime, optional): Reference time, default now
             
         Returns:
             datetime: Date of the next occurrence
         """
-        today = datetime.now()
+        today = today or self.now()
         days_ahead = day_index - today.weekday()
         if days_ahead <= 0:  # Target day already happened this week
             days_ahead += 7
         return today + timedelta(days=days_ahead)
+
+    def _first_day(self, pattern, query):
+        """Match naming the earliest weekday (0 = Monday) among all matches of pattern, or None"""
+        best = None
+        for match in pattern.finditer(query):
+            if best is None or self.day_indices[match.group(1)] < self.day_indices[best.group(1)]:
+                best = match
+        return best
+
+    def _word_span(self, match, query):
+        # The pattern may stop mid-word ("next mon", "in 3 week"); report the whole word
+        return match.start(), WORD_REST.match(query, match.end()).end()
     
+    def _month_day(self, month_name, day, now, after=None):
+        """Next occurrence of a month and day on or after `after` (default today), or None"""
+        month = self.month_names.get(month_name)
+        if month is None:
+            return None
+        after = after or now.date()
+        for year in (after.year, after.year + 1):
+            try:
+                candidate = datetime(year, month, int(day)).date()
+            except ValueError:
+                return None
+            if candidate >= after:
+                return candidate
+        return None
+
+    @traced("date.find_all")
+    def find_dates(self, query, reference=None):
+        """
+        Find every date and date range a query mentions
+
+        "next Tuesday or Thursday, or any day the week of March 10" gives three
+        candidates. Where readings overlap, the longest wins ("week of March 10"
+        over "March 10"), and each date or range is listed once.
+
+        Args:
+            query (str): User's query text
+            reference (datetime, optional): Time relative dates are resolved against, default now
+
+        Returns:
+            list: DateCandidate for each date or range, in the order they appear
+        """
+        query = query.lower()
+        now = reference or self.now()
+        today = now.date()
+        found = []
+
+        def add(first, last, span, rule, confidence=None):
+            found.append(DateCandidate(first.isoformat(), last.isoformat(), span[0], span[1], rule,
+                                       confidence or CONFIDENCE[rule]))
+
+        for match in ISO_DATE.finditer(query):
+            try:
+                day = datetime.strptime(match.group(1), "%Y-%m-%d").date()
+                add(day, day, match.span(1), "iso")
+            except ValueError:
+                pass
+        for pattern, format_str in NUMERIC_DATES:
+            for match in pattern.finditer(query):
+                try:
+                    day = datetime.strptime(match.group(1), format_str).date()
+                    add(day, day, match.span(1), "numeric")
+                except ValueError:
+                    pass
+        for word, offset in (("today", 0), ("tomorrow", 1)):
+            for match in re.finditer(word, query):
+                day = today + timedelta(days=offset)
+                add(day, day, match.span(), word)
+        for match in DAY_AFTER_TOMORROW.finditer(query):
+            day = today + timedelta(days=2)
+            add(day, day, match.span(), "day_after_tomorrow")
+
+        for match in NEXT_DAY.finditer(query):
+            day = self._next_day_of_week(self.day_indices[match.group(1)], now).date()
+            add(day, day, self._word_span(match, query), "next_weekday")
+        for match in THIS_DAY.finditer(query):
+            days_ahead = (self.day_indices[match.group(1)] - now.weekday()) % 7
+            day = today + timedelta(days=days_ahead)
+            add(day, day, self._word_span(match, query), "this_weekday")
+        for match in DAY_WORD.finditer(query):
+            day = self._next_day_of_week(self.day_indices[match.group(1)], now).date()
+            add(day, day, match.span(), "weekday")
+
+        for match in MONTH_DAY_WORD.finditer(query):
+            day = self._month_day(match.group(1), match.group(2), now)
+            if day:
+                add(day, day, (match.start(1), match.end()), "month_day")
+        for match in IN_DELTA.finditer(query):
+            amount, unit = int(match.group(1)), match.group(2)
+            if unit.startswith("day"):
+                day = today + timedelta(days=amount)
+            elif unit.startswith("week"):
+                day = today + timedelta(weeks=amount)
+            else:
+                day = today + timedelta(days=30 * amount)
+            add(day, day, match.span(), "relative", 0.6 if unit.startswith("month") else None)
+
+        for match in DATE_RANGE.finditer(query):
+            first = self._month_day(match.group(2), match.group(3), now)
+            if first:
+                last = self._month_day(match.group(4) or match.group(2), match.group(5), now, after=first)
+                if last:
+                    add(first, last, match.span(), "date_range")
+        for match in WEEK_OF.finditer(query):
+            if match.group(1):
+                try:
+                    day = datetime.strptime(match.group(1), "%Y-%m-%d").date()
+                except ValueError:
+                    continue
+            else:
+                day = self._month_day(match.group(2), match.group(3), now)
+                if not day:
+                    continue
+            monday = day - timedelta(days=day.weekday())
+            add(monday, monday + timedelta(days=6), match.span(), "week_of")
+        for match in RELATIVE_WEEK.finditer(query):
+            monday = today - timedelta(days=today.weekday())
+            if match.group(1) == "next":
+                monday += timedelta(weeks=1)
+            if match.group(2) == "weekend":
+                add(monday + timedelta(days=5), monday + timedelta(days=6), match.span(), "weekend")
+            else:
+                # The rest of this week, or all of next week
+                add(max(monday, today), monday + timedelta(days=6), match.span(), "week")
+
+        # Longest reading first at each position; drop readings inside one already kept
+        found.sort(key=lambda c: (c.start, -c.end))
+        kept = []
+        for candidate in found:
+            if not any(k.start <= candidate.start and candidate.end <= k.end for k in kept):
+                kept.append(candidate)
+        # The same dates mentioned twice ("friday, next friday") are listed once, with the surer reading
+        result = {}
+        for candidate in kept:
+            key = (candidate.first, candidate.last)
+            if key not in result or candidate.confidence > result[key].confidence:
+                result[key] = candidate
+        return list(result.values())
+
+    @traced("date.extract")
     def extract_date(self, query):
         """
         Extract date from natural language query
@@ -61,96 +302,158 @@ class DateExtractionTool:
         Returns:
             str: Extracted date in YYYY-MM-DD format, or None if no date found
         """
-        # Lower case for easier matching
-        query = query.lower()
+        match = self.match_date(query)
+        return match.date if match else None
+
+    def match_date(self, query, reference=None):
+        """
+        Find the date in a query, with where it was found and which rule found it
         
-        # Check for exact date formats (YYYY-MM-DD)
-        date_pattern = r"\b(\d{4}-\d{2}-\d{2})\b"
-        date_match = re.search(date_pattern, query)
-        if date_match:
-            try:
-                date_str = date_match.group(1)
-                return datetime.strptime(date_str, "%Y-%m-%d").date().isoformat()
-            except ValueError:
-                pass
+        Rules are tried in a fixed order and the first that matches wins:
+        YYYY-MM-DD, numeric dates, today/tomorrow, next/this/bare weekday,
+        month and day, then "in N days/weeks/months".
+
+        The clock is read once, so one call can't straddle midnight. Results
+        only depend on the query and the reference date, and are memoized on
+        both: parsing the same message again the same day is a dict lookup.
+        
+        Args:
+            query (str): User's query text
+            reference (datetime, optional): Time relative dates are resolved against, default now
+            
+        Returns:
+            DateMatch: date (YYYY-MM-DD), start and end of the matched text, and rule name;
+                None if no date found
+        """
+        # Lower case for easier matching
+        lowered = query.lower()
+        if len(lowered) != len(query):
+            # A few characters lower-case to two (e.g. "İ"); keep offsets pointing into the original
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in query)
+        now = reference or self.now()
+        if not self.cache_size:
+            return self._match(lowered, now)
+
+        key = (lowered, now.date())
+        with self._memo_lock:
+            if key in self._memo:
+                self.hits += 1
+                self._memo.move_to_end(key)
+                return self._memo[key]
+            self.misses += 1
+        match = self._match(lowered, now)
+        with self._memo_lock:
+            self._memo[key] = match
+            while len(self._memo) > self.cache_size:
+                self._memo.popitem(last=False)
+        return match
+
+    def cache_stats(self):
+        """Return memo hit/miss counters and the number of remembered queries"""
+        with self._memo_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._memo),
+                "max_entries": self.cache_size,
+            }
+
+    def clear_cache(self):
+        with self._memo_lock:
+            self._memo.clear()
+
+    def _match(self, query, now):
+        """match_date on an already lower-cased query, against a fixed reference time"""
+        # Only the weekday and today/tomorrow rules can match without a digit
+        has_digit = DIGIT.search(query) is not None
         
-        # Check for other common date formats (MM/DD/YYYY, DD/MM/YYYY)
-        for pattern, format_str in [
-            (r"\b(\d{1,2}/\d{1,2}/\d{4})\b", "%m/%d/%Y"),  # MM/DD/YYYY
-            (r"\b(\d{1,2}-\d{1,2}-\d{4})\b", "%m-%d-%Y"),  # MM-DD-YYYY
-            (r"\b(\d{1,2}\.\d{1,2}\.\d{4})\b", "%m.%d.%Y")  # MM.DD.YYYY
-        ]:
-            date_match = re.search(pattern, query)
+        if has_digit:
+            # Check for exact date formats (YYYY-MM-DD)
+            date_match = ISO_DATE.search(query)
             if date_match:
                 try:
-                    date_str = date_match.group(1)
-                    return datetime.strptime(date_str, format_str).date().isoformat()
+                    date_str = datetime.strptime(date_match.group(1), "%Y-%m-%d").date().isoformat()
+                    return DateMatch(date_str, *date_match.span(1), "iso")
                 except ValueError:
-                    continue
+                    pass
+            
+            # Check for other common date formats (MM/DD/YYYY, MM-DD-YYYY, MM.DD.YYYY)
+            for pattern, format_str in NUMERIC_DATES:
+                date_match = pattern.search(query)
+                if date_match:
+                    try:
+                        date_str = datetime.strptime(date_match.group(1), format_str).date().isoformat()
+                        return DateMatch(date_str, *date_match.span(1), "numeric")
+                    except ValueError:
+                        continue
         
-        # Check for today, tomorrow, day after tomorrow
-        if "today" in query:
-            return datetime.now().date().isoformat()
-        elif "tomorrow" in query:
-            return (datetime.now() + timedelta(days=1)).date().isoformat()
-        elif "day after tomorrow" in query:
-            return (datetime.now() + timedelta(days=2)).date().isoformat()
+        # Check for today, tomorrow ("day after tomorrow" has always resolved to tomorrow)
+        position = query.find("today")
+        if position >= 0:
+            return DateMatch(now.date().isoformat(), position, position + 5, "today")
+        position = query.find("tomorrow")
+        if position >= 0:
+            return DateMatch((now + timedelta(days=1)).date().isoformat(), position, position + 8, "tomorrow")
         
-        # Check for next [day of week]
-        for day_name, day_index in self.day_indices.items():
-            if f"next {day_name}" in query:
-                return self._next_day_of_week(day_index).date().isoformat()
+        # Check for next [day of week]; with several, the earliest in the week wins
+        day_match = self._first_day(NEXT_DAY, query)
+        if day_match:
+            date_obj = self._next_day_of_week(self.day_indices[day_match.group(1)], now)
+            return DateMatch(date_obj.date().isoformat(), *self._word_span(day_match, query), "next_weekday")
         
         # Check for this [day of week]
-        for day_name, day_index in self.day_indices.items():
-            if f"this {day_name}" in query:
-                today = datetime.now()
-                days_ahead = day_index - today.weekday()
-                if days_ahead < 0:  # Already passed this week
-                    days_ahead += 7
-                return (today + timedelta(days=days_ahead)).date().isoformat()
+        day_match = self._first_day(THIS_DAY, query)
+        if day_match:
+            days_ahead = self.day_indices[day_match.group(1)] - now.weekday()
+            if days_ahead < 0:  # Already passed this week
+                days_ahead += 7
+            date_obj = now + timedelta(days=days_ahead)
+            return DateMatch(date_obj.date().isoformat(), *self._word_span(day_match, query), "this_weekday")
         
         # Check for just [day of week] (assumes next occurrence)
-        for day_name, day_index in self.day_indices.items():
-            day_pattern = f"\\b{day_name}\\b"
-            if re.search(day_pattern, query):
-                return self._next_day_of_week(day_index).date().isoformat()
+        day_match = self._first_day(DAY_WORD, query)
+        if day_match:
+            date_obj = self._next_day_of_week(self.day_indices[day_match.group(1)], now)
+            return DateMatch(date_obj.date().isoformat(), *day_match.span(), "weekday")
+        
+        if not has_digit:
+            return None
         
-        # Check for month and day (e.g., "January 15")
-        month_day_pattern = r"(?:(?:on|for)\s+)?([a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?"
-        month_day_match = re.search(month_day_pattern, query)
+        # Check for month and day (e.g., "January 15"); only the first word-number pair counts
+        month_day_match = MONTH_DAY.search(query)
         if month_day_match:
-            month_name = month_day_match.group(1).lower()
+            month_name = month_day_match.group(1)
             day = int(month_day_match.group(2))
             
             if month_name in self.month_names:
                 month = self.month_names[month_name]
-                year = datetime.now().year
+                year = now.year
                 
                 # If the date has already passed this year, assume next year
                 try:
                     date_obj = datetime(year, month, day)
-                    if date_obj.date() < datetime.now().date():
+                    if date_obj.date() < now.date():
                         date_obj = datetime(year + 1, month, day)
-                    return date_obj.date().isoformat()
+                    return DateMatch(date_obj.date().isoformat(), month_day_match.start(1), month_day_match.end(),
+                                     "month_day")
                 except ValueError:
                     # Invalid date (e.g., February 30)
                     pass
         
         # Check for "in X days/weeks/months"
-        time_delta_pattern = r"in\s+(\d+)\s+(day|days|week|weeks|month|months)"
-        time_delta_match = re.search(time_delta_pattern, query)
+        time_delta_match = TIME_DELTA.search(query)
         if time_delta_match:
             amount = int(time_delta_match.group(1))
             unit = time_delta_match.group(2)
             
             if unit in ["day", "days"]:
-                return (datetime.now() + timedelta(days=amount)).date().isoformat()
+                date_obj = now + timedelta(days=amount)
             elif unit in ["week", "weeks"]:
-                return (datetime.now() + timedelta(weeks=amount)).date().isoformat()
-            elif unit in ["month", "months"]:
+                date_obj = now + timedelta(weeks=amount)
+            else:
                 # Approximation for months
-                return (datetime.now() + timedelta(days=30*amount)).date().isoformat()
+                date_obj = now + timedelta(days=30*amount)
+            return DateMatch(date_obj.date().isoformat(), *self._word_span(time_delta_match, query), "relative")
         
         # No date found
         return None
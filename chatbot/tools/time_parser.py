@@ -0,0 +1,198 @@
+"""
+Time and time-range parsing for chat messages.
+
+One compiled scan finds exact times ("2pm", "14:30", "at 10", "noon") and
+ranges ("between 2 and 4", "2-4pm", "after 3pm", "before noon", "morning"),
+with where each was found. Only numbers that look like times are taken: a
+bare number needs "at", "around" or "@" in front of it, and numbers inside
+dates ("2025-04-15", "4/15/2025", "March 15") are never read as hours.
+"""
+import re
+from typing import NamedTuple
+
+# A bare one-digit hour is read within opening hours: 1-7 is afternoon, 8-9 morning; 12 is noon
+AFTERNOON_HOURS = range(1, 8)
+
+PERIODS = {
+    "morning": ("06:00", "12:00"),
+    "afternoon": ("12:00", "17:00"),
+    "evening": ("17:00", "21:00"),
+    "tonight": ("17:00", "24:00"),
+    "night": ("18:00", "24:00"),
+}
+NAMED_TIMES = {"noon": "12:00", "midday": "12:00", "midnight": "00:00"}
+
+# Not preceded or followed by the separators of a numeric date, so "04" in "2025-04-15" is no hour
+_START = r"(?<![\d/.:-])"
+_END = r"(?![\d/:]|[-.]\d)"
+_MERIDIEM = r"(?:\s*(?:[ap]\.m\.|[ap]m\b))"
+# An hour that is certainly a time: it has minutes, am/pm or o'clock
+_CLOCK_HOUR = r"\d{1,2}(?::\d{2}" + _MERIDIEM + r"?|" + _MERIDIEM + r"|\s*o'?clock\b)" + _END
+_CLOCK = _START + _CLOCK_HOUR
+# Any hour, used where the words around it already say it's a time
+_HOUR_BODY = r"\d{1,2}(?::\d{2})?" + _MERIDIEM + r"?"
+_HOUR = _START + _HOUR_BODY
+_NAMED = "|".join(NAMED_TIMES)
+# The first hour of a range may run into a dash ("2-4pm")
+_FIRST = rf"(?:{_HOUR}(?![\d/:]|\.\d)|{_NAMED})"
+_LAST = rf"(?:{_HOUR_BODY}{_END}|{_NAMED})"
+
+TIME_EXPRESSION = re.compile(
+    rf"""
+        # Every alternative starts a word with a digit, "@" or one of these letters; skip other positions at once
+        (?<!\w)(?=[\d@abefmnptu])
+        (?:
+          (?:between|from)\s+(?P<first>{_FIRST})\s*(?:and|to|-|until|till)\s*(?P<last>{_LAST})
+        | (?P<range_first>{_HOUR}(?![\d/:]|\.\d))\s*(?:-|to|until|till)\s*(?P<range_last>{_CLOCK_HOUR})
+        | (?:after|from|past)\s+(?P<after>{_LAST})
+        | (?:before|by|until|till)\s+(?P<before>{_LAST})
+        | (?P<period>{"|".join(PERIODS)})\b
+        | (?P<named>{_NAMED})\b
+        | (?P<clock>{_CLOCK})
+        | (?:at|around|@)\s*(?P<cued>{_HOUR}{_END})
+        )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+TIME_PARTS = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?m\.?)?", re.IGNORECASE)
+BARE_TIME = re.compile(rf"\s*(?:at\s+)?({_HOUR}{_END})\s*[.!]?\s*", re.IGNORECASE)
+
+
+class TimeMatch(NamedTuple):
+    """
+    A time or time range found in a message
+
+    earliest/latest are HH:MM and bound appointment start times as
+    earliest <= start < latest ("24:00" is the end of the day). An exact time
+    has earliest == latest. start/end are offsets of the matched text.
+    """
+    earliest: str
+    latest: str
+    start: int
+    end: int
+    rule: str  # exact, range, after, before or period
+
+    @property
+    def exact(self):
+        """The time, if this is an exact time rather than a range"""
+        return self.earliest if self.rule == "exact" else None
+
+    def contains(self, time_str):
+        """True if an appointment starting at time_str (HH:MM) fits"""
+        if self.rule == "exact":
+            return time_str == self.earliest
+        return self.earliest <= time_str < self.latest
+
+
+def _to_24h(text, meridiem=None):
+    """HH:MM for one hour expression, or None if it isn't a valid time"""
+    named = NAMED_TIMES.get(text.lower())
+    if named:
+        return named
+    hour_text, minute, marker = TIME_PARTS.match(text).groups()
+    hour, minute = int(hour_text), int(minute or 0)
+    marker = (marker or meridiem or "").lower()
+    if marker:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if marker == "p" else 0)
+    elif hour in AFTERNOON_HOURS and len(hour_text) == 1:
+        # "2:30" is half past two in the afternoon; "02:30" is written on a 24-hour clock
+        hour += 12
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _meridiem(text):
+    parts = TIME_PARTS.match(text)
+    return parts.group(3) if parts else None
+
+
+def _range(first, last):
+    # "2-4pm", "between 10 and 11am": a bare first hour takes the second's am/pm when that keeps the order
+    earliest = _to_24h(first)
+    latest = _to_24h(last)
+    shared = _meridiem(last)
+    if shared and not _meridiem(first) and first.lower() not in NAMED_TIMES:
+        same_half = _to_24h(first, shared)
+        if same_half and latest and same_half < latest:
+            earliest = same_half
+    if earliest and latest and earliest < latest:
+        return earliest, latest
+    return None
+
+
+def _resolve(match):
+    """(earliest, latest, rule) for one TIME_EXPRESSION match, or None for an impossible time"""
+    group = match.lastgroup
+    if group in ("last", "range_last"):
+        bounds = _range(match.group("first") or match.group("range_first"), match.group(group))
+        return bounds and (*bounds, "range")
+    if group == "period":
+        return (*PERIODS[match.group(group).lower()], "period")
+    value = _to_24h(match.group(group))
+    if value is None:
+        return None
+    if group == "after":
+        return value, "24:00", "after"
+    if group == "before":
+        return "00:00", value if value != "00:00" else "24:00", "before"
+    return value, value, "exact"
+
+
+def find_times(text):
+    """
+    Every time and time range in a message, in order
+
+    Args:
+        text (str): Message text
+
+    Returns:
+        list: TimeMatch for each expression found
+    """
+    found = []
+    for match in TIME_EXPRESSION.finditer(text):
+        resolved = _resolve(match)
+        if resolved:
+            earliest, latest, rule = resolved
+            # A lone time's span leaves out "at"; a range's covers its words ("between 2 and 4")
+            start, end = match.span(match.lastgroup) if rule in ("exact", "period") else match.span()
+            found.append(TimeMatch(earliest, latest, start, end, rule))
+    return found
+
+
+def match_time(text):
+    """
+    The time a message asks for: its first exact time, else its first range
+
+    "tomorrow morning at 10" is 10:00, not the morning.
+
+    Args:
+        text (str): Message text
+
+    Returns:
+        TimeMatch: The time or range, or None if the message names none
+    """
+    found = find_times(text)
+    for time_match in found:
+        if time_match.rule == "exact":
+            return time_match
+    return found[0] if found else None
+
+
+def parse_time(text):
+    """
+    Parse a reply that is just a time ("10", "2:30 pm", "14:30", "noon")
+
+    Args:
+        text (str): The reply
+
+    Returns:
+        str: Time in HH:MM format, or None if the reply isn't a time
+    """
+    bare = BARE_TIME.fullmatch(text)
+    if bare:
+        return _to_24h(bare.group(1))
+    time_match = match_time(text)
+    return time_match.exact if time_match else None
@@ -0,0 +1,316 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Span:
+    """A single timed operation, optionally nested under a parent span."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes",
+                 "start_time", "duration", "error", "_start")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start_time = time.time()
+        self.duration = None
+        self.error = None
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned by Tracer.span when tracing is disabled, so callers pay almost nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self):
+        self.span = self.tracer.start_span(self.name, **self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.end_span(self.span, error=exc)
+        return False
+
+
+class Tracer:
+    """
+    Lightweight in-process tracer with nested spans.
+
+    Finished spans are kept in a bounded buffer for JSON lines export and
+    aggregated into per-span-name duration histograms for Prometheus.
+    """
+
+    def __init__(self, enabled=False, max_spans=10000, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._spans = deque(maxlen=max_spans)
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **attributes):
+        """
+        Context manager that times the enclosed block as a span
+
+        Args:
+            name (str): Span name, e.g. "booking.save_appointment"
+            **attributes: Extra attributes recorded on the span
+
+        Returns:
+            Context manager yielding the Span (a no-op object when disabled)
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _SpanContext(self, name, attributes)
+
+    def current_span(self):
+        """The innermost open span on this thread, or None"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def attach(self, parent):
+        """
+        Nest spans opened on this thread under a span from another thread
+
+        Args:
+            parent (Span): From current_span() on the thread that handed over the work, or None
+        """
+        if parent is None:
+            yield
+            return
+        stack = self._stack()
+        stack.append(parent)
+        try:
+            yield
+        finally:
+            if parent in stack:
+                del stack[stack.index(parent):]
+
+    def start_span(self, name, **attributes):
+        """Open a span as a child of the current span on this thread"""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes
+        )
+        stack.append(span)
+        return span
+
+    def end_span(self, span, error=None):
+        """Close a span opened with start_span and record it"""
+        span.duration = time.perf_counter() - span._start
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+
+        stack = self._stack()
+        if span in stack:
+            # Drop the span and anything left open beneath it
+            del stack[stack.index(span):]
+
+        with self._lock:
+            self._spans.append(span)
+            hist = self._histograms.get(span.name)
+            if hist is None:
+                hist = self._histograms[span.name] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            hist["counts"][bisect_left(self.buckets, span.duration)] += 1
+            hist["sum"] += span.duration
+
+    def spans(self):
+        """Return the finished spans currently buffered, oldest first"""
+        with self._lock:
+            return list(self._spans)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._histograms.clear()
+
+    def export_jsonl(self, destination=None):
+        """
+        Export finished spans as JSON lines
+
+        Args:
+            destination (str or file-like, optional): Path to append to, or an open text file
+
+        Returns:
+            str: The JSON lines that were exported
+        """
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in self.spans())
+        if isinstance(destination, str):
+            with open(destination, "a") as f:
+                f.write(lines)
+        elif destination is not None:
+            destination.write(lines)
+        return lines
+
+    def export_prometheus(self, metric="chatbot_span_duration_seconds"):
+        """
+        Render span durations as Prometheus text-format histograms
+
+        Args:
+            metric (str): Metric name
+
+        Returns:
+            str: Histogram exposition, one series per span name
+        """
+        with self._lock:
+            histograms = {name: (list(h["counts"]), h["sum"]) for name, h in self._histograms.items()}
+
+        lines = [
+            f"# HELP {metric} Duration of traced chatbot operations.",
+            f"# TYPE {metric} histogram",
+        ]
+        for name in sorted(histograms):
+            counts, total = histograms[name]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {total}')
+            lines.append(f'{metric}_count{{span="{name}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide tracer, enabled with CHATBOT_TRACING=1
+tracer = Tracer(enabled=os.getenv("CHATBOT_TRACING", "").lower() in ("1", "true", "yes"))
+
+
+def span(name, **attributes):
+    """Open a span on the process-wide tracer"""
+    return tracer.span(name, **attributes)
+
+
+def traced(name):
+    """
+    Decorator that records each call of the function as a span
+
+    Args:
+        name (str): Span name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def langchain_callbacks():
+    """
+    Callback handlers that trace LangChain retriever and LLM runs
+
+    Returns:
+        list: Handlers to pass as ``callbacks=`` when invoking a chain (empty when disabled)
+    """
+    if not tracer.enabled:
+        return []
+    return [_make_langchain_handler(tracer)]
+
+
+def _make_langchain_handler(tracer_):
+    # Defined lazily so importing this module doesn't import LangChain
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LangChainTracingHandler(BaseCallbackHandler):
+        def __init__(self):
+            self.open_spans = {}
+
+        def _start(self, run_id, name, **attributes):
+            self.open_spans[run_id] = tracer_.start_span(name, **attributes)
+
+        def _end(self, run_id, error=None):
+            span_ = self.open_spans.pop(run_id, None)
+            if span_ is not None:
+                tracer_.end_span(span_, error=error)
+
+        def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+            self._start(run_id, "rag.retrieve")
+
+        def on_retriever_end(self, documents, *, run_id, **kwargs):
+            span_ = self.open_spans.get(run_id)
+            if span_ is not None:
+                span_.set_attribute("documents", len(documents))
+            self._end(run_id)
+
+        def on_retriever_error(self, error, *, run_id, **kwargs):
+            self._end(run_id, error)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._start(run_id, "llm.call", prompt_chars=sum(len(p) for p in prompts))
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            span_ = self.open_spans.get(run_id)
+            usage = (response.llm_output or {}).get("token_usage") if span_ is not None else None
+            if usage:
+                span_.set_attribute("total_tokens", usage.get("total_tokens"))
+            self._end(run_id)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._end(run_id, error)
+
+    return LangChainTracingHandler()
@@ -4,17 +4,24 @@ import re
 import sqlite3
 import os
 from datetime import datetime
-from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferMemory
-from dateutil import parser as date_parser
+from chatbot.database import DatabaseLockedError
+from chatbot.tools.booking_tool import BUSY_MESSAGE, AppointmentBookingTool
+from chatbot.tools.calendars import DEFAULT_SLOTS
 from chatbot.tools.date_tool import DateExtractionTool
+from chatbot.tools.time_parser import parse_time
+from chatbot.repository import SQLiteRepository
+from chatbot.tracing import traced
 
 class UserInfoCollector:
     """
     Enhanced class to collect, validate, and store user information in a database,
     including appointment date and time validation and formatting.
     """
-    def __init__(self, llm, db_name='user_info.db'):
+    def __init__(self, llm, db_name='user_info.db', memory_mode='window', repository=None, date_tool=None,
+                 booking_tool=None):
+        from langchain.chains import ConversationChain
+        from chatbot.memory import build_memory
+
         self.llm = llm
         self.user_info = {
             "name": None,
@@ -25,36 +32,31 @@ class UserInfoCollector:
             "created_at": None
         }
         self.current_field = None
-        self.memory = ConversationBufferMemory()
+        self.memory = build_memory(memory_mode, llm=llm)
         self.conversation = ConversationChain(llm=llm, memory=self.memory)
-        self.date_tool = DateExtractionTool()
+        # Shared with the booking tool when passed in, so both use one clock and one parse memo
+        self.date_tool = date_tool or DateExtractionTool()
         self.db_name = db_name
+        # Storage for user data, see chatbot/repository.py; SQLite unless one is passed in
+        self.repository = repository
         self._initialize_database()
+        # Reserves the collected slot; DocumentChatbot shares its own, otherwise one is built on first use
+        self.booking_tool = booking_tool
 
+    @traced("user_info.init_db")
     def _initialize_database(self):
         try:
-            db_dir = os.path.dirname(os.path.abspath(self.db_name))
-            if not os.path.exists(db_dir) and db_dir:
-                os.makedirs(db_dir)
-
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS user_data (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        phone TEXT NOT NULL,
-                        email TEXT NOT NULL,
-                        date TEXT NOT NULL,
-                        time TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        status TEXT DEFAULT 'pending'
-                    )
-                ''')
-                conn.commit()
+            if self.repository is None:
+                db_dir = os.path.dirname(os.path.abspath(self.db_name))
+                if not os.path.exists(db_dir) and db_dir:
+                    os.makedirs(db_dir)
+                self.repository = SQLiteRepository(self.db_name)
+
+            self.repository.initialize()
         except Exception as e:
             print(f"Database initialization error: {e}")
 
+    @traced("user_info.save")
     def _save_to_database(self):
         try:
             self.user_info['created_at'] = datetime.now().isoformat()
@@ -65,21 +67,8 @@ class UserInfoCollector:
                 print(f"Cannot save: Missing user info fields: {missing}")
                 return False
 
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO user_data (name, phone, email, date, time, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    self.user_info['name'],
-                    self.user_info['phone'],
-                    self.user_info['email'],
-                    self.user_info['date'],
-                    self.user_info['time'],
-                    self.user_info['created_at']
-                ))
-                conn.commit()
-                print(f"User data saved successfully.")
+            self.repository.save_user(self.user_info)
+            print(f"User data saved successfully.")
             return True
         except sqlite3.Error as e:
             print(f"SQLite error during save: {e}")
@@ -98,15 +87,13 @@ class UserInfoCollector:
         return bool(re.match(r"^[0-9]{10,15}$", phone))
 
     def validate_time(self, time_input):
-        try:
-            parsed_time = date_parser.parse(time_input).time()
-            return parsed_time.strftime("%H:%M")
-        except Exception as e:
-            print(f"Time parsing error: {e}")
-            return None
+        formatted_time = parse_time(time_input)
+        if formatted_time is None:
+            print(f"Time parsing error: {time_input!r} is not a time")
+        return formatted_time
 
     def get_available_times(self):
-        return ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00"]
+        return list(DEFAULT_SLOTS)
 
     def process_input(self, user_input):
         if self.current_field == "name":
@@ -148,17 +135,7 @@ class UserInfoCollector:
                 if formatted_time in available_times:
                     self.user_info["time"] = formatted_time
                     self.current_field = None
-
-                    if self._save_to_database():
-                        # Get the day of the week
-                        appointment_date = datetime.strptime(self.user_info['date'], "%Y-%m-%d")
-                        day_of_week = appointment_date.strftime("%A")
-
-                        return (
-                            f"Thank you {self.user_info['name']}! Your appointment is scheduled on {self.user_info['date']} on {day_of_week} at {formatted_time}."
-                        )
-                    else:
-                        return "We encountered an error saving your data. Please try again later."
+                    return self._book_collected_slot()
                 else:
                     return (f"Sorry, {formatted_time} is not available. "
                             f"Available times are: {', '.join(available_times)}. Please choose one.")
@@ -167,6 +144,53 @@ class UserInfoCollector:
 
         return None
 
+    def _get_booking_tool(self):
+        if self.booking_tool is None:
+            self.booking_tool = AppointmentBookingTool(self, self.date_tool, repository=self.repository)
+        return self.booking_tool
+
+    @traced("user_info.book_collected_slot")
+    def _book_collected_slot(self):
+        """
+        Save the customer and reserve the collected date and time
+
+        The reservation is the booking tool's atomic claim, so two customers
+        can never both be told they hold the same slot. If the slot was taken
+        in the meantime, the free times are offered instead.
+
+        Returns:
+            str: Confirmation, or the reply asking for another time or date
+        """
+        date_str, time_str = self.user_info["date"], self.user_info["time"]
+        booking_tool = self._get_booking_tool()
+        # A customer re-picking a time after a clash is already saved
+        user_id = booking_tool.get_user_id(self.user_info)
+        if not user_id:
+            if not self._save_to_database():
+                return "We encountered an error saving your data. Please try again later."
+            user_id = booking_tool.get_user_id(self.user_info)
+
+        try:
+            appointment_id, available_slots = booking_tool.reserve_slot(user_id, date_str, time_str)
+        except DatabaseLockedError as e:
+            print(f"Booking error: {e.to_dict()}")
+            self.current_field = "time"
+            return BUSY_MESSAGE
+        if appointment_id:
+            day_of_week = datetime.strptime(date_str, "%Y-%m-%d").strftime("%A")
+            return f"Thank you {self.user_info['name']}! Your appointment is scheduled on {date_str} on {day_of_week} at {time_str}."
+        if available_slots is None:
+            return "We encountered an error saving your appointment. Please try again later."
+
+        self.user_info["time"] = None
+        if not available_slots:
+            self.user_info["date"] = None
+            self.current_field = "date"
+            return f"Sorry, {date_str} is fully booked. Which other date would suit you?"
+        self.current_field = "time"
+        return (f"Sorry, {time_str} on {date_str} has just been booked. "
+                f"Available times are: {', '.join(available_slots)}. Please choose one.")
+
     def start_collection(self):
         self.current_field = "name"
         return "Sure, let's get you scheduled. May I have your name first?"
@@ -177,22 +201,18 @@ class UserInfoCollector:
     def get_user_info(self):
         return self.user_info
 
+    @traced("user_info.get_all_users")
     def get_all_users(self):
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM user_data ORDER BY created_at DESC')
-                return cursor.fetchall()
+            return self.repository.all_users()
         except Exception as e:
             print(f"Database read error: {e}")
             return []
 
     def test_database_connection(self):
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT sqlite_version()')
-                return True
+            self.repository.ping()
+            return True
         except Exception as e:
             print(f"Connection test failed: {e}")
             return False
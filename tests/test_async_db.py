@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.async_db import AsyncDatabase
+from chatbot.database import DatabaseLockedError, close_pool
+
+USER_INFO = {"name": "Test User", "phone": "9876543210", "email": "test@example.com",
+             "date": "2030-01-07", "time": "10:00"}
+SLOTS = ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00"]
+
+
+class TestAsyncDatabase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        self.db = AsyncDatabase(self.db_name)
+
+    async def asyncTearDown(self):
+        await self.db.aclose()
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def test_user_round_trip(self):
+        self.assertIsNone(await self.db.get_user_id(USER_INFO))
+
+        user_id = await self.db.save_user(USER_INFO)
+
+        self.assertIsNotNone(user_id)
+        self.assertEqual(await self.db.get_user_id(USER_INFO), user_id)
+
+    async def test_concurrent_bookings_share_commits(self):
+        days = [f"2030-01-{d:02d}" for d in range(7, 12)]
+        results = await asyncio.gather(*(
+            self.db.save_appointment(1, day, slot) for day in days for slot in SLOTS
+        ))
+
+        self.assertTrue(all(results))
+        self.assertEqual(sorted(await self.db.get_booked_slots(days[0])), SLOTS)
+        stats = self.db.stats()
+        self.assertEqual(stats["requests"], len(results) + 1)
+        self.assertLess(stats["commits"], len(results))
+
+    async def test_conflicting_booking_fails_alone(self):
+        results = await asyncio.gather(
+            self.db.save_appointment(1, "2030-01-07", "10:00"),
+            self.db.save_appointment(2, "2030-01-07", "10:00"),
+            self.db.save_appointment(3, "2030-01-07", "11:00"),
+        )
+
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual(sorted(await self.db.get_booked_slots("2030-01-07")), ["10:00", "11:00"])
+
+    async def test_locked_database_is_not_a_taken_slot(self):
+        db = AsyncDatabase(self.db_name, busy_timeout_ms=50)
+        # Another process holds the write lock past the busy timeout
+        other = sqlite3.connect(self.db_name, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertRaises(DatabaseLockedError) as raised:
+                await db.save_appointment(1, "2030-01-07", "10:00")
+            self.assertEqual(raised.exception.operation, "save_appointment")
+        finally:
+            other.rollback()
+            other.close()
+            await db.aclose()
+
+        self.assertEqual(await self.db.get_booked_slots("2030-01-07"), [])
+
+    async def test_cancelled_request_does_not_stop_the_executor(self):
+        db = AsyncDatabase(self.db_name, busy_timeout_ms=200)
+        # Holding the write lock keeps the first request's batch running past its caller's timeout
+        other = sqlite3.connect(self.db_name, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(db.save_appointment(1, "2030-01-07", "10:00"), 0.01)
+        finally:
+            other.rollback()
+            other.close()
+        try:
+            self.assertTrue(await asyncio.wait_for(db.save_appointment(1, "2030-01-07", "11:00"), 5))
+        finally:
+            await db.aclose()
+
+    async def test_closed_database_rejects_requests(self):
+        await self.db.aclose()
+
+        with self.assertRaises(RuntimeError):
+            await self.db.get_booked_slots("2030-01-07")
+
+
+if __name__ == '__main__':
+    unittest.main()
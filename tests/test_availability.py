@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import close_pool
+from chatbot.repository import MemoryRepository
+from chatbot.tools.availability_cache import close_availability_cache
+from chatbot.tools.booking_tool import AppointmentBookingTool
+from chatbot.tools.date_tool import DateExtractionTool
+from chatbot.tools.time_parser import match_time
+
+
+class TestAvailabilityEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tool = AppointmentBookingTool(MagicMock(), MagicMock(), repository=MemoryRepository())
+        self.engine = self.tool.availability
+
+    def _book_whole_day(self, date_str):
+        for slot in self.tool.available_slots:
+            self.tool.reserve_slot(1, date_str, slot)
+
+    def test_range_matches_single_day_lookups(self):
+        self.tool.reserve_slot(1, "2030-01-07", "09:00")
+        self.tool.reserve_slot(1, "2030-01-08", "13:00")
+        self._book_whole_day("2030-01-09")
+
+        result = self.tool.get_available_slots_range("2030-01-06", "2030-01-10")
+
+        self.assertEqual(list(result), ["2030-01-06", "2030-01-07", "2030-01-08", "2030-01-09", "2030-01-10"])
+        for day, slots in result.items():
+            self.assertEqual(slots, self.tool.get_available_slots(day)[0])
+        self.assertEqual(result["2030-01-09"], [])
+
+    def test_bitmaps(self):
+        self.tool.reserve_slot(1, "2030-01-07", "09:00")
+        self.tool.reserve_slot(1, "2030-01-07", "11:00")
+
+        self.assertEqual(self.engine.booked_bitmaps("2030-01-07", "2030-01-07"), {"2030-01-07": 0b101})
+        self.assertEqual(self.engine.mask_to_slots(0b101), ["09:00", "11:00"])
+
+    def test_next_available_skips_past_and_booked_slots(self):
+        self.tool.reserve_slot(1, "2030-01-07", "16:00")
+
+        result = self.tool.next_available_slots(datetime(2030, 1, 7, 15, 0), count=3)
+
+        self.assertEqual(result, [("2030-01-07", "17:00"), ("2030-01-08", "09:00"), ("2030-01-08", "10:00")])
+
+    def test_next_available_skips_fully_booked_days(self):
+        self._book_whole_day("2030-01-07")
+        self._book_whole_day("2030-01-08")
+
+        result = self.tool.next_available_slots(datetime(2030, 1, 7), count=1)
+
+        self.assertEqual(result, [("2030-01-09", "09:00")])
+
+    def test_fully_booked_reply_offers_alternatives(self):
+        self._book_whole_day("2030-01-07")
+
+        reply = self.tool._unavailable_message("2030-01-07", "10:00", [])
+
+        self.assertIn("fully booked", reply)
+        self.assertIn("Tuesday, January 08, 2030 at 09:00", reply)
+
+    def test_available_on_matches_single_day_lookups(self):
+        self.tool.reserve_slot(1, "2030-01-07", "09:00")
+        self._book_whole_day("2030-01-20")
+
+        result = self.engine.available_on(["2030-01-20", "2030-01-07", "2030-01-07"])
+
+        self.assertEqual(list(result), ["2030-01-07", "2030-01-20"])
+        for day, slots in result.items():
+            self.assertEqual(slots, self.tool.get_available_slots(day)[0])
+
+    def test_offer_covers_every_candidate_in_one_query(self):
+        self.tool.date_tool = DateExtractionTool(clock=lambda: datetime(2030, 1, 1, 9, 0))  # A Tuesday
+        self.tool.reserve_slot(1, "2030-01-03", "14:00")
+        query = "Next Thursday or Friday, or any day the week of January 14, in the afternoon"
+
+        with patch.object(self.tool.repository, "iter_booked", wraps=self.tool.repository.iter_booked) as spy:
+            reply = self.tool.offer_candidates(query, match_time(query))
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertIn("- Thursday, January 03, 2030: 12:00, 13:00, 15:00, 16:00\n", reply)
+        self.assertIn("- Friday, January 04, 2030: 12:00, 13:00, 14:00, 15:00, 16:00\n", reply)
+        self.assertIn("- Sunday, January 20, 2030:", reply)
+        self.assertEqual(reply.count("\n- "), 9)
+        self.assertIsNone(self.tool.offer_candidates("Next Thursday at 2pm"))
+
+
+class TestAvailabilityEngineSQLite(TestAvailabilityEngine):
+    """The same checks against the SQLite backend."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        self.tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=self.db_name)
+        self.engine = self.tool.availability
+
+    def tearDown(self):
+        close_availability_cache(self.db_name)
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
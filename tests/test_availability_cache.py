@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import close_pool
+from chatbot.tools.availability_cache import AvailabilityCache, close_availability_cache
+from chatbot.tools.booking_tool import AppointmentBookingTool
+
+
+class TestAvailabilityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        self.tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=self.db_name)
+        self.cache = self.tool.cache
+
+    def tearDown(self):
+        close_availability_cache(self.db_name)
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeated_lookups_are_served_from_cache(self):
+        self.tool.get_booked_slots("2030-01-07")
+        self.tool.get_booked_slots("2030-01-07")
+
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_tools_on_same_database_share_the_cache(self):
+        other = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=self.db_name)
+
+        self.assertIs(other.cache, self.cache)
+
+    def test_booking_and_cancellation_write_through(self):
+        self.tool.get_booked_slots("2030-01-07")
+
+        appointment_id, _ = self.tool.reserve_slot(1, "2030-01-07", "10:00")
+        self.tool.save_appointment(1, "2030-01-07", "11:00")
+        self.assertEqual(self.tool.get_booked_slots("2030-01-07"), ["10:00", "11:00"])
+
+        self.assertTrue(self.tool.cancel_appointment(appointment_id))
+        self.assertEqual(self.tool.get_booked_slots("2030-01-07"), ["11:00"])
+        self.assertFalse(self.tool.cancel_appointment(appointment_id))
+
+        # Only the first lookup went to the database
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["invalidations"], 0)
+
+    def test_write_from_another_connection_invalidates(self):
+        self.assertEqual(self.tool.get_booked_slots("2030-01-07"), [])
+
+        # Stands in for another worker process writing to the same file
+        with sqlite3.connect(self.db_name) as conn:
+            conn.execute(
+                "INSERT INTO appointments (user_id, date, time, created_at) VALUES (2, '2030-01-07', '14:00', 'x')"
+            )
+        conn.close()
+
+        self.assertEqual(self.tool.get_booked_slots("2030-01-07"), ["14:00"])
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_reads_do_not_wait_behind_a_blocked_writer(self):
+        self.tool.get_booked_slots("2030-01-07")
+        # Another process holds the write lock, so our writer waits in BEGIN IMMEDIATE
+        other = sqlite3.connect(self.db_name, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        writing = threading.Event()
+
+        def write():
+            try:
+                with self.cache.write() as conn:
+                    writing.set()
+                    conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                pass
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            writing.wait(5)
+            start = time.perf_counter()
+            self.assertEqual(self.tool.get_booked_slots("2030-01-07"), [])
+            self.assertLess(time.perf_counter() - start, 1)
+            self.assertEqual(self.cache.stats()["bypasses"], 1)
+        finally:
+            other.rollback()
+            other.close()
+            writer.join()
+
+    def test_size_is_bounded(self):
+        cache = AvailabilityCache(self.db_name, max_dates=2)
+        try:
+            for day in ["2030-01-07", "2030-01-08", "2030-01-07", "2030-01-09"]:
+                cache.get_booked(day)
+
+            # 2030-01-08 was least recently used
+            self.assertEqual(list(cache._entries), ["2030-01-07", "2030-01-09"])
+            self.assertEqual(cache.stats()["dates"], 2)
+        finally:
+            cache.close()
+
+    def test_cache_can_be_disabled(self):
+        tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=self.db_name, cache_availability=False)
+        tool.save_appointment(1, "2030-01-07", "09:00")
+
+        self.assertIsNone(tool.cache)
+        self.assertEqual(tool.get_booked_slots("2030-01-07"), ["09:00"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+import multiprocessing
+import threading
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import ConnectionPool, DatabaseLockedError, close_pool, get_pool
+from chatbot.migrations import migrate
+from chatbot.repository import SQLiteRepository
+from chatbot.tools.availability_cache import close_availability_cache
+from chatbot.tools.booking_tool import BUSY_MESSAGE, AppointmentBookingTool
+from chatbot.tools.date_tool import DateExtractionTool
+
+DATES = ["2030-01-07", "2030-01-08", "2030-01-09"]
+SLOTS = ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00"]
+
+
+def _reserve_everything(db_name, worker_id, start_event, results):
+    """Worker process: try to reserve every slot on every date."""
+    tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=db_name)
+    start_event.wait()
+    won = 0
+    for date_str in DATES:
+        for time_str in SLOTS:
+            appointment_id, _ = tool.reserve_slot(worker_id, date_str, time_str)
+            if appointment_id:
+                won += 1
+    results.put(won)
+
+
+def _book_when_freed(db_name, worker_id, ready, start_event, checked, results):
+    """Worker process: cache the day as fully booked, then book 10:00 once told it was cancelled."""
+    tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=db_name)
+    before, _ = tool.get_available_slots(DATES[0])
+    ready.put(worker_id)
+    start_event.wait()
+    after, _ = tool.get_available_slots(DATES[0])
+    checked.wait()
+    appointment_id, _ = tool.reserve_slot(worker_id, DATES[0], "10:00")
+    results.put(("10:00" in before, "10:00" in after, appointment_id is not None))
+
+
+class TestSlotReservation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        self.tool = AppointmentBookingTool(MagicMock(), MagicMock(), db_name=self.db_name)
+
+    def tearDown(self):
+        close_availability_cache(self.db_name)
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_reserve_free_slot(self):
+        appointment_id, available = self.tool.reserve_slot(1, "2030-01-07", "10:00")
+
+        self.assertIsNotNone(appointment_id)
+        self.assertIsNone(available)
+        self.assertEqual(self.tool.get_booked_slots("2030-01-07"), ["10:00"])
+
+    def test_reserve_taken_slot_returns_free_slots(self):
+        self.tool.reserve_slot(1, "2030-01-07", "10:00")
+        appointment_id, available = self.tool.reserve_slot(2, "2030-01-07", "10:00")
+
+        self.assertIsNone(appointment_id)
+        self.assertNotIn("10:00", available)
+        self.assertEqual(len(available), len(SLOTS) - 1)
+
+    def test_cancelled_slot_can_be_reserved_again(self):
+        appointment_id, _ = self.tool.reserve_slot(1, "2030-01-07", "10:00")
+        with get_pool(self.db_name).connection() as conn:
+            conn.execute("UPDATE appointments SET status = 'cancelled' WHERE id = ?", (appointment_id,))
+
+        second_id, _ = self.tool.reserve_slot(2, "2030-01-07", "10:00")
+        self.assertIsNotNone(second_id)
+
+    def test_slot_freed_by_cancellation_is_immediately_bookable(self):
+        appointment_id, _ = self.tool.reserve_slot(1, DATES[0], "10:00")
+        ctx = multiprocessing.get_context("spawn")
+        ready = ctx.Queue()
+        start_event = ctx.Event()
+        checked = ctx.Barrier(4)
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_book_when_freed, args=(self.db_name, i + 2, ready, start_event, checked, results))
+            for i in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for _ in workers:
+            ready.get(timeout=120)
+
+        self.assertTrue(self.tool.cancel_appointment(appointment_id))
+        start_event.set()
+        outcomes = [results.get(timeout=120) for _ in workers]
+        for worker in workers:
+            worker.join(timeout=60)
+
+        # Every session saw the slot taken, then free right after the cancellation; exactly one got it
+        self.assertEqual([(before, after) for before, after, _ in outcomes], [(False, True)] * len(workers))
+        self.assertEqual(sum(won for _, _, won in outcomes), 1)
+        self.assertEqual(len(self.tool.get_booked_slots(DATES[0])), 1)
+
+    def test_reschedule_racing_bookings_never_loses_the_appointment(self):
+        appointment_id, _ = self.tool.reserve_slot(1, DATES[0], "10:00")
+        sessions = [AppointmentBookingTool(MagicMock(), MagicMock(), db_name=self.db_name) for _ in range(7)]
+        barrier = threading.Barrier(len(sessions))
+        moved = []
+
+        def reschedule(tool):
+            barrier.wait()
+            moved.append(tool.reschedule_appointment(appointment_id, DATES[0], "11:00")[0])
+
+        def book(tool, user_id, time_str):
+            barrier.wait()
+            tool.reserve_slot(user_id, DATES[0], time_str)
+
+        threads = [threading.Thread(target=reschedule, args=(sessions[0],))] + [
+            threading.Thread(target=book, args=(tool, i + 2, "11:00" if i % 2 else "10:00"))
+            for i, tool in enumerate(sessions[1:])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        with get_pool(self.db_name).connection() as conn:
+            held = conn.execute(
+                "SELECT time FROM appointments WHERE user_id = 1 AND status = 'confirmed'"
+            ).fetchall()
+            confirmed = conn.execute(
+                "SELECT time, COUNT(*) FROM appointments WHERE status = 'confirmed' GROUP BY time"
+            ).fetchall()
+
+        # The customer holds exactly one slot: the new one if the move won, else the old one
+        self.assertEqual(held, [("11:00",)] if moved[0] else [("10:00",)])
+        self.assertEqual(dict(confirmed)["11:00"], 1)
+        self.assertTrue(all(count == 1 for _, count in confirmed))
+        self.assertEqual(sorted(self.tool.get_booked_slots(DATES[0])), sorted(time for time, _ in confirmed))
+
+    def test_no_double_bookings_across_processes(self):
+        ctx = multiprocessing.get_context("spawn")
+        start_event = ctx.Event()
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_reserve_everything, args=(self.db_name, i, start_event, results))
+            for i in range(6)
+        ]
+        for worker in workers:
+            worker.start()
+        start_event.set()
+        won = [results.get(timeout=120) for _ in workers]
+        for worker in workers:
+            worker.join(timeout=60)
+
+        with get_pool(self.db_name).connection() as conn:
+            confirmed = conn.execute(
+                "SELECT date, time, COUNT(*) FROM appointments WHERE status = 'confirmed' GROUP BY date, time"
+            ).fetchall()
+
+        self.assertEqual(sum(won), len(DATES) * len(SLOTS))
+        self.assertEqual(len(confirmed), len(DATES) * len(SLOTS))
+        self.assertTrue(all(count == 1 for _, _, count in confirmed))
+
+
+class TestLockContention(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        # A short busy timeout so a held lock fails fast
+        self.pool = ConnectionPool(self.db_name, busy_timeout_ms=20)
+        self.repository = SQLiteRepository(self.db_name, cache_availability=False, lock_retries=2, pool=self.pool)
+        self.repository.initialize()
+        self.blocker = sqlite3.connect(self.db_name, isolation_level=None, check_same_thread=False)
+
+    def tearDown(self):
+        self.blocker.close()
+        self.pool.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_lock_held_past_every_retry_raises_structured_error(self):
+        self.blocker.execute("BEGIN IMMEDIATE")
+        with self.assertRaises(DatabaseLockedError) as raised:
+            self.repository.reserve_slot(1, DATES[0], "10:00")
+        self.blocker.execute("ROLLBACK")
+
+        error = raised.exception.to_dict()
+        self.assertEqual((error["error"], error["operation"], error["attempts"]), ("database_locked", "reserve_slot", 3))
+        self.assertEqual((self.repository.retries, self.repository.lock_errors), (2, 1))
+        self.assertIsNotNone(self.repository.reserve_slot(1, DATES[0], "10:00")[0])
+
+    def test_lock_released_during_backoff_is_retried(self):
+        self.blocker.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.03, self.blocker.execute, args=("ROLLBACK",))
+        release.start()
+        try:
+            appointment_id, _ = self.repository.reserve_slot(1, DATES[0], "10:00")
+        finally:
+            release.join()
+
+        self.assertIsNotNone(appointment_id)
+        self.assertGreaterEqual(self.repository.retries, 1)
+        self.assertEqual(self.repository.lock_errors, 0)
+
+    def test_booking_reply_reports_busy_instead_of_failing_silently(self):
+        user_info = {"name": "Ann", "phone": "9876543210", "email": "ann@example.com"}
+        self.repository.upsert_customer(**user_info)
+        collector = MagicMock()
+        collector.get_user_info.return_value = user_info
+        tool = AppointmentBookingTool(collector, DateExtractionTool(), db_name=self.db_name,
+                                      repository=self.repository)
+
+        self.blocker.execute("BEGIN IMMEDIATE")
+        try:
+            reply = tool.book_appointment(f"Book an appointment at 10 AM on {DATES[0]}")
+        finally:
+            self.blocker.execute("ROLLBACK")
+        self.assertEqual(reply, BUSY_MESSAGE)
+        with self.assertRaises(DatabaseLockedError):
+            self.blocker.execute("BEGIN IMMEDIATE")
+            try:
+                tool.save_appointment(1, DATES[0], "10:00")
+            finally:
+                self.blocker.execute("ROLLBACK")
+
+
+class TestUniqueSlotMigration(unittest.TestCase):
+
+    def test_existing_double_bookings_are_folded(self):
+        temp_dir = tempfile.mkdtemp()
+        db_name = os.path.join(temp_dir, "legacy.db")
+        try:
+            pool = get_pool(db_name)
+            migrate(pool, target_version=2)
+            with pool.connection() as conn:
+                conn.executemany(
+                    "INSERT INTO appointments (user_id, date, time, created_at) VALUES (?, '2030-01-07', '10:00', 'x')",
+                    [(1,), (2,)]
+                )
+            migrate(pool)
+
+            with pool.connection() as conn:
+                statuses = [row[0] for row in conn.execute("SELECT status FROM appointments ORDER BY id")]
+                self.assertEqual(statuses, ["confirmed", "duplicate"])
+                with self.assertRaises(sqlite3.IntegrityError):
+                    conn.execute(
+                        "INSERT INTO appointments (user_id, date, time, created_at) VALUES (3, '2030-01-07', '10:00', 'x')"
+                    )
+        finally:
+            close_pool(db_name)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import io
+import json
+import shutil
+import tempfile
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.bulk_io import export_appointments, export_customers, import_appointments, iter_rows
+from chatbot.database import close_pool, get_pool
+from chatbot.migrations import migrate
+from chatbot.repository import upsert_customer
+
+
+class TestBulkImportExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+
+    def tearDown(self):
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, text):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _add_customers(self, count, db_name=None):
+        pool = get_pool(db_name or self.db_name)
+        migrate(pool)
+        with pool.connection() as conn:
+            for i in range(count):
+                upsert_customer(conn, f"User {i}", f"98{i:08d}", f"u{i}@example.com")
+
+    def test_import_csv_reports_conflicts_and_errors(self):
+        path = self._write("legacy.csv", (
+            "name,phone,email,date,time,status\n"
+            "Ann,9876543210,ann@example.com,2030-01-07,09:00,\n"
+            "Bob,9876543211,bob@example.com,2030-01-07,10:00,confirmed\n"
+            "Bob,9876543211,bob@example.com,2030-01-07,09:00,confirmed\n"
+            "Ann,9876543210,ann@example.com,2030-01-07,09:00,cancelled\n"
+            "Cid,9876543212,cid@example.com,07/01/2030,11:00,\n"
+        ))
+
+        report = import_appointments(path, db_name=self.db_name, batch_size=2)
+
+        self.assertEqual(report["imported"], 3)
+        self.assertEqual(report["conflicts"], [
+            {"line": 4, "date": "2030-01-07", "time": "09:00", "reason": "slot already booked"}
+        ])
+        self.assertEqual([e["line"] for e in report["errors"]], [6])
+
+        with get_pool(self.db_name).connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0], 2)
+
+    def test_import_jsonl_checks_existing_bookings(self):
+        self._add_customers(2)
+        first = self._write("a.jsonl", json.dumps({"user_id": 1, "date": "2030-01-07", "time": "09:00"}) + "\n")
+        second = self._write("b.jsonl", "\n".join([
+            json.dumps({"user_id": 2, "date": "2030-01-07", "time": "09:00"}),
+            "{not json",
+            json.dumps({"user_id": 2, "date": "2030-01-07", "time": "14:00"}),
+        ]))
+
+        import_appointments(first, db_name=self.db_name)
+        report = import_appointments(second, db_name=self.db_name)
+
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual(len(report["conflicts"]), 1)
+        self.assertEqual(report["errors"][0]["line"], 2)
+
+    def test_import_rejects_unknown_customers(self):
+        self._add_customers(1)
+        path = self._write("ids.jsonl", "\n".join(json.dumps(r) for r in [
+            {"user_id": 999, "date": "2030-01-07", "time": "09:00"},
+            {"user_id": 1, "date": "2030-01-07", "time": "09:00"},
+            {"user_id": 1, "date": "2030-01-07", "time": "09:00", "status": "Confirmed"},
+        ]))
+
+        report = import_appointments(path, db_name=self.db_name)
+
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual(report["errors"], [{"line": 1, "error": "unknown customer 999"}])
+        self.assertEqual([c["line"] for c in report["conflicts"]], [3])
+        with get_pool(self.db_name).connection() as conn:
+            self.assertEqual(conn.execute("SELECT user_id, status FROM appointments").fetchall(), [(1, "confirmed")])
+
+    def test_export_round_trip(self):
+        self._add_customers(1)
+        records = [{"user_id": 1, "date": f"2030-01-{day:02d}", "time": "09:00"} for day in range(1, 26)]
+        path = self._write("in.jsonl", "".join(json.dumps(r) + "\n" for r in records))
+        import_appointments(path, db_name=self.db_name)
+
+        out = io.StringIO()
+        count = export_appointments(out, db_name=self.db_name, fmt="jsonl", page_size=10)
+
+        exported = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(count, 25)
+        self.assertEqual([row["date"] for row in exported], [r["date"] for r in records])
+
+        reimport = os.path.join(self.temp_dir, "out.csv")
+        export_appointments(reimport, db_name=self.db_name)
+        other_db = os.path.join(self.temp_dir, "other.db")
+        try:
+            self._add_customers(1, db_name=other_db)
+            self.assertEqual(import_appointments(reimport, db_name=other_db)["imported"], 25)
+        finally:
+            close_pool(other_db)
+
+    def test_iter_rows_pages_by_id(self):
+        path = self._write("users.csv", "".join(
+            ["name,phone,email,date,time\n"] +
+            [f"User {i},98{i:08d},u{i}@example.com,2030-02-{i + 1:02d},10:00\n" for i in range(7)]
+        ))
+        import_appointments(path, db_name=self.db_name)
+
+        rows = list(iter_rows(self.db_name, "customers", page_size=3))
+        self.assertEqual([row["id"] for row in rows], list(range(1, 8)))
+
+        out = io.StringIO()
+        self.assertEqual(export_customers(out, db_name=self.db_name, fmt="csv"), 7)
+        self.assertTrue(out.getvalue().startswith("id,name,phone,email"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import close_pool
+from chatbot.tools.calendars import (
+    DEFAULT_SLOTS, CalendarStore, IntervalSet, ProviderCalendar, WorkingHours, to_minutes
+)
+
+MONDAY = "2030-01-07"
+TUESDAY = "2030-01-08"
+
+
+class TestIntervalSet(unittest.TestCase):
+
+    def test_overlap_is_half_open(self):
+        intervals = IntervalSet([(540, 600), (660, 750)])
+
+        self.assertFalse(intervals.overlaps(600, 660))  # Back to back with both neighbours
+        self.assertTrue(intervals.overlaps(599, 601))
+        self.assertTrue(intervals.overlaps(500, 800))
+        self.assertTrue(intervals.overlaps(700, 710))
+        self.assertFalse(intervals.overlaps(750, 900))
+
+    def test_add_remove_and_gaps(self):
+        intervals = IntervalSet()
+
+        self.assertTrue(intervals.add(600, 660))
+        self.assertFalse(intervals.add(630, 700))
+        self.assertTrue(intervals.add(540, 600))
+        self.assertEqual(list(intervals.gaps(480, 720)), [(480, 540), (660, 720)])
+        self.assertTrue(intervals.remove(600, 660))
+        self.assertEqual(list(intervals), [(540, 600)])
+
+    def test_rejects_overlapping_input(self):
+        with self.assertRaises(ValueError):
+            IntervalSet([(540, 600), (570, 630)])
+
+
+class TestWorkingHours(unittest.TestCase):
+
+    def test_default_slots_match_the_booking_flow(self):
+        self.assertEqual(DEFAULT_SLOTS, ["09:00", "10:00", "11:00", "12:00", "13:00",
+                                         "14:00", "15:00", "16:00", "17:00"])
+
+    def test_breaks_are_cut_out(self):
+        hours = WorkingHours({"mon": [("09:00", "17:00")]}, breaks=[("12:00", "13:00")])
+
+        self.assertEqual(hours.for_day(MONDAY), [(540, 720), (780, 1020)])
+        self.assertEqual(hours.for_day(TUESDAY), [])
+        self.assertTrue(hours.contains(MONDAY, to_minutes("11:00"), to_minutes("12:00")))
+        self.assertFalse(hours.contains(MONDAY, to_minutes("11:30"), to_minutes("12:30")))
+
+    def test_free_slots_for_long_service(self):
+        hours = WorkingHours({"mon": [("09:00", "13:00")]})
+        calendar = ProviderCalendar(1, "Dr. A", hours)
+        self.assertTrue(calendar.book(MONDAY, to_minutes("10:00"), to_minutes("10:30")))
+
+        self.assertEqual(calendar.free_slots(MONDAY, duration=90, step=30),
+                         ["10:30", "11:00", "11:30"])
+
+
+class TestCalendarStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        self.store = CalendarStore(self.db_name)
+        self.provider = self.store.add_provider(
+            "Dr. A", hours={"mon": [("09:00", "17:00")]}, breaks=[("12:00", "13:00")]
+        )
+
+    def tearDown(self):
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_book_variable_lengths(self):
+        first, _ = self.store.book(self.provider, 1, MONDAY, "09:00", 90)
+        second, _ = self.store.book(self.provider, 2, MONDAY, "10:30", 15)
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertEqual(self.store.book(self.provider, 3, MONDAY, "10:00", 30),
+                         (None, "Overlaps an existing appointment"))
+        self.assertEqual(self.store.book(self.provider, 3, MONDAY, "11:30", 60),
+                         (None, "Outside working hours"))
+        self.assertEqual(self.store.book(self.provider, 3, TUESDAY, "10:00", 30),
+                         (None, "Outside working hours"))
+        self.assertEqual(self.store.book(999, 3, MONDAY, "10:00", 30), (None, "Unknown provider"))
+
+    def test_cancel_frees_interval(self):
+        appointment_id, _ = self.store.book(self.provider, 1, MONDAY, "14:00", 60)
+
+        self.assertNotIn("14:00", self.store.free_slots(self.provider, MONDAY, 60))
+        self.assertTrue(self.store.cancel(appointment_id))
+        self.assertIn("14:00", self.store.free_slots(self.provider, MONDAY, 60))
+
+    def test_find_available_providers(self):
+        other = self.store.add_provider("Dr. B", hours={"mon": [("08:00", "20:00")]})
+        self.store.book(other, 1, MONDAY, "09:00", 30)
+
+        # A fresh store reads hours back from the database
+        store = CalendarStore(self.db_name)
+        self.assertEqual(store.find_available_providers(MONDAY, "09:00", 30), [self.provider])
+        self.assertEqual(store.find_available_providers(MONDAY, "12:00", 30), [other])
+        self.assertEqual(store.find_available_providers(MONDAY, "18:00", 30), [other])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import ConnectionPool, get_pool, close_pool
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+
+    def tearDown(self):
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_connections_use_wal_and_busy_timeout(self):
+        pool = get_pool(self.db_name)
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(self.db_name, size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        pool.close()
+
+    def test_rollback_on_error(self):
+        pool = get_pool(self.db_name)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+        with self.assertRaises(RuntimeError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise RuntimeError("boom")
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_pool_is_shared_per_database(self):
+        self.assertIs(get_pool(self.db_name), get_pool(os.path.join(self.temp_dir, ".", "test.db")))
+
+    def test_in_memory_database_uses_one_connection(self):
+        pool = ConnectionPool(":memory:", size=4)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1)")
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 1)
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.date_batch import extract_dates
+from chatbot.tools.date_tool import DateMatch
+
+REFERENCE = datetime(2025, 3, 31, 9, 0)  # A Monday
+
+
+class TestExtractDates(unittest.TestCase):
+
+    def test_results_follow_input_order_with_span_and_rule(self):
+        messages = ["Can I come next Friday?", "hello", "Book 2025-04-15 at 2", "see you tomorrow"]
+
+        results = list(extract_dates(iter(messages), REFERENCE))
+
+        self.assertEqual(results, [
+            DateMatch("2025-04-04", 11, 22, "next_weekday"),
+            None,
+            DateMatch("2025-04-15", 5, 15, "iso"),
+            DateMatch("2025-04-01", 8, 16, "tomorrow"),
+        ])
+        self.assertEqual(messages[0][results[0].start:results[0].end], "next Friday")
+
+    def test_fixed_reference_makes_replays_reproducible(self):
+        messages = ["in 3 days", "march 15", "this sunday"]
+
+        first = list(extract_dates(messages, REFERENCE))
+        second = list(extract_dates(messages, REFERENCE))
+
+        self.assertEqual(first, second)
+        self.assertEqual([m.date for m in first], ["2025-04-03", "2026-03-15", "2025-04-06"])
+
+    def test_processes_match_single_process(self):
+        corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "date_corpus.jsonl")
+        with open(corpus) as f:
+            messages = [json.loads(line)["query"] for line in f] * 5
+
+        serial = list(extract_dates(messages, REFERENCE))
+        parallel = list(extract_dates(iter(messages), REFERENCE, processes=2, chunk_size=97))
+
+        self.assertEqual(len(parallel), len(messages))
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
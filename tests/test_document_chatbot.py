@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.llms import FakeListLLM
+
+from chatbot.database import close_pool
+from chatbot.document_chatbot import DocumentChatbot
+from chatbot.llm_cache import LLMResponseCache
+from chatbot.repository import MemoryRepository
+
+
+class TestDocumentChatbot(unittest.TestCase):
+
+    def setUp(self):
+        self.repository = MemoryRepository()
+        self.chatbot = DocumentChatbot(
+            b"Our clinic is open from 9 AM to 5 PM on weekdays.",
+            mime_type="text/plain",
+            llm=FakeListLLM(responses=["The clinic opens at 9 AM."]),
+            embeddings=FakeEmbeddings(size=16),
+            repository=self.repository
+        )
+
+    def test_document_question_uses_qa_chain(self):
+        self.assertEqual(self.chatbot.process_message("When does the clinic open?"), "The clinic opens at 9 AM.")
+
+    def test_cancellation_question_is_answered_from_the_document(self):
+        self.assertEqual(self.chatbot.process_message("What is the cancellation policy?"), "The clinic opens at 9 AM.")
+        self.assertEqual(self.chatbot.planner_stats()["requests"], 0)
+
+    def test_contact_request_collects_user_info(self):
+        self.assertIn("name", self.chatbot.process_message("Please call me"))
+        self.assertIn("phone", self.chatbot.process_message("Jane Doe"))
+        self.assertIn("email", self.chatbot.process_message("9876543210"))
+        self.assertIn("date", self.chatbot.process_message("jane@example.com"))
+        self.assertIn("time", self.chatbot.process_message("2030-05-01"))
+        self.assertIn("Thank you Jane Doe", self.chatbot.process_message("10 AM"))
+        self.assertEqual(len(self.chatbot.user_info_collector.get_all_users()), 1)
+
+    def test_contact_form_reserves_its_slot(self):
+        for message in ["Please call me", "Jane Doe", "9876543210", "jane@example.com", "2030-05-01", "10 AM"]:
+            self.chatbot.process_message(message)
+        self.assertEqual(self.repository.booked_times("2030-05-01"), ["10:00"])
+
+        other = DocumentChatbot(None, llm=FakeListLLM(responses=["unused"]),
+                                vector_store=self.chatbot.vector_store, repository=self.repository)
+        for message in ["Please call me", "John Roe", "9123456780", "john@example.com", "2030-05-01"]:
+            other.process_message(message)
+        reply = other.process_message("10 AM")
+        self.assertIn("has just been booked", reply)
+        self.assertNotIn("Thank you", reply)
+        self.assertIn("Thank you John Roe", other.process_message("11 AM"))
+        self.assertEqual(self.repository.booked_times("2030-05-01"), ["10:00", "11:00"])
+        self.assertEqual(len(self.repository.all_users()), 2)
+
+    def test_reschedule_and_cancel_from_chat(self):
+        for message in ["Please call me", "Jane Doe", "9876543210", "jane@example.com", "2030-05-01", "10 AM"]:
+            self.chatbot.process_message(message)
+        tuesday = self.chatbot.date_tool.extract_date("next Tuesday")
+
+        reply = self.chatbot.process_message("Please move my appointment to next Tuesday at 2 PM")
+        self.assertIn("moved to", reply)
+        self.assertEqual(self.repository.booked_times("2030-05-01"), [])
+        self.assertEqual(self.repository.booked_times(tuesday), ["14:00"])
+
+        self.assertIn("has been cancelled", self.chatbot.process_message("Cancel my appointment"))
+        self.assertEqual(self.repository.booked_times(tuesday), [])
+        self.assertIn("don't have any upcoming", self.chatbot.process_message("Cancel my appointment"))
+        # Every tool request was clear enough to skip the agent
+        self.assertEqual(self.chatbot.planner_stats()["llm"], 0)
+        self.assertEqual(self.chatbot.planner_stats()["fast_path"], 4)
+
+    def test_booking_reuses_the_routing_date_parse(self):
+        for message in ["Please call me", "Jane Doe", "9876543210", "jane@example.com", "2030-05-01", "10 AM"]:
+            self.chatbot.process_message(message)
+        self.assertIs(self.chatbot.user_info_collector.date_tool, self.chatbot.date_tool)
+        self.assertIs(self.chatbot.booking_tool.date_tool, self.chatbot.date_tool)
+
+        before = self.chatbot.date_tool.cache_stats()
+        self.chatbot.process_message("Book an appointment next Monday at 10 AM")
+        after = self.chatbot.date_tool.cache_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertGreaterEqual(after["hits"] - before["hits"], 1)
+
+    def test_sessions_can_share_a_vector_store(self):
+        other = DocumentChatbot(
+            None,
+            llm=FakeListLLM(responses=["Shared answer."]),
+            vector_store=self.chatbot.vector_store,
+            repository=self.repository
+        )
+        self.assertEqual(other.process_message("When does the clinic open?"), "Shared answer.")
+
+    def test_repeated_questions_are_answered_from_the_llm_cache(self):
+        # Every user of ":memory:" shares one pooled database; start from an empty one
+        self.addCleanup(close_pool, ":memory:")
+        cached = DocumentChatbot(
+            None,
+            llm=FakeListLLM(responses=["Opens at 9 AM.", "Closes at 5 PM."]),
+            vector_store=self.chatbot.vector_store,
+            repository=self.repository,
+            llm_cache=LLMResponseCache(":memory:")
+        )
+        self.assertEqual(cached.process_message("When does the clinic open?"), "Opens at 9 AM.")
+        self.assertEqual(cached.process_message("When does the clinic open?"), "Opens at 9 AM.")
+        self.assertEqual(cached.process_message("When does the clinic close?"), "Closes at 5 PM.")
+        stats = cached.llm_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        # Only the QA chain opted in by default
+        self.assertIs(cached.tools.agent.llm_chain.llm, cached.llm)
+        self.assertIsNone(self.chatbot.llm_cache_stats())
+
+        with self.assertRaises(ValueError):
+            DocumentChatbot(None, llm=cached.llm, vector_store=self.chatbot.vector_store,
+                            repository=self.repository, llm_cache_sites=("summary",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import pytest
+import io
 import os
 import tempfile
-from chatbot.document_loader import load_documents
+from chatbot import document_loader
+from chatbot.document_loader import load_documents, load_documents_from_bytes
 
 class TestDocumentLoader:
     
@@ -29,4 +31,53 @@ class TestDocumentLoader:
         # Create a temporary file with unsupported extension
         with tempfile.NamedTemporaryFile(suffix='.xyz', delete=False) as temp:
             temp.write(b"Test content")
-            temp_file_path = temp.name
\ No newline at end of file
+            temp_file_path = temp.name
+
+class TestLoadDocumentsFromBytes:
+
+    PDF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "temp_uploads", "AI Chatbot Technology Overview.pdf")
+
+    def test_load_text_bytes(self):
+        documents = load_documents_from_bytes(b"An in-memory text document.", "text/plain", name="notes.txt")
+
+        assert len(documents) == 1
+        assert documents[0].page_content == "An in-memory text document."
+        assert documents[0].metadata["source"] == "notes.txt"
+
+    def test_load_pdf_file_object(self):
+        with open(self.PDF_PATH, "rb") as f:
+            upload = io.BytesIO(f.read())
+
+        documents = load_documents_from_bytes(upload, "application/pdf", name="overview.pdf")
+
+        assert len(documents) > 0
+        assert "AI Chatbot Technology Overview" in documents[0].page_content
+        assert documents[0].metadata["page"] == 0
+
+    def test_large_upload_spills_to_disk(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(document_loader, "SPOOL_MAX_BYTES", 16)
+        monkeypatch.setattr(document_loader, "UPLOAD_TEMP_DIR", str(tmp_path))
+
+        # SpooledTemporaryFile rolls over into an unnamed tempfile.TemporaryFile
+        rollovers = []
+        temporary_file = tempfile.TemporaryFile
+
+        def spy(*args, **kwargs):
+            rollovers.append(kwargs.get("dir"))
+            return temporary_file(*args, **kwargs)
+
+        monkeypatch.setattr(tempfile, "TemporaryFile", spy)
+
+        documents = load_documents_from_bytes(io.BytesIO(b"A text upload larger than the spool limit."), "text/plain")
+
+        assert "larger than the spool limit" in documents[0].page_content
+        assert rollovers == [str(tmp_path)]
+
+    def test_unsupported_mime_type(self):
+        with pytest.raises(ValueError):
+            load_documents_from_bytes(b"<html></html>", "text/html")
+
+    def test_empty_upload(self):
+        with pytest.raises(ValueError):
+            load_documents_from_bytes(b"   ", "text/plain")
@@ -0,0 +1,126 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from typing import Any, List, Optional
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.llms import LLM
+
+from chatbot.database import close_pool
+from chatbot.llm_cache import LLMResponseCache
+
+
+class CountingLLM(LLM):
+    """Fake LLM that answers with the call number and the temperature it ran at"""
+
+    temperature: float = 0.7
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting-fake"
+
+    @property
+    def _identifying_params(self):
+        return {"temperature": self.temperature}
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        self.calls += 1
+        return f"answer {self.calls} at {self.temperature}"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLLMResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.directory, "llm_cache.db")
+        self.clock = FakeClock()
+        self.cache = LLMResponseCache(self.db_name, ttl=60, max_entries=3, clock=self.clock)
+
+    def tearDown(self):
+        close_pool(self.db_name)
+        shutil.rmtree(self.directory)
+
+    def test_repeated_prompt_is_served_from_the_cache(self):
+        llm = CountingLLM(temperature=0)
+        cached = self.cache.wrap(llm)
+
+        self.assertEqual(cached.invoke("When do you open?"), "answer 1 at 0.0")
+        self.assertEqual(cached.invoke("When do you open?"), "answer 1 at 0.0")
+        self.assertEqual(cached.invoke("When do you close?"), "answer 2 at 0.0")
+
+        self.assertEqual(llm.calls, 2)
+        self.assertIs(cached.llm, llm)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 2))
+
+    def test_key_covers_model_params_and_stop_sequences(self):
+        key = self.cache.key("gpt-3.5-turbo-instruct", {"temperature": 0}, "Hello")
+        self.assertEqual(key, self.cache.key("gpt-3.5-turbo-instruct", {"temperature": 0}, "Hello"))
+        self.assertNotEqual(key, self.cache.key("gpt-4", {"temperature": 0}, "Hello"))
+        self.assertNotEqual(key, self.cache.key("gpt-3.5-turbo-instruct", {"temperature": 0.7}, "Hello"))
+        self.assertNotEqual(key, self.cache.key("gpt-3.5-turbo-instruct", {"temperature": 0}, "Hello", ["\n"]))
+
+    def test_entries_persist_across_processes(self):
+        self.cache.wrap(CountingLLM()).invoke("When do you open?")
+        close_pool(self.db_name)
+
+        reopened = LLMResponseCache(self.db_name, clock=self.clock).wrap(CountingLLM())
+        self.assertEqual(reopened.invoke("When do you open?"), "answer 1 at 0.0")
+        self.assertEqual(reopened.llm.calls, 0)
+
+    def test_expired_entries_are_misses(self):
+        cached = self.cache.wrap(CountingLLM())
+        cached.invoke("When do you open?")
+        self.clock.now += 61
+
+        self.assertEqual(cached.invoke("When do you open?"), "answer 2 at 0.0")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cached = self.cache.wrap(CountingLLM())
+        for prompt in ["a", "b", "c"]:
+            cached.invoke(prompt)
+            self.clock.now += 1
+        cached.invoke("a")
+        self.clock.now += 1
+        cached.invoke("d")
+
+        self.assertEqual(self.cache.stats()["entries"], 3)
+        calls = cached.llm.calls
+        cached.invoke("a")
+        self.assertEqual(cached.llm.calls, calls)
+        cached.invoke("b")
+        self.assertEqual(cached.llm.calls, calls + 1)
+
+    def test_deterministic_mode_calls_the_model_at_temperature_zero(self):
+        llm = CountingLLM(temperature=0.7)
+        self.assertEqual(self.cache.wrap(llm).invoke("Hello"), "answer 1 at 0.0")
+        self.assertEqual(llm.temperature, 0.7)
+
+        sampled = self.cache.wrap(llm, deterministic=False)
+        self.assertEqual(sampled.invoke("Hello"), "answer 1 at 0.7")
+        self.assertEqual(sampled.invoke("Hello"), "answer 1 at 0.7")
+
+    def test_clear(self):
+        self.cache.wrap(CountingLLM()).invoke("Hello")
+        self.cache.clear()
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
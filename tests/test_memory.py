@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.llms import FakeListLLM
+from langchain.memory import ConversationBufferMemory
+
+from chatbot.memory import build_memory, TokenWindowMemory, RollingSummaryMemory
+
+
+class TestBoundedMemory(unittest.TestCase):
+
+    def _fill(self, memory, turns=50):
+        for i in range(turns):
+            memory.save_context(
+                {"input": f"Question {i} about the uploaded document and its sections"},
+                {"output": f"Answer {i} describing the relevant part of the document in detail"}
+            )
+
+    def test_window_memory_stays_within_limit(self):
+        memory = build_memory("window", max_token_limit=100)
+        self._fill(memory)
+
+        stats = memory.memory_stats()
+        self.assertIsInstance(memory, TokenWindowMemory)
+        self.assertLessEqual(stats["buffer_tokens"], 100)
+        self.assertGreater(stats["pruned_messages"], 0)
+        # The most recent turn is always kept
+        self.assertIn("Answer 49", memory.chat_memory.messages[-1].content)
+
+    def test_summary_memory_compacts_older_turns(self):
+        llm = FakeListLLM(responses=["The user asked many questions about the document."])
+        memory = build_memory("summary", llm=llm, max_token_limit=100)
+        self._fill(memory)
+
+        stats = memory.memory_stats()
+        self.assertIsInstance(memory, RollingSummaryMemory)
+        self.assertLessEqual(stats["buffer_tokens"], 100)
+        self.assertEqual(memory.moving_summary_buffer, "The user asked many questions about the document.")
+        self.assertGreater(stats["summary_tokens"], 0)
+
+    def test_buffer_mode_is_unbounded(self):
+        memory = build_memory("buffer")
+        self._fill(memory, turns=10)
+        self.assertIsInstance(memory, ConversationBufferMemory)
+        self.assertEqual(len(memory.chat_memory.messages), 20)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            build_memory("forever")
+        with self.assertRaises(ValueError):
+            build_memory("summary")
+
+
+if __name__ == '__main__':
+    unittest.main()
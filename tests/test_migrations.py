@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import close_pool, get_pool
+from chatbot.migrations import LATEST_VERSION, get_schema_version, migrate
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+
+    def tearDown(self):
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _query_plan(self, sql, params):
+        with get_pool(self.db_name).connection() as conn:
+            return " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+    def test_migrate_fresh_database(self):
+        self.assertEqual(migrate(get_pool(self.db_name)), LATEST_VERSION)
+        with get_pool(self.db_name).connection() as conn:
+            self.assertEqual(get_schema_version(conn), LATEST_VERSION)
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"user_data", "appointments"} <= tables)
+
+    def test_migrate_is_idempotent(self):
+        migrate(get_pool(self.db_name))
+        close_pool(self.db_name)
+        self.assertEqual(migrate(get_pool(self.db_name)), LATEST_VERSION)
+
+    def test_upgrades_database_created_by_old_code(self):
+        with sqlite3.connect(self.db_name) as conn:
+            conn.execute("""
+                CREATE TABLE appointments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, date TEXT NOT NULL,
+                    time TEXT NOT NULL, status TEXT DEFAULT 'confirmed', created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("INSERT INTO appointments (user_id, date, time, created_at) VALUES (1, '2030-01-01', '09:00', 'x')")
+
+        migrate(get_pool(self.db_name))
+
+        with get_pool(self.db_name).connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0], 1)
+
+    def test_lookups_use_covering_indexes(self):
+        migrate(get_pool(self.db_name))
+
+        slots_plan = self._query_plan(
+            "SELECT time FROM appointments WHERE date = ? AND status = 'confirmed'", ("2030-01-01",))
+        customer_plan = self._query_plan(
+            "SELECT date, time FROM appointments WHERE user_id = ? AND status = 'confirmed' AND date >= ?",
+            (1, "2030-01-01"))
+
+        self.assertIn("COVERING INDEX idx_appointments_date_status_time", slots_plan)
+        self.assertIn("COVERING INDEX idx_appointments_user", customer_plan)
+
+    def test_customer_lookup_is_a_point_query(self):
+        migrate(get_pool(self.db_name))
+
+        plan = self._query_plan(
+            "SELECT id FROM customers WHERE email_normalized = ? AND phone_normalized = ?", ("a", "b"))
+
+        self.assertIn("COVERING INDEX idx_customers_identity", plan)
+
+    def test_folds_duplicate_users_into_customers(self):
+        pool = get_pool(self.db_name)
+        migrate(pool, target_version=4)
+        with pool.connection() as conn:
+            conn.executemany(
+                "INSERT INTO user_data (name, phone, email, date, time, created_at) VALUES (?, ?, ?, '2030-01-01', '09:00', ?)",
+                [("Ann", "9876543210", "ann@example.com", "2030-01-01T09:00:00"),
+                 ("Bob", "9123456789", "bob@example.com", "2030-01-01T10:00:00"),
+                 ("Ann B", "98765-43210", "ANN@example.com ", "2030-01-02T09:00:00")])
+            conn.execute("INSERT INTO appointments (user_id, date, time, created_at) VALUES (3, '2030-01-07', '10:00', 'x')")
+
+        migrate(pool)
+
+        with pool.connection() as conn:
+            customers = conn.execute("SELECT id, name, created_at FROM customers ORDER BY id").fetchall()
+            links = conn.execute("SELECT id, customer_id FROM user_data ORDER BY id").fetchall()
+            booked_by = conn.execute("SELECT user_id FROM appointments").fetchone()[0]
+        self.assertEqual(len(customers), 2)
+        ann = customers[0]
+        # The latest name wins, the first submission dates the customer
+        self.assertEqual(ann[1:], ("Ann B", "2030-01-01T09:00:00"))
+        self.assertEqual(links, [(1, ann[0]), (2, customers[1][0]), (3, ann[0])])
+        self.assertEqual(booked_by, ann[0])
+
+    def test_appointments_reference_customers(self):
+        pool = get_pool(self.db_name)
+        migrate(pool, target_version=6)
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO appointments (user_id, date, time, created_at) VALUES (1, '2030-01-07', '10:00', 'x')")
+
+        migrate(pool)
+
+        with pool.connection() as conn:
+            for table in ("appointments", "provider_appointments"):
+                references = {row[2] for row in conn.execute(f"PRAGMA foreign_key_list({table})") if row[3] == "user_id"}
+                self.assertEqual(references, {"customers"})
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            self.assertEqual(conn.execute("SELECT user_id, date, time FROM appointments").fetchall(),
+                             [(1, "2030-01-07", "10:00")])
+
+        # With foreign keys enforced, a customer's booking is accepted
+        conn = sqlite3.connect(self.db_name)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            customer_id = conn.execute(
+                "INSERT INTO customers (name, phone, email, email_normalized, phone_normalized, created_at, updated_at) "
+                "VALUES ('Ann', '9876543210', 'ann@example.com', 'ann@example.com', '9876543210', 'x', 'x')"
+            ).lastrowid
+            conn.execute("INSERT INTO appointments (user_id, date, time, created_at) VALUES (?, '2030-01-08', '10:00', 'x')",
+                         (customer_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.assertNotIn("idx_user_data_identity", indexes)
+        self.assertTrue({"idx_appointments_confirmed_slot", "idx_appointments_user",
+                         "idx_provider_appointments_slot", "idx_provider_appointments_date"} <= indexes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.planner import FastPathPlanner
+from chatbot.tools.date_tool import DateExtractionTool
+
+
+class TestFastPathPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = MagicMock()
+        self.collector.start_collection.return_value = "May I have your name first?"
+        self.booking_tool = MagicMock()
+        self.booking_tool.book_appointment.return_value = "Appointment confirmed"
+        self.booking_tool.cancel_booking.return_value = "Cancelled"
+        self.booking_tool.reschedule_booking.return_value = "Moved"
+        self.agent = MagicMock(return_value={"output": "Agent reply"})
+        self.planner = FastPathPlanner(self.collector, DateExtractionTool(), self.booking_tool, agent=self.agent)
+
+    def _serve(self, message):
+        plan = self.planner.plan(message)
+        return plan and (plan.intent, self.planner.execute(plan, message))
+
+    def test_clear_requests_go_straight_to_their_tool(self):
+        self.assertEqual(self._serve("Book an appointment next Monday at 10 AM"), ("booking", "Appointment confirmed"))
+        self.assertEqual(self._serve("I need an appointment"), ("booking", "May I have your name first?"))
+        self.assertEqual(self._serve("Cancel my appointment"), ("cancel", "Cancelled"))
+        self.assertEqual(self._serve("Please reschedule my appointment to Friday"), ("reschedule", "Moved"))
+        self.assertEqual(self._serve("Please call me"), ("user_info", "May I have your name first?"))
+        self.assertIsNone(self._serve("What does the notebook say about opening hours?"))
+
+        self.agent.assert_not_called()
+        stats = self.planner.stats()
+        self.assertEqual((stats["requests"], stats["fast_path"], stats["llm"]), (5, 5, 0))
+        self.assertEqual(stats["fast_path_ratio"], 1.0)
+        self.assertIsNone(stats["latency_saved_ms"])
+
+    def test_document_questions_with_tool_verbs_are_not_tool_requests(self):
+        for message in ["What is the cancellation policy?", "How do I change my password?",
+                        "Can I move my data to another account?",
+                        "what is the cancellation policy for appointments?",
+                        "can I change my appointment time online?"]:
+            self.assertIsNone(self.planner.plan(message), message)
+        self.assertEqual(self.planner.plan("Cancel Tuesday at 3pm").intent, "cancel")
+        self.assertEqual(self.planner.plan("Can you change my 10am to Friday?").intent, "reschedule")
+        self.assertEqual(self.planner.plan("Can you cancel my appointment?").intent, "cancel")
+
+    def test_ambiguous_requests_go_to_the_agent(self):
+        for message in ["Cancel Tuesday and book Friday instead", "Don't cancel, just move my appointment"]:
+            self.assertEqual(self._serve(message), ("agent", "Agent reply"))
+        self._serve("Cancel my appointment")
+
+        self.assertEqual(self.agent.call_count, 2)
+        self.assertEqual(self.agent.call_args[0][0], {"input": "Don't cancel, just move my appointment"})
+        stats = self.planner.stats()
+        self.assertEqual((stats["fast_path"], stats["llm"]), (1, 2))
+        self.assertAlmostEqual(stats["fast_path_ratio"], 1 / 3)
+        self.assertIsNotNone(stats["latency_saved_ms"])
+
+    def test_tool_errors_become_replies(self):
+        self.booking_tool.cancel_booking.side_effect = RuntimeError("boom")
+        self.assertEqual(self._serve("cancel my appointment"), ("cancel", "Error during cancellation: boom"))
+
+    def test_without_an_agent_ambiguous_requests_ask_again(self):
+        planner = FastPathPlanner(self.collector, DateExtractionTool(), self.booking_tool)
+        plan = planner.plan("Cancel Tuesday and book Friday")
+        self.assertIn("one thing at a time", planner.execute(plan, "Cancel Tuesday and book Friday"))
+        self.assertEqual(planner.stats()["llm"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
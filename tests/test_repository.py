@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.database import close_pool
+from chatbot.repository import MemoryRepository, Repository, SQLiteRepository
+from chatbot.tools.availability_cache import close_availability_cache
+
+
+def _user(name, created_at):
+    return {"name": name, "phone": "9876543210", "email": f"{name.lower()}@example.com",
+            "date": "2030-01-07", "time": "10:00", "created_at": created_at}
+
+
+class RepositoryContract:
+    """Behaviour every backend must share; subclasses provide make_repository()."""
+
+    def setUp(self):
+        self.repository = self.make_repository()
+        self.repository.initialize()
+
+    def test_users(self):
+        self.assertIsNone(self.repository.get_user_id(_user("Ann", "")))
+
+        first = self.repository.save_user(_user("Ann", "2030-01-01T09:00:00"))
+        other = self.repository.save_user(_user("Bob", "2030-01-01T10:00:00"))
+        latest = self.repository.save_user(_user("Ann", "2030-01-02T09:00:00"))
+
+        # A repeat customer keeps their ID; every contact form is still recorded
+        self.assertEqual(first, latest)
+        self.assertNotEqual(first, other)
+        self.assertEqual(self.repository.get_user_id(_user("Ann", "")), first)
+        users = self.repository.all_users()
+        self.assertEqual([row[-1] for row in users], [first, other, first])
+        self.assertEqual(users[0][1:4], ("Ann", "9876543210", "ann@example.com"))
+
+    def test_customer_identity_is_normalized(self):
+        customer_id = self.repository.upsert_customer("Ann", "9876543210", "ann@example.com")
+
+        self.assertEqual(self.repository.upsert_customer("Ann B", "98765-43210", " ANN@Example.com"), customer_id)
+        self.assertEqual(self.repository.get_user_id({"name": "x", "phone": "(98765) 43210",
+                                                      "email": "Ann@example.COM"}), customer_id)
+        self.assertNotEqual(self.repository.upsert_customer("Ann", "9876543211", "ann@example.com"), customer_id)
+
+    def test_reserve_and_cancel(self):
+        appointment_id, booked = self.repository.reserve_slot(1, "2030-01-07", "10:00")
+        self.assertIsNotNone(appointment_id)
+        self.assertIsNone(booked)
+        self.repository.reserve_slot(1, "2030-01-07", "09:00")
+
+        self.assertEqual(self.repository.reserve_slot(2, "2030-01-07", "10:00"), (None, ["09:00", "10:00"]))
+        self.assertEqual(self.repository.booked_times("2030-01-07"), ["09:00", "10:00"])
+
+        self.assertEqual(self.repository.cancel_appointment(appointment_id), ("2030-01-07", "10:00"))
+        self.assertIsNone(self.repository.cancel_appointment(appointment_id))
+        self.assertEqual(self.repository.booked_times("2030-01-07"), ["09:00"])
+        self.assertIsNotNone(self.repository.reserve_slot(2, "2030-01-07", "10:00")[0])
+
+    def test_reschedule_moves_atomically(self):
+        appointment_id, _ = self.repository.reserve_slot(1, "2030-01-07", "10:00")
+        self.repository.reserve_slot(2, "2030-01-08", "09:00")
+
+        # A taken slot leaves the appointment where it was
+        self.assertEqual(self.repository.reschedule_appointment(appointment_id, "2030-01-08", "09:00"),
+                         (None, ["09:00"]))
+        self.assertEqual(self.repository.booked_times("2030-01-07"), ["10:00"])
+
+        new_id, booked = self.repository.reschedule_appointment(appointment_id, "2030-01-08", "11:00")
+        self.assertIsNotNone(new_id)
+        self.assertIsNone(booked)
+        self.assertEqual(self.repository.booked_times("2030-01-07"), [])
+        self.assertEqual(self.repository.booked_times("2030-01-08"), ["09:00", "11:00"])
+        self.assertEqual(self.repository.customer_appointments(1), [(new_id, "2030-01-08", "11:00")])
+
+        # The old appointment is no longer confirmed, and an appointment can stay in its own slot
+        self.assertEqual(self.repository.reschedule_appointment(appointment_id, "2030-01-09", "10:00"), (None, None))
+        self.assertIsNotNone(self.repository.reschedule_appointment(new_id, "2030-01-08", "11:00")[0])
+
+    def test_customer_appointments(self):
+        self.repository.reserve_slot(1, "2030-01-09", "09:00")
+        first, _ = self.repository.reserve_slot(1, "2030-01-07", "14:00")
+        self.repository.reserve_slot(2, "2030-01-08", "09:00")
+        cancelled, _ = self.repository.reserve_slot(1, "2030-01-08", "10:00")
+        self.repository.cancel_appointment(cancelled)
+
+        self.assertEqual([row[1:] for row in self.repository.customer_appointments(1)],
+                         [("2030-01-07", "14:00"), ("2030-01-09", "09:00")])
+        self.assertEqual(self.repository.customer_appointments(1, "2030-01-08")[0][1], "2030-01-09")
+        self.assertEqual(self.repository.customer_appointments(1)[0][0], first)
+
+    def test_iter_booked_in_date_order(self):
+        for day, time_str in [("2030-01-09", "09:00"), ("2030-01-05", "11:00"), ("2030-01-07", "10:00"),
+                              ("2030-01-12", "09:00")]:
+            self.repository.reserve_slot(1, day, time_str)
+
+        rows = list(self.repository.iter_booked("2030-01-06", "2030-01-09"))
+
+        self.assertEqual(rows, [("2030-01-07", "10:00"), ("2030-01-09", "09:00")])
+
+
+class TestMemoryRepository(RepositoryContract, unittest.TestCase):
+
+    def make_repository(self):
+        return MemoryRepository()
+
+    def test_repeat_customer_updates_name(self):
+        customer_id = self.repository.save_user(_user("Ann", "2030-01-01T09:00:00"))
+        self.repository.save_user({**_user("Ann", "2030-01-02T09:00:00"), "name": "Ann B"})
+
+        # As in the SQLite customers table: the latest details win, the first submission dates the customer
+        self.assertEqual(self.repository._customer_rows[customer_id],
+                         ["Ann B", "9876543210", "ann@example.com", "2030-01-01T09:00:00", "2030-01-02T09:00:00"])
+
+
+class TestSQLiteRepository(RepositoryContract, unittest.TestCase):
+
+    def make_repository(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.temp_dir, "test.db")
+        return SQLiteRepository(self.db_name)
+
+    def tearDown(self):
+        close_availability_cache(self.db_name)
+        close_pool(self.db_name)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class TestRepositoryInterface(unittest.TestCase):
+
+    def test_backend_must_implement_the_interface(self):
+        class Incomplete(Repository):
+            def booked_times(self, date_str):
+                return []
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot import tracing
+from chatbot.steps import SerialExecutor, Step, run_steps
+
+
+class TestRunSteps(unittest.TestCase):
+
+    def test_results_flow_to_dependent_steps(self):
+        results = run_steps([
+            Step("slots", lambda date: [f"{date} 09:00"], after=("date",)),
+            Step("date", lambda: "2030-01-07"),
+            Step("user_id", lambda: 7),
+            Step("reply", lambda slots, user_id: f"{user_id}: {slots[0]}", after=("slots", "user_id")),
+        ])
+
+        self.assertEqual(results, {"slots": ["2030-01-07 09:00"], "date": "2030-01-07", "user_id": 7,
+                                   "reply": "7: 2030-01-07 09:00"})
+
+    def test_independent_steps_run_concurrently(self):
+        # Each step waits for the other; run one after another, the barrier would time out
+        barrier = threading.Barrier(2, timeout=5)
+        results = run_steps([Step("user_id", lambda: barrier.wait() is not None),
+                             Step("slots", lambda: barrier.wait() is not None)])
+        self.assertEqual(results, {"user_id": True, "slots": True})
+
+    def test_a_chain_runs_on_the_calling_thread(self):
+        caller = threading.get_ident()
+        results = run_steps([Step("first", threading.get_ident),
+                             Step("second", lambda first: threading.get_ident(), after=("first",))])
+        self.assertEqual(set(results.values()), {caller})
+
+    def test_serial_executor(self):
+        caller = threading.get_ident()
+        results = run_steps([Step("a", threading.get_ident), Step("b", threading.get_ident)],
+                            executor=SerialExecutor())
+        self.assertEqual(set(results.values()), {caller})
+
+    def test_first_error_is_raised_and_later_steps_skipped(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("database is down")
+
+        with self.assertRaises(RuntimeError):
+            run_steps([Step("user_id", fail), Step("slots", lambda: ran.append("slots")),
+                       Step("reply", lambda user_id: ran.append("reply"), after=("user_id",))])
+        self.assertNotIn("reply", ran)
+
+    def test_invalid_graphs(self):
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            run_steps([Step("reply", lambda date: date, after=("date",))])
+        with self.assertRaisesRegex(ValueError, "each other"):
+            run_steps([Step("a", lambda b: b, after=("b",)), Step("b", lambda a: a, after=("a",))])
+
+
+class TestStepTracing(unittest.TestCase):
+
+    def setUp(self):
+        tracing.tracer.reset()
+        tracing.tracer.enable()
+
+    def tearDown(self):
+        tracing.tracer.disable()
+        tracing.tracer.reset()
+
+    def test_steps_on_other_threads_nest_under_the_caller(self):
+        lookup = tracing.traced("booking.get_user_id")(lambda: 7)
+        with tracing.span("chat.turn") as turn:
+            run_steps([Step("user_id", lookup), Step("slots", lookup)])
+
+        children = [s for s in tracing.tracer.spans() if s.name == "booking.get_user_id"]
+        self.assertEqual(len(children), 2)
+        self.assertEqual({s.parent_id for s in children}, {turn.span_id})
+        self.assertEqual({s.trace_id for s in children}, {turn.trace_id})
+
+
+if __name__ == '__main__':
+    unittest.main()
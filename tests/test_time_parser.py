@@ -0,0 +1,77 @@
+import json
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.repository import MemoryRepository
+from chatbot.tools.booking_tool import AppointmentBookingTool
+from chatbot.tools.date_tool import DateExtractionTool
+from chatbot.tools.time_parser import TimeMatch, find_times, match_time, parse_time
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "time_corpus.jsonl")
+
+
+class TestTimeParser(unittest.TestCase):
+
+    def test_corpus(self):
+        """Messages map to [earliest, latest, rule, matched text]; replies map to HH:MM"""
+        with open(CORPUS) as f:
+            cases = [json.loads(line) for line in f]
+
+        mismatches = []
+        for case in cases:
+            if "reply" in case:
+                result = parse_time(case["reply"])
+            else:
+                found = match_time(case["query"])
+                result = found and [found.earliest, found.latest, found.rule, case["query"][found.start:found.end]]
+            if result != case["time"]:
+                mismatches.append((case.get("query", case.get("reply")), case["time"], result))
+
+        self.assertGreater(len(cases), 250)
+        self.assertEqual(mismatches, [])
+
+    def test_digits_of_dates_are_not_hours(self):
+        self.assertEqual(match_time("March 15 at 2pm").exact, "14:00")
+        self.assertEqual(match_time("Book 2025-04-15 at 2").exact, "14:00")
+        self.assertIsNone(match_time("Book for 4/15/2025"))
+
+    def test_exact_time_wins_over_an_earlier_range(self):
+        text = "tomorrow morning at 10"
+        self.assertEqual([t.rule for t in find_times(text)], ["period", "exact"])
+        self.assertEqual(match_time(text), TimeMatch("10:00", "10:00", 20, 22, "exact"))
+
+    def test_range_contains_start_times(self):
+        between = match_time("between 2 and 4")
+        self.assertEqual([slot for slot in ["13:00", "14:00", "15:00", "16:00"] if between.contains(slot)],
+                         ["14:00", "15:00"])
+        self.assertIsNone(between.exact)
+
+
+class TestBookingTimes(unittest.TestCase):
+
+    def setUp(self):
+        collector = MagicMock()
+        collector.get_user_info.return_value = {"name": "Jane Doe", "phone": "9876543210", "email": "jane@example.com"}
+        self.tool = AppointmentBookingTool(collector, DateExtractionTool(), repository=MemoryRepository())
+
+    def test_time_after_a_month_day_is_booked(self):
+        reply = self.tool.book_appointment("Book an appointment on 2030-03-15 at 2pm")
+        self.assertIn("Appointment confirmed", reply)
+        self.assertEqual(self.tool.get_booked_slots("2030-03-15"), ["14:00"])
+
+    def test_range_narrows_the_offered_slots(self):
+        self.tool.reserve_slot(1, "2030-03-15", "15:00")
+
+        reply = self.tool.book_appointment("Any appointment on 2030-03-15 between 2 and 5?")
+
+        self.assertIn("- 14:00\n- 16:00\n\nPlease specify a time", reply)
+        self.assertNotIn("10:00", reply)
+
+
+if __name__ == '__main__':
+    unittest.main()
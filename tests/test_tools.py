@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 import sys
@@ -55,6 +56,109 @@ class TestDateExtractionTool(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class FixedDatetime(datetime):
+    current = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class TestDateExtractionCorpus(unittest.TestCase):
+    """The compiled extractor against results recorded from the original per-pattern implementation"""
+
+    def test_golden_corpus(self):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "date_corpus.jsonl")) as f:
+            cases = [json.loads(line) for line in f]
+        date_tool = DateExtractionTool()
+
+        mismatches = []
+        with patch('chatbot.tools.date_tool.datetime', FixedDatetime):
+            for case in cases:
+                FixedDatetime.current = datetime.fromisoformat(case["now"])
+                result = date_tool.extract_date(case["query"])
+                if result != case["expected"]:
+                    mismatches.append((case["now"], case["query"], case["expected"], result))
+
+        self.assertGreater(len(cases), 500)
+        self.assertEqual(mismatches, [])
+
+
+class TestDateExtractionMemo(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2025, 3, 31, 9, 0)  # Monday
+        self.calls = 0
+
+        def clock():
+            self.calls += 1
+            return self.now
+
+        self.date_tool = DateExtractionTool(clock=clock, cache_size=2)
+
+    def test_clock_is_read_once_per_extraction(self):
+        self.assertEqual(self.date_tool.extract_date("next friday"), "2025-04-04")
+        self.assertEqual(self.calls, 1)
+
+    def test_repeated_queries_are_memoized_per_reference_date(self):
+        self.assertEqual(self.date_tool.extract_date("Next Friday please"), "2025-04-04")
+        self.assertEqual(self.date_tool.extract_date("next friday PLEASE"), "2025-04-04")
+        self.assertEqual(self.date_tool.cache_stats()["hits"], 1)
+
+        # Later the same day: still a hit; the next day the answer may differ
+        self.now = datetime(2025, 3, 31, 23, 59)
+        self.assertEqual(self.date_tool.extract_date("tomorrow"), "2025-04-01")
+        self.now = datetime(2025, 4, 1, 0, 1)
+        self.assertEqual(self.date_tool.extract_date("tomorrow"), "2025-04-02")
+        self.assertEqual(self.date_tool.cache_stats()["misses"], 3)
+
+    def test_memo_keeps_the_most_recently_used_queries(self):
+        for query in ["today", "tomorrow", "today", "next monday"]:
+            self.date_tool.extract_date(query)
+        self.date_tool.extract_date("today")
+
+        self.assertEqual(self.date_tool.cache_stats(), {"hits": 2, "misses": 3, "entries": 2, "max_entries": 2})
+
+    def test_memo_can_be_disabled(self):
+        date_tool = DateExtractionTool(clock=lambda: self.now, cache_size=0)
+        date_tool.extract_date("today")
+        date_tool.extract_date("today")
+        self.assertEqual(date_tool.cache_stats()["entries"], 0)
+
+
+class TestDateCandidates(unittest.TestCase):
+
+    def setUp(self):
+        self.date_tool = DateExtractionTool()
+        self.reference = datetime(2025, 3, 3, 9, 0)  # Monday
+
+    def _find(self, query):
+        return [(c.first, c.last, query.lower()[c.start:c.end], c.rule, c.confidence)
+                for c in self.date_tool.find_dates(query, self.reference)]
+
+    def test_every_date_and_range_is_found(self):
+        self.assertEqual(self._find("next Tuesday or Thursday, or any day the week of March 10"), [
+            ("2025-03-04", "2025-03-04", "next tuesday", "next_weekday", 0.9),
+            ("2025-03-06", "2025-03-06", "thursday", "weekday", 0.8),
+            ("2025-03-10", "2025-03-16", "week of march 10", "week_of", 0.8),
+        ])
+
+    def test_ranges(self):
+        self.assertEqual(self._find("between March 28 and April 2"),
+                         [("2025-03-28", "2025-04-02", "between march 28 and april 2", "date_range", 0.9)])
+        self.assertEqual(self._find("March 10-14 or this weekend")[1],
+                         ("2025-03-08", "2025-03-09", "this weekend", "weekend", 0.8))
+        self.assertEqual(len(self.date_tool.find_dates("next week", self.reference)[0].dates()), 7)
+
+    def test_repeated_dates_keep_the_surer_reading(self):
+        self.assertEqual(self._find("Friday works, or next friday, or 2025-03-07"),
+                         [("2025-03-07", "2025-03-07", "2025-03-07", "iso", 1.0)])
+
+    def test_numbers_that_are_not_dates(self):
+        self.assertEqual(self._find("the march 2024 report, within 3 days"), [])
+        self.assertEqual(self._find("the day after tomorrow")[0][:2], ("2025-03-05", "2025-03-05"))
+
+
 class TestAppointmentBookingTool(unittest.TestCase):
     
     def setUp(self):
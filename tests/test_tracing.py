@@ -0,0 +1,90 @@
+import io
+import json
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import chatbot modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot import tracing
+from chatbot.tracing import Tracer
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = Tracer(enabled=True)
+
+    def test_nested_spans_share_trace(self):
+        with self.tracer.span("chat.turn") as outer:
+            with self.tracer.span("booking.get_booked_slots", date="2025-04-15"):
+                pass
+
+        inner, outer_span = self.tracer.spans()
+        self.assertIs(outer_span, outer)
+        self.assertEqual(inner.parent_id, outer.span_id)
+        self.assertEqual(inner.trace_id, outer.trace_id)
+        self.assertEqual(inner.attributes, {"date": "2025-04-15"})
+        self.assertIsNone(outer.parent_id)
+
+    def test_error_is_recorded(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("booking.save_appointment"):
+                raise ValueError("database is locked")
+
+        self.assertEqual(self.tracer.spans()[0].error, "ValueError: database is locked")
+
+    def test_export_jsonl(self):
+        with self.tracer.span("rag.retrieve"):
+            pass
+        out = io.StringIO()
+        self.tracer.export_jsonl(out)
+
+        record = json.loads(out.getvalue().splitlines()[0])
+        self.assertEqual(record["name"], "rag.retrieve")
+        self.assertGreaterEqual(record["duration_ms"], 0)
+
+    def test_export_prometheus(self):
+        for _ in range(3):
+            with self.tracer.span("llm.call"):
+                pass
+        text = self.tracer.export_prometheus()
+
+        self.assertIn("# TYPE chatbot_span_duration_seconds histogram", text)
+        self.assertIn('chatbot_span_duration_seconds_bucket{span="llm.call",le="+Inf"} 3', text)
+        self.assertIn('chatbot_span_duration_seconds_count{span="llm.call"} 3', text)
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span("chat.turn") as s:
+            s.set_attribute("route", "qa")
+        self.assertEqual(tracer.spans(), [])
+
+
+class TestTracedDecorator(unittest.TestCase):
+
+    def setUp(self):
+        tracing.tracer.reset()
+        tracing.tracer.enable()
+
+    def tearDown(self):
+        tracing.tracer.disable()
+        tracing.tracer.reset()
+
+    def test_traced_function_and_langchain_llm(self):
+        from langchain_community.llms import FakeListLLM
+
+        llm = FakeListLLM(responses=["It is a test."])
+
+        @tracing.traced("chat.turn")
+        def answer(question):
+            return llm.invoke(question, config={"callbacks": tracing.langchain_callbacks()})
+
+        self.assertEqual(answer("What is this?"), "It is a test.")
+        names = [s.name for s in tracing.tracer.spans()]
+        self.assertEqual(names, ["llm.call", "chat.turn"])
+
+
+if __name__ == '__main__':
+    unittest.main()